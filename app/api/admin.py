@@ -0,0 +1,125 @@
+"""
+Admin diagnostics API endpoints
+"""
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from app.auth.dependencies import require_admin
+from app.auth.principal import Principal
+from app.utils.leak_diagnostics import leak_diagnostics
+from app.utils.logger import get_logger
+from app.utils.loop_lag import loop_lag_monitor
+from app.utils.performance import get_monitor, HISTORY_METRICS
+from app.utils.profiler import profiler, ProfilerBusyError
+
+logger = get_logger("api.admin")
+router = APIRouter(prefix="/api/admin", tags=["Admin"])
+
+TIER_PATTERN = "^(raw|1m|1h)$"
+
+
+def _monitor():
+    monitor = get_monitor()
+    if monitor is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Performance monitor is not running")
+    return monitor
+
+
+@router.get("/performance/summary", response_model=dict)
+async def get_performance_summary(
+    tier: str = Query("raw", pattern=TIER_PATTERN, description="raw samples, 1m or 1h averages"),
+    window: Optional[int] = Query(None, ge=1, description="Only the last N seconds"),
+    current_user: Principal = Depends(require_admin)
+):
+    """min/avg/p50/p95/p99/max of the process metrics over a history tier"""
+    monitor = _monitor()
+    return {
+        **monitor.get_summary(tier=tier, window_seconds=window),
+        "retention": monitor.get_retention(),
+    }
+
+
+@router.get("/performance/history", response_model=dict)
+async def get_performance_history(
+    tier: str = Query("1m", pattern=TIER_PATTERN, description="raw samples, 1m or 1h averages"),
+    limit: Optional[int] = Query(None, ge=1, description="Only the newest N samples"),
+    metric: Optional[List[str]] = Query(None, description=f"Metrics to include: {', '.join(HISTORY_METRICS)}"),
+    current_user: Principal = Depends(require_admin)
+):
+    """Samples of a history tier as parallel arrays, oldest first"""
+    if metric:
+        unknown = sorted(set(metric) - set(HISTORY_METRICS))
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown metric(s): {', '.join(unknown)}"
+            )
+    return _monitor().get_history(tier=tier, limit=limit, metrics=metric)
+
+
+@router.get("/performance/event-loop", response_model=dict)
+async def get_event_loop_lag(
+    current_user: Principal = Depends(require_admin)
+):
+    """Heartbeat/stall counters and the most recent event-loop stalls with the blocking stack"""
+    return loop_lag_monitor.get_status()
+
+
+@router.get("/performance/leaks", response_model=dict)
+async def get_leak_diagnostics(
+    current_user: Principal = Depends(require_admin)
+):
+    """tracemalloc tracing state and the top growing allocation sites of recent snapshots"""
+    return leak_diagnostics.get_status()
+
+
+@router.post("/performance/leaks/snapshot", response_model=dict)
+async def take_leak_snapshot(
+    current_user: Principal = Depends(require_admin)
+):
+    """
+    Start tracing (first call) or diff a snapshot against the baseline now
+
+    Snapshots are taken on a worker thread; they can take a while on a large heap.
+    """
+    logger.info(f"Leak snapshot requested by user {current_user.id}")
+    return await asyncio.get_running_loop().run_in_executor(None, leak_diagnostics.snapshot_now)
+
+
+@router.delete("/performance/leaks", status_code=status.HTTP_204_NO_CONTENT)
+async def stop_leak_diagnostics(
+    current_user: Principal = Depends(require_admin)
+):
+    """Stop tracing (removes the tracemalloc overhead; reports are kept)"""
+    await asyncio.get_running_loop().run_in_executor(None, leak_diagnostics.stop)
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def run_profile(
+    seconds: float = Query(10, gt=0, le=profiler.max_seconds, description="How long to sample"),
+    rate: Optional[float] = Query(None, gt=0, le=1000, description=f"Samples per second (default {profiler.rate_hz})"),
+    thread: Optional[str] = Query(None, description="Only threads whose name contains this"),
+    current_user: Principal = Depends(require_admin)
+):
+    """
+    Sample all thread stacks for N seconds and return them in collapsed-stack format
+
+    One line per unique stack ("thread;outer;...;inner count"), ready for
+    flamegraph.pl or speedscope. Only one profile runs at a time.
+    """
+    logger.info(f"Profile ({seconds}s) requested by user {current_user.id}")
+    try:
+        collapsed, summary = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: profiler.profile(seconds, rate_hz=rate, thread_name=thread)
+        )
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return PlainTextResponse(
+        collapsed,
+        headers={
+            "X-Profile-Samples": str(summary["samples"]),
+            "X-Profile-Seconds": str(summary["seconds"]),
+            "X-Profile-Rate": str(summary["rate_hz"]),
+        }
+    )
@@ -1,12 +1,15 @@
 """
 Authentication API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.database import get_async_db
 from app.models.user import User
 from app.schemas.auth import LoginRequest, LoginResponse, Token
-from app.auth.security import verify_password, create_access_token
+from app.auth.security import verify_password_async, create_access_token
+from app.auth.rate_limit import login_throttle
 from app.utils.logger import get_logger
 
 logger = get_logger("api.auth")
@@ -16,12 +19,19 @@ router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 @router.post("/login", response_model=LoginResponse)
 async def login(
     login_data: LoginRequest,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """User login endpoint"""
+    # Reject throttled clients before any database or bcrypt work
+    login_throttle.check(login_throttle.client_ip(request), login_data.email)
+    
     try:
         # Find user by email
-        user = db.query(User).filter(User.email == login_data.email).first()
+        result = await db.execute(
+            select(User).options(selectinload(User.roles)).where(User.email == login_data.email)
+        )
+        user = result.scalar_one_or_none()
         
         if not user:
             logger.warning(f"Login attempt with invalid email: {login_data.email}")
@@ -31,7 +41,7 @@ async def login(
             )
         
         # Verify password
-        if not verify_password(login_data.password, user.password_hash):
+        if not await verify_password_async(login_data.password, user.password_hash):
             logger.warning(f"Login attempt with invalid password for user: {user.email}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -47,8 +57,13 @@ async def login(
             )
         
         # Create access token (sub must be string for JWT standard)
-        access_token = create_access_token(data={"sub": str(user.id), "email": user.email})
+        access_token = create_access_token(
+            data={"sub": str(user.id), "email": user.email},
+            role_ids=[role.id for role in user.roles],
+            role_version=user.role_version
+        )
         
+        login_throttle.succeeded(login_data.email)
         logger.info(f"User logged in successfully: {user.email}")
         
         # Return user data (without password)
@@ -79,7 +94,7 @@ async def login(
 @router.post("/verify", response_model=dict)
 async def verify_token(
     request: dict,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Verify JWT token endpoint"""
     from app.auth.security import decode_access_token
@@ -113,7 +128,8 @@ async def verify_token(
             detail="Invalid user ID in token"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
     
     if not user or user.is_active == 0:
         raise HTTPException(
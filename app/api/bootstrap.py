@@ -0,0 +1,94 @@
+"""
+Bootstrap API endpoint: all reference data the admin UI needs in one response
+"""
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload, load_only
+from app.database import get_async_db
+from app.models.customer import Customer
+from app.models.user import User, Department, Role, user_roles
+from app.auth.dependencies import get_current_active_user
+from app.auth.principal import Principal
+from app.services.case_repository import compile_serializer
+from app.services.reference_cache import reference_cache
+from app.utils.etag import table_state_etag, make_etag, etag_matches, set_etag, not_modified
+from app.utils.logger import get_logger
+from app.utils.retry import retry_database
+
+logger = get_logger("api.bootstrap")
+router = APIRouter(prefix="/api/bootstrap", tags=["Bootstrap"])
+
+SUPPORT_STAFF_ROLE = "Destek Personeli"
+ADMIN_ROLE = "Admin"
+
+# Lookup tables served from the reference cache
+LOOKUP_TABLES = ("support_types", "support_statuses", "priority_types", "departments")
+
+# Tables behind the compact projections (bootstrap ETag); roles decide support_staff
+BOOTSTRAP_TABLES = (Customer, User, user_roles, Role, Department)
+
+_department = compile_serializer(("id", "name"))
+_customer = compile_serializer(("id", "company_name"))
+_user = compile_serializer(("id", "full_name", "email", "is_active"), nested={"department": _department})
+
+
+@router.get("", response_model=dict)
+@retry_database
+async def get_bootstrap(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Reference data for the admin UI in one round trip
+
+    Lookup tables come from the reference cache; customers and users are
+    compact projections (only what dropdowns and pickers use). The full user list
+    is only included for admins, as with GET /api/users.
+    """
+    try:
+        lookups = {name: await reference_cache.get_tagged(db, name) for name in LOOKUP_TABLES}
+        is_admin = current_user.has_role(ADMIN_ROLE)
+        etag = make_etag(
+            await table_state_etag(db, BOOTSTRAP_TABLES, request),
+            [lookup_etag for _, lookup_etag in lookups.values()],
+            current_user.id,
+            is_admin
+        )
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        customers = (await db.scalars(
+            select(Customer)
+            .options(load_only(Customer.company_name))
+            .order_by(Customer.company_name)
+        )).all()
+        users = (await db.scalars(
+            select(User)
+            .options(
+                load_only(User.full_name, User.email, User.is_active, User.department_id),
+                joinedload(User.department).load_only(Department.name),
+                selectinload(User.roles).load_only(Role.name)
+            )
+            .order_by(User.full_name)
+        )).all()
+
+        support_staff = [
+            _user(user) for user in users
+            if user.is_active == 1 and any(role.name == SUPPORT_STAFF_ROLE for role in user.roles)
+        ]
+        me = next((user for user in users if user.id == current_user.id), None)
+
+        set_etag(response, etag)
+        return {
+            "me": _user(me),
+            "customers": [_customer(customer) for customer in customers],
+            "users": [_user(user) for user in users] if is_admin else [],
+            "support_staff": support_staff,
+            **{name: rows for name, (rows, _) in lookups.items()}
+        }
+    except Exception as e:
+        logger.exception(f"Error getting bootstrap data: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve bootstrap data")
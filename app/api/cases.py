@@ -1,198 +1,145 @@
 """
 Case/Ticket API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Response
+from sqlalchemy import select, update, func, cast, Integer
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple, Union
 from datetime import datetime
-from app.database import get_db
+from app.database import get_async_db
 from app.models.case import Case, CaseAssignment, CaseComment, CaseFile
-from app.schemas.case import CaseCreate, CaseUpdate, CaseClose, CaseResponse, CaseCommentCreate
+from app.models.ticket_counter import TicketCounter
+from app.schemas.case import CaseCreate, CaseUpdate, CaseClose, CaseResponse, CaseSummaryResponse, CaseCommentCreate
 from app.auth.dependencies import get_current_active_user
-from app.models.user import User
+from app.auth.principal import Principal
 from app.utils.logger import get_logger
+from app.services.case_repository import CaseRepository
+from app.services.reference_cache import reference_cache, COMPLETED_STATUS_NAME
 from app.utils.retry import retry_database, retry_file_system
+from app.utils.search import MIN_TRIGRAM_LENGTH
 from pathlib import Path
+import base64
+import json
 import shutil
 
 logger = get_logger("api.cases")
 router = APIRouter(prefix="/api/cases", tags=["Cases"])
 
 UPLOAD_DIR = Path("uploads")
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
 
-def generate_ticket_number(db: Session) -> str:
-    """Generate unique sequential ticket number by year"""
-    # Format: 3D + YYYY + 001, 002, 003... (e.g., 3D2025001, 3D2025002)
-    # Resets to 001 each new year (e.g., 3D2026001)
+def encode_case_cursor(case: Case) -> str:
+    """Encode the (request_date, id) position of a case as an opaque cursor"""
+    raw = json.dumps({"d": case.request_date.isoformat(), "i": case.id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_case_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode an opaque cursor back into (request_date, id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(data["d"]), int(data["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+async def generate_ticket_number(db: AsyncSession) -> str:
+    """
+    Allocate the next sequential ticket number for the current year
+    
+    Format: 3D + YYYY + 001, 002, 003... (e.g., 3D2025001, 3D2025002), widening
+    past 999 (3D20251000). Resets to 001 each new year (e.g., 3D2026001).
+    
+    The number comes from the ticket_counters row of the year, incremented with
+    UPDATE ... RETURNING in one round trip. The row lock is held until the case
+    transaction commits, so concurrent creates never get the same number and a
+    rolled back create does not leave a gap.
+    """
     current_year = datetime.now().year
     prefix = f"3D{current_year}"
     
-    # Find the highest ticket number for current year
-    # Pattern: 3D + YYYY + numbers
-    # Get all ticket numbers that start with the current year prefix
-    existing_tickets = db.query(Case.ticket_number).filter(
-        Case.ticket_number.like(f"{prefix}%")
-    ).all()
-    
-    max_number = 0
-    for ticket_tuple in existing_tickets:
-        ticket = ticket_tuple[0]
-        if ticket and ticket.startswith(prefix):
-            try:
-                # Extract the number part (after prefix)
-                number_part = ticket[len(prefix):]
-                if number_part.isdigit():
-                    num = int(number_part)
-                    if num > max_number:
-                        max_number = num
-            except (ValueError, IndexError):
-                continue
+    next_number = await db.scalar(
+        update(TicketCounter)
+        .where(TicketCounter.year == current_year)
+        .values(last_number=TicketCounter.last_number + 1)
+        .returning(TicketCounter.last_number)
+        .execution_options(synchronize_session=False)
+    )
     
-    # Generate next number
-    next_number = max_number + 1
-    ticket_number = f"{prefix}{next_number:03d}"
+    if next_number is None:
+        # First ticket of the year (or counters not migrated yet): seed the counter
+        # from tickets already issued with this prefix, once per year
+        suffix = func.substring(Case.ticket_number, len(prefix) + 1)
+        issued_max = (
+            select(func.coalesce(func.max(cast(suffix, Integer)), 0))
+            .where(Case.ticket_number.like(f"{prefix}%"), suffix.op("~")("^[0-9]+$"))
+            .scalar_subquery()
+        )
+        next_number = await db.scalar(
+            pg_insert(TicketCounter)
+            .values(year=current_year, last_number=issued_max + 1)
+            .on_conflict_do_update(
+                index_elements=[TicketCounter.year],
+                set_={"last_number": TicketCounter.last_number + 1}
+            )
+            .returning(TicketCounter.last_number)
+        )
     
-    return ticket_number
+    return f"{prefix}{next_number:03d}"
 
 
-@router.get("/", response_model=List[CaseResponse])
+@router.get("/", response_model=List[Union[CaseResponse, CaseSummaryResponse]])
 @retry_database
 async def get_cases(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    view: str = Query("full", pattern="^(summary|full)$", description="summary: list columns, lookups and comment/file counts only"),
     status_id: Optional[int] = None,
     priority_type_id: Optional[int] = None,
     customer_id: Optional[int] = None,
     assigned_to_me: bool = Query(False),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    q: Optional[str] = Query(None, min_length=MIN_TRIGRAM_LENGTH, max_length=200, description="Search ticket number, title and description"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
-    """Get list of cases with filters"""
+    """
+    Get list of cases with filters
+    
+    Pagination: pass the X-Next-Cursor response header back as `cursor` to get the
+    next page (keyset pagination, constant cost per page). `skip` is kept for
+    compatibility and ignored when a cursor is given.
+    
+    view=summary skips description/solution/custom_data and the assignment, comment
+    and file collections; only many-to-one lookups are joined and the collections are
+    replaced by comment_count/file_count.
+    
+    q= searches ticket_number, title and description (substring fragments and
+    whole words) and orders results by relevance; search results are paged with
+    `skip` only and carry no cursor.
+    """
+    if q and cursor:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="cursor cannot be combined with q; use skip")
+    keyset = decode_case_cursor(cursor) if cursor else None
     try:
-        query = db.query(Case).options(
-            joinedload(Case.customer),
-            joinedload(Case.product),
-            joinedload(Case.creator),
-            joinedload(Case.assigned_user),
-            joinedload(Case.department),
-            joinedload(Case.priority_type),
-            joinedload(Case.support_type),
-            joinedload(Case.status),
-            joinedload(Case.assignments).joinedload(CaseAssignment.user),
-            joinedload(Case.comments).joinedload(CaseComment.user),
-            joinedload(Case.files)
+        cases, last_case = await CaseRepository(db).list_cases(
+            view=view,
+            skip=skip,
+            limit=limit,
+            keyset=keyset,
+            status_id=status_id,
+            priority_type_id=priority_type_id,
+            customer_id=customer_id,
+            assigned_user_id=current_user.id if assigned_to_me else None,
+            search=q
         )
-        
-        if status_id:
-            query = query.filter(Case.status_id == status_id)
-        if priority_type_id:
-            query = query.filter(Case.priority_type_id == priority_type_id)
-        if customer_id:
-            query = query.filter(Case.customer_id == customer_id)
-        if assigned_to_me:
-            query = query.join(CaseAssignment).filter(CaseAssignment.user_id == current_user.id)
-        
-        cases = query.order_by(Case.request_date.desc(), Case.id.desc()).offset(skip).limit(limit).all()
-        
-        # Convert to dict format to avoid DetachedInstanceError
-        result = []
-        for case in cases:
-            case_dict = {
-                "id": case.id,
-                "ticket_number": case.ticket_number,
-                "title": case.title,
-                "description": case.description,
-                "request_date": case.request_date,
-                "customer_id": case.customer_id,
-                "customer_contact_id": case.customer_contact_id,
-                "product_id": case.product_id,
-                "created_by": case.created_by,
-                "assigned_to": case.assigned_to,
-                "department_id": case.department_id,
-                "priority_type_id": case.priority_type_id,
-                "support_type_id": case.support_type_id,
-                "status_id": case.status_id,
-                "solution": case.solution,
-                "start_date": case.start_date,
-                "end_date": case.end_date,
-                "time_spent_minutes": case.time_spent_minutes,
-                "custom_data": case.custom_data,
-                "created_at": case.created_at,
-                "updated_at": case.updated_at,
-                "customer": {
-                    "id": case.customer.id,
-                    "company_name": case.customer.company_name,
-                    "email": case.customer.email,
-                    "phone": getattr(case.customer, 'phone', None),
-                    "address": getattr(case.customer, 'address', None)
-                } if case.customer else None,
-                "product": {
-                    "id": case.product.id,
-                    "name": case.product.name,
-                    "code": case.product.code
-                } if case.product else None,
-                "creator": {
-                    "id": case.creator.id,
-                    "full_name": case.creator.full_name,
-                    "email": case.creator.email
-                } if case.creator else None,
-                "assigned_user": {
-                    "id": case.assigned_user.id,
-                    "full_name": case.assigned_user.full_name,
-                    "email": case.assigned_user.email
-                } if case.assigned_user else None,
-                "department": {
-                    "id": case.department.id,
-                    "name": case.department.name
-                } if case.department else None,
-                "priority_type": {
-                    "id": case.priority_type.id,
-                    "name": case.priority_type.name,
-                    "color": case.priority_type.color
-                } if case.priority_type else None,
-                "support_type": {
-                    "id": case.support_type.id,
-                    "name": case.support_type.name
-                } if case.support_type else None,
-                "status": {
-                    "id": case.status.id,
-                    "name": case.status.name,
-                    "color": case.status.color
-                } if case.status else None,
-                "assignments": [
-                    {
-                        "id": a.id,
-                        "user_id": a.user_id,
-                        "user": {
-                            "id": a.user.id,
-                            "full_name": a.user.full_name,
-                            "email": a.user.email
-                        } if a.user else None
-                    } for a in (case.assignments or [])
-                ],
-                "comments": [
-                    {
-                        "id": c.id,
-                        "comment": c.comment,
-                        "is_internal": c.is_internal,
-                        "user": {
-                            "id": c.user.id,
-                            "full_name": c.user.full_name
-                        } if c.user else None
-                    } for c in (case.comments or [])
-                ],
-                "files": [
-                    {
-                        "id": f.id,
-                        "filename": f.original_filename,
-                        "file_path": f.file_path
-                    } for f in (case.files or [])
-                ]
-            }
-            result.append(case_dict)
-        
-        return result
+        if last_case is not None and not q:
+            response.headers[NEXT_CURSOR_HEADER] = encode_case_cursor(last_case)
+        return cases
     except Exception as e:
         logger.exception(f"Error getting cases: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to retrieve cases: {str(e)}")
@@ -202,119 +149,13 @@ async def get_cases(
 @retry_database
 async def get_case(
     case_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get case by ID"""
-    case = db.query(Case).options(
-        joinedload(Case.customer),
-        joinedload(Case.product),
-        joinedload(Case.creator),
-        joinedload(Case.assigned_user),
-        joinedload(Case.department),
-        joinedload(Case.priority_type),
-        joinedload(Case.support_type),
-        joinedload(Case.status),
-        joinedload(Case.assignments).joinedload(CaseAssignment.user),
-        joinedload(Case.comments).joinedload(CaseComment.user),
-        joinedload(Case.files)
-    ).filter(Case.id == case_id).first()
-    if not case:
+    case_dict = await CaseRepository(db).get_serialized(case_id)
+    if not case_dict:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Case not found")
-    
-    # Convert to dict format to avoid DetachedInstanceError
-    case_dict = {
-        "id": case.id,
-        "ticket_number": case.ticket_number,
-        "title": case.title,
-        "description": case.description,
-        "request_date": case.request_date,
-        "customer_id": case.customer_id,
-        "customer_contact_id": case.customer_contact_id,
-        "product_id": case.product_id,
-        "created_by": case.created_by,
-        "assigned_to": case.assigned_to,
-        "department_id": case.department_id,
-        "priority_type_id": case.priority_type_id,
-        "support_type_id": case.support_type_id,
-        "status_id": case.status_id,
-        "solution": case.solution,
-        "start_date": case.start_date,
-        "end_date": case.end_date,
-        "time_spent_minutes": case.time_spent_minutes,
-        "custom_data": case.custom_data,
-        "created_at": case.created_at,
-        "updated_at": case.updated_at,
-        "customer": {
-            "id": case.customer.id,
-            "company_name": case.customer.company_name,
-            "email": case.customer.email,
-            "phone": getattr(case.customer, 'phone', None),
-            "address": getattr(case.customer, 'address', None)
-        } if case.customer else None,
-        "product": {
-            "id": case.product.id,
-            "name": case.product.name,
-            "code": case.product.code
-        } if case.product else None,
-        "creator": {
-            "id": case.creator.id,
-            "full_name": case.creator.full_name,
-            "email": case.creator.email
-        } if case.creator else None,
-        "assigned_user": {
-            "id": case.assigned_user.id,
-            "full_name": case.assigned_user.full_name,
-            "email": case.assigned_user.email
-        } if case.assigned_user else None,
-        "department": {
-            "id": case.department.id,
-            "name": case.department.name
-        } if case.department else None,
-        "priority_type": {
-            "id": case.priority_type.id,
-            "name": case.priority_type.name,
-            "color": case.priority_type.color
-        } if case.priority_type else None,
-        "support_type": {
-            "id": case.support_type.id,
-            "name": case.support_type.name
-        } if case.support_type else None,
-        "status": {
-            "id": case.status.id,
-            "name": case.status.name,
-            "color": case.status.color
-        } if case.status else None,
-        "assignments": [
-            {
-                "id": a.id,
-                "user_id": a.user_id,
-                "user": {
-                    "id": a.user.id,
-                    "full_name": a.user.full_name,
-                    "email": a.user.email
-                } if a.user else None
-            } for a in (case.assignments or [])
-        ],
-        "comments": [
-            {
-                "id": c.id,
-                "comment": c.comment,
-                "is_internal": c.is_internal,
-                "user": {
-                    "id": c.user.id,
-                    "full_name": c.user.full_name
-                } if c.user else None
-            } for c in (case.comments or [])
-        ],
-        "files": [
-            {
-                "id": f.id,
-                "filename": f.original_filename,
-                "file_path": f.file_path
-            } for f in (case.files or [])
-        ]
-    }
     return case_dict
 
 
@@ -322,8 +163,8 @@ async def get_case(
 @retry_database
 async def create_case(
     case_data: CaseCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Create new case"""
     try:
@@ -340,20 +181,8 @@ async def create_case(
                 detail="Müşteri seçilmelidir"
             )
         
-        # Generate unique ticket number (sequential by year)
-        ticket_number = generate_ticket_number(db)
-        # Ensure uniqueness (should not happen with sequential numbering, but safety check)
-        max_retries = 10
-        retry_count = 0
-        while db.query(Case).filter(Case.ticket_number == ticket_number).first() and retry_count < max_retries:
-            ticket_number = generate_ticket_number(db)
-            retry_count += 1
-        
-        if retry_count >= max_retries:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Ticket numarası oluşturulamadı. Lütfen tekrar deneyin."
-            )
+        # Allocate unique ticket number (sequential by year, atomic per-year counter)
+        ticket_number = await generate_ticket_number(db)
         
         # Set request_date if not provided
         request_date = case_data.request_date or datetime.now()
@@ -380,7 +209,7 @@ async def create_case(
             created_by=current_user.id
         )
         db.add(case)
-        db.flush()
+        await db.flush()
         
         # Assign users if provided
         if case_data.assigned_user_ids:
@@ -388,130 +217,24 @@ async def create_case(
                 assignment = CaseAssignment(case_id=case.id, user_id=user_id)
                 db.add(assignment)
         
-        db.commit()
-        
-        # Reload case with all relationships to avoid DetachedInstanceError
-        case = db.query(Case).options(
-            joinedload(Case.customer),
-            joinedload(Case.product),
-            joinedload(Case.creator),
-            joinedload(Case.assigned_user),
-            joinedload(Case.department),
-            joinedload(Case.priority_type),
-            joinedload(Case.support_type),
-            joinedload(Case.status),
-            joinedload(Case.assignments).joinedload(CaseAssignment.user),
-            joinedload(Case.comments).joinedload(CaseComment.user),
-            joinedload(Case.files)
-        ).filter(Case.id == case.id).first()
+        await db.commit()
         
-        # Convert to dict format to avoid DetachedInstanceError and ResponseValidationError
-        case_dict = {
-            "id": case.id,
-            "ticket_number": case.ticket_number,
-            "title": case.title,
-            "description": case.description,
-            "request_date": case.request_date,
-            "customer_id": case.customer_id,
-            "customer_contact_id": case.customer_contact_id,
-            "product_id": case.product_id,
-            "created_by": case.created_by,
-            "assigned_to": case.assigned_to,
-            "department_id": case.department_id,
-            "priority_type_id": case.priority_type_id,
-            "support_type_id": case.support_type_id,
-            "status_id": case.status_id,
-            "solution": case.solution,
-            "start_date": case.start_date,
-            "end_date": case.end_date,
-            "time_spent_minutes": case.time_spent_minutes,
-            "custom_data": case.custom_data,
-            "created_at": case.created_at,
-            "updated_at": case.updated_at,
-            "customer": {
-                "id": case.customer.id,
-                "company_name": case.customer.company_name,
-                "email": case.customer.email,
-                "phone": getattr(case.customer, 'phone', None),
-                "address": getattr(case.customer, 'address', None)
-            } if case.customer else None,
-            "product": {
-                "id": case.product.id,
-                "name": case.product.name,
-                "code": case.product.code
-            } if case.product else None,
-            "creator": {
-                "id": case.creator.id,
-                "full_name": case.creator.full_name,
-                "email": case.creator.email
-            } if case.creator else None,
-            "assigned_user": {
-                "id": case.assigned_user.id,
-                "full_name": case.assigned_user.full_name,
-                "email": case.assigned_user.email
-            } if case.assigned_user else None,
-            "department": {
-                "id": case.department.id,
-                "name": case.department.name
-            } if case.department else None,
-            "priority_type": {
-                "id": case.priority_type.id,
-                "name": case.priority_type.name,
-                "color": case.priority_type.color
-            } if case.priority_type else None,
-            "support_type": {
-                "id": case.support_type.id,
-                "name": case.support_type.name
-            } if case.support_type else None,
-            "status": {
-                "id": case.status.id,
-                "name": case.status.name,
-                "color": case.status.color
-            } if case.status else None,
-            "assignments": [
-                {
-                    "id": a.id,
-                    "user_id": a.user_id,
-                    "user": {
-                        "id": a.user.id,
-                        "full_name": a.user.full_name,
-                        "email": a.user.email
-                    } if a.user else None
-                } for a in (case.assignments or [])
-            ],
-            "comments": [
-                {
-                    "id": c.id,
-                    "comment": c.comment,
-                    "is_internal": c.is_internal,
-                    "user": {
-                        "id": c.user.id,
-                        "full_name": c.user.full_name
-                    } if c.user else None
-                } for c in (case.comments or [])
-            ],
-            "files": [
-                {
-                    "id": f.id,
-                    "filename": f.original_filename,
-                    "file_path": f.file_path
-                } for f in (case.files or [])
-            ]
-        }
+        # Reload case with all relationships for the response
+        case_dict = await CaseRepository(db).get_serialized(case.id)
         
-        logger.info(f"Case created: {case.id} (Ticket: {ticket_number}) by user {current_user.id}")
+        logger.info(f"Case created: {case_dict['id']} (Ticket: {ticket_number}) by user {current_user.id}")
         return case_dict
     except HTTPException:
         raise
     except ValueError as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Validation error creating case: {e}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Geçersiz veri: {str(e)}"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error creating case: {e}")
         error_detail = str(e)
         # Don't expose internal database errors to client
@@ -528,11 +251,11 @@ async def create_case(
 async def update_case(
     case_id: int,
     case_data: CaseUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Update case"""
-    case = db.query(Case).filter(Case.id == case_id).first()
+    case = await db.scalar(select(Case).where(Case.id == case_id))
     if not case:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Case not found")
     
@@ -540,12 +263,11 @@ async def update_case(
         update_data = case_data.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(case, field, value)
-        db.commit()
-        db.refresh(case)
+        await db.commit()
         logger.info(f"Case updated: {case.id} by user {current_user.id}")
-        return case
+        return await CaseRepository(db).get_serialized(case.id)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error updating case: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update case")
 
@@ -555,18 +277,17 @@ async def update_case(
 async def close_case(
     case_id: int,
     close_data: CaseClose,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Close case"""
-    from app.models.support_status import SupportStatus
-    case = db.query(Case).filter(Case.id == case_id).first()
+    case = await db.scalar(select(Case).where(Case.id == case_id))
     if not case:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Case not found")
     
     try:
         # Find "Tamamlanan" status
-        completed_status = db.query(SupportStatus).filter(SupportStatus.name == "Tamamlanan").first()
+        completed_status = await reference_cache.get_by_name(db, "support_statuses", COMPLETED_STATUS_NAME)
         if not completed_status:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Tamamlanan durumu bulunamadı")
         
@@ -581,23 +302,23 @@ async def close_case(
         
         # Add assigned users if provided
         if close_data.assigned_user_ids:
+            existing_user_ids = set((await db.scalars(select(CaseAssignment.user_id).where(
+                CaseAssignment.case_id == case.id,
+                CaseAssignment.user_id.in_(close_data.assigned_user_ids)
+            ))).all())
             for user_id in close_data.assigned_user_ids:
-                existing = db.query(CaseAssignment).filter(
-                    CaseAssignment.case_id == case.id,
-                    CaseAssignment.user_id == user_id
-                ).first()
-                if not existing:
+                if user_id not in existing_user_ids:
                     assignment = CaseAssignment(case_id=case.id, user_id=user_id)
                     db.add(assignment)
+                    existing_user_ids.add(user_id)
         
-        db.commit()
-        db.refresh(case)
+        await db.commit()
         logger.info(f"Case closed: {case.id} by user {current_user.id}")
-        return case
+        return await CaseRepository(db).get_serialized(case.id)
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error closing case: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to close case")
 
@@ -607,23 +328,22 @@ async def close_case(
 async def assign_case(
     case_id: int,
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Assign case to user"""
-    case = db.query(Case).filter(Case.id == case_id).first()
+    case = await db.scalar(select(Case).where(Case.id == case_id))
     if not case:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Case not found")
     
     try:
         assignment = CaseAssignment(case_id=case.id, user_id=user_id)
         db.add(assignment)
-        db.commit()
-        db.refresh(case)
+        await db.commit()
         logger.info(f"Case {case.id} assigned to user {user_id} by user {current_user.id}")
-        return case
+        return await CaseRepository(db).get_serialized(case.id)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error assigning case: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to assign case")
 
@@ -633,11 +353,11 @@ async def assign_case(
 async def add_comment(
     case_id: int,
     comment_data: CaseCommentCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Add comment to case"""
-    case = db.query(Case).filter(Case.id == case_id).first()
+    case = await db.scalar(select(Case).where(Case.id == case_id))
     if not case:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Case not found")
     
@@ -649,12 +369,12 @@ async def add_comment(
             is_internal=comment_data.is_internal
         )
         db.add(comment)
-        db.commit()
-        db.refresh(comment)
+        await db.commit()
+        await db.refresh(comment)
         logger.info(f"Comment added to case {case.id} by user {current_user.id}")
         return {"id": comment.id, "message": "Comment added successfully"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error adding comment: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to add comment")
 
@@ -664,11 +384,11 @@ async def add_comment(
 async def upload_file(
     case_id: int,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Upload file to case"""
-    case = db.query(Case).filter(Case.id == case_id).first()
+    case = await db.scalar(select(Case).where(Case.id == case_id))
     if not case:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Case not found")
     
@@ -689,11 +409,11 @@ async def upload_file(
             uploaded_by=current_user.id
         )
         db.add(case_file)
-        db.commit()
+        await db.commit()
         logger.info(f"File uploaded to case {case.id} by user {current_user.id}")
         return {"id": case_file.id, "message": "File uploaded successfully"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error uploading file: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to upload file")
 
@@ -1,52 +1,88 @@
 """
 Customer API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import select, delete, exists, or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.database import get_db
+from app.database import get_async_db
 from app.models.customer import Customer
 from app.models.customer_contact import CustomerContact
 from app.models.product import Product, CustomerProduct
+from app.models.product_category import ProductCategory
+from app.models.product_brand import ProductBrand
 from app.schemas.customer import CustomerCreate, CustomerUpdate, CustomerResponse
 from sqlalchemy.orm import joinedload
 from app.auth.dependencies import get_current_active_user, require_admin_or_manager, require_admin
-from app.models.user import User
+from app.auth.principal import Principal
 from app.utils.logger import get_logger
+from app.utils.etag import table_state_etag, etag_matches, set_etag, not_modified
 from app.utils.retry import retry_database
+from app.utils.search import escape_like, like_pattern, looks_like_email, looks_like_tax_number
 
 logger = get_logger("api.customers")
 router = APIRouter(prefix="/api/customers", tags=["Customers"])
 
+# Tables whose rows appear in the customer list (list ETag)
+CUSTOMER_LIST_TABLES = (Customer, CustomerProduct, CustomerContact, Product, ProductCategory, ProductBrand)
+
 
 @router.get("/", response_model=List[CustomerResponse])
 @retry_database
 async def get_customers(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     search: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
-    """Get list of customers with pagination and search"""
+    """
+    Get list of customers with pagination and search
+    
+    A search term that is a complete tax number or email is looked up exactly first;
+    otherwise (or when nothing matches exactly) company name, email and tax number are
+    searched by fragment through trigram indexes and ranked by similarity.
+    """
     try:
-        query = db.query(Customer)
+        etag = await table_state_etag(db, CUSTOMER_LIST_TABLES, request)
+        if etag_matches(request, etag):
+            return not_modified(etag)
         
-        if search:
-            query = query.filter(
-                Customer.company_name.ilike(f"%{search}%") |
-                Customer.email.ilike(f"%{search}%") |
-                Customer.tax_number.ilike(f"%{search}%")
-            )
+        query = select(Customer)
+        search = search.strip() if search else None
         
-        from app.models.product_category import ProductCategory
-        from app.models.product_brand import ProductBrand
+        if search:
+            exact_match = None
+            if looks_like_tax_number(search):
+                exact_match = Customer.tax_number == search
+            elif looks_like_email(search):
+                exact_match = Customer.email.ilike(escape_like(search))
+            
+            if exact_match is not None and await db.scalar(select(exists().where(exact_match))):
+                query = query.where(exact_match).order_by(Customer.id)
+            else:
+                pattern = like_pattern(search)
+                query = query.where(or_(
+                    Customer.company_name.ilike(pattern),
+                    Customer.email.ilike(pattern),
+                    Customer.tax_number.ilike(pattern),
+                    Customer.company_name.op("%")(search)  # tolerates typos in the name
+                )).order_by(
+                    func.greatest(
+                        func.similarity(Customer.company_name, search),
+                        func.similarity(Customer.email, search),
+                        func.similarity(Customer.tax_number, search)
+                    ).desc(),
+                    Customer.id
+                )
         
-        customers = query.options(
+        customers = (await db.scalars(query.options(
             joinedload(Customer.products).joinedload(CustomerProduct.product).joinedload(Product.category),
             joinedload(Customer.products).joinedload(CustomerProduct.product).joinedload(Product.brand),
             joinedload(Customer.contacts)
-        ).offset(skip).limit(limit).all()
+        ).offset(skip).limit(limit))).unique().all()
         
         # Format response
         result = []
@@ -79,6 +115,7 @@ async def get_customers(
             }
             result.append(customer_dict)
         
+        set_etag(response, etag)
         return result
     except Exception as e:
         logger.exception(f"Error getting customers: {e}")
@@ -92,19 +129,19 @@ async def get_customers(
 @retry_database
 async def get_customer(
     customer_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get customer by ID"""
     from sqlalchemy.orm import joinedload
     from app.models.product_category import ProductCategory
     from app.models.product_brand import ProductBrand
     
-    customer = db.query(Customer).options(
+    customer = await db.scalar(select(Customer).options(
         joinedload(Customer.products).joinedload(CustomerProduct.product).joinedload(Product.category),
         joinedload(Customer.products).joinedload(CustomerProduct.product).joinedload(Product.brand),
         joinedload(Customer.contacts)
-    ).filter(Customer.id == customer_id).first()
+    ).where(Customer.id == customer_id))
     if not customer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -145,14 +182,14 @@ async def get_customer(
 @retry_database
 async def create_customer(
     customer_data: CustomerCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_or_manager)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin_or_manager)
 ):
     """Create new customer"""
     try:
         # Check if customer with same email exists
         if customer_data.email:
-            existing = db.query(Customer).filter(Customer.email == customer_data.email).first()
+            existing = await db.scalar(select(Customer).where(Customer.email == customer_data.email))
             if existing:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -163,12 +200,12 @@ async def create_customer(
         customer_dict = customer_data.dict(exclude={"product_ids", "contacts"})
         customer = Customer(**customer_dict)
         db.add(customer)
-        db.flush()
+        await db.flush()
         
         # Add products if provided
         if customer_data.product_ids:
             for product_id in customer_data.product_ids:
-                product = db.query(Product).filter(Product.id == product_id).first()
+                product = await db.scalar(select(Product).where(Product.id == product_id))
                 if product:
                     customer_product = CustomerProduct(
                         customer_id=customer.id,
@@ -185,14 +222,14 @@ async def create_customer(
                 )
                 db.add(contact)
         
-        db.commit()
-        db.refresh(customer)
+        await db.commit()
+        await db.refresh(customer)
         
         # Load relationships for response
-        customer = db.query(Customer).options(
+        customer = await db.scalar(select(Customer).options(
             joinedload(Customer.products).joinedload(CustomerProduct.product),
             joinedload(Customer.contacts)
-        ).filter(Customer.id == customer.id).first()
+        ).where(Customer.id == customer.id))
         
         logger.info(f"Customer created: {customer.id} by user {current_user.id}")
         
@@ -215,7 +252,7 @@ async def create_customer(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error creating customer: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -228,11 +265,11 @@ async def create_customer(
 async def update_customer(
     customer_id: int,
     customer_data: CustomerUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_or_manager)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin_or_manager)
 ):
     """Update customer"""
-    customer = db.query(Customer).filter(Customer.id == customer_id).first()
+    customer = await db.scalar(select(Customer).where(Customer.id == customer_id))
     if not customer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -247,11 +284,11 @@ async def update_customer(
         # Update products if provided
         if "product_ids" in customer_data.dict(exclude_unset=True):
             # Remove existing products
-            db.query(CustomerProduct).filter(CustomerProduct.customer_id == customer_id).delete()
+            await db.execute(delete(CustomerProduct).where(CustomerProduct.customer_id == customer_id))
             # Add new products
             if customer_data.product_ids:
                 for product_id in customer_data.product_ids:
-                    product = db.query(Product).filter(Product.id == product_id).first()
+                    product = await db.scalar(select(Product).where(Product.id == product_id))
                     if product:
                         customer_product = CustomerProduct(
                             customer_id=customer.id,
@@ -262,7 +299,7 @@ async def update_customer(
         # Update contacts if provided
         if "contacts" in customer_data.dict(exclude_unset=True):
             # Remove existing contacts
-            db.query(CustomerContact).filter(CustomerContact.customer_id == customer_id).delete()
+            await db.execute(delete(CustomerContact).where(CustomerContact.customer_id == customer_id))
             # Add new contacts
             if customer_data.contacts:
                 for contact_data in customer_data.contacts:
@@ -272,14 +309,14 @@ async def update_customer(
                     )
                     db.add(contact)
         
-        db.commit()
-        db.refresh(customer)
+        await db.commit()
+        await db.refresh(customer)
         
         # Load relationships for response
-        customer = db.query(Customer).options(
+        customer = await db.scalar(select(Customer).options(
             joinedload(Customer.products).joinedload(CustomerProduct.product),
             joinedload(Customer.contacts)
-        ).filter(Customer.id == customer.id).first()
+        ).where(Customer.id == customer.id))
         
         logger.info(f"Customer updated: {customer.id} by user {current_user.id}")
         
@@ -300,7 +337,7 @@ async def update_customer(
         return customer_dict
     
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error updating customer: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -312,11 +349,11 @@ async def update_customer(
 @retry_database
 async def delete_customer(
     customer_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin)
 ):
     """Delete customer"""
-    customer = db.query(Customer).filter(Customer.id == customer_id).first()
+    customer = await db.scalar(select(Customer).where(Customer.id == customer_id))
     if not customer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -324,11 +361,11 @@ async def delete_customer(
         )
     
     try:
-        db.delete(customer)
-        db.commit()
+        await db.delete(customer)
+        await db.commit()
         logger.info(f"Customer deleted: {customer_id} by user {current_user.id}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error deleting customer: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
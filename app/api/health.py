@@ -0,0 +1,54 @@
+"""
+Liveness and readiness endpoints (load balancers, container health checks)
+"""
+import asyncio
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+from app.auth.dependencies import has_monitoring_access
+from app.config import config
+from app.database import ping_async_database, get_async_pool_status
+from app.utils.logger import get_logger
+from app.utils.performance import get_monitor
+
+logger = get_logger("api.health")
+router = APIRouter(prefix="/health", tags=["Health"])
+
+# Readiness fails when the database does not answer within this many seconds
+DB_PING_TIMEOUT_SECONDS = config.get('health.db_timeout_seconds', 2)
+
+
+@router.get("/live")
+async def liveness():
+    """The process is up and its event loop is serving requests (no I/O)"""
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def readiness(detailed: bool = Depends(has_monitoring_access)):
+    """
+    The instance can serve traffic: the database answers within the timeout
+
+    Clients with monitoring access also get connection pool saturation and the
+    latest sample of the performance monitor thread (nothing is measured inline).
+    """
+    checks = {"database": "ok"}
+    ready = True
+    try:
+        await ping_async_database(timeout=DB_PING_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        checks["database"] = f"timeout after {DB_PING_TIMEOUT_SECONDS}s"
+        ready = False
+    except Exception as e:
+        logger.warning(f"Readiness database check failed: {e}")
+        checks["database"] = "unavailable"
+        ready = False
+
+    content = {"status": "ready" if ready else "not_ready", "checks": checks}
+    if detailed:
+        monitor = get_monitor()
+        content["pool"] = get_async_pool_status()
+        content["performance"] = monitor.get_latest_metrics() if monitor else None
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=content
+    )
@@ -1,10 +1,11 @@
 """
 Priority Type API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.database import get_db
+from app.database import get_async_db
 from app.models.priority_type import PriorityType
 from app.schemas.priority_type import (
     PriorityTypeCreate,
@@ -12,8 +13,10 @@ from app.schemas.priority_type import (
     PriorityTypeResponse,
 )
 from app.auth.dependencies import get_current_active_user, require_admin
-from app.models.user import User
+from app.auth.principal import Principal
 from app.utils.logger import get_logger
+from app.services.reference_cache import reference_cache
+from app.utils.etag import etag_matches, set_etag, not_modified
 from app.utils.retry import retry_database
 
 logger = get_logger("api.priority_type")
@@ -23,17 +26,18 @@ router = APIRouter(prefix="/api/priority-types", tags=["Priority Types"])
 @router.get("/", response_model=List[PriorityTypeResponse])
 @retry_database
 async def get_priority_types(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user),
 ):
     """List priority types"""
     try:
-        priorities = (
-            db.query(PriorityType)
-            .order_by(PriorityType.sort_order, PriorityType.name)
-            .all()
-        )
-        return priorities
+        rows, etag = await reference_cache.get_tagged(db, "priority_types")
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        return rows
     except Exception as exc:
         logger.exception("Error getting priority types: %s", exc)
         raise HTTPException(
@@ -46,12 +50,12 @@ async def get_priority_types(
 @retry_database
 async def create_priority_type(
     priority_data: PriorityTypeCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin),
 ):
     """Create priority type (admin)"""
     try:
-        existing = db.query(PriorityType).filter(PriorityType.name == priority_data.name).first()
+        existing = await db.scalar(select(PriorityType).where(PriorityType.name == priority_data.name))
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -60,14 +64,15 @@ async def create_priority_type(
 
         priority = PriorityType(**priority_data.dict(exclude_unset=True))
         db.add(priority)
-        db.commit()
-        db.refresh(priority)
+        await db.commit()
+        reference_cache.invalidate()
+        await db.refresh(priority)
         logger.info("Priority type created: %s by admin %s", priority.id, current_user.id)
         return priority
     except HTTPException:
         raise
     except Exception as exc:
-        db.rollback()
+        await db.rollback()
         logger.exception("Error creating priority type: %s", exc)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -80,20 +85,19 @@ async def create_priority_type(
 async def update_priority_type(
     priority_id: int,
     priority_data: PriorityTypeUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin),
 ):
     """Update priority type (admin)"""
-    priority = db.query(PriorityType).filter(PriorityType.id == priority_id).first()
+    priority = await db.scalar(select(PriorityType).where(PriorityType.id == priority_id))
     if not priority:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Öncelik tipi bulunamadı")
 
     try:
         if priority_data.name:
-            existing = (
-                db.query(PriorityType)
-                .filter(PriorityType.name == priority_data.name, PriorityType.id != priority_id)
-                .first()
+            existing = await db.scalar(
+                select(PriorityType)
+                .where(PriorityType.name == priority_data.name, PriorityType.id != priority_id)
             )
             if existing:
                 raise HTTPException(
@@ -105,14 +109,15 @@ async def update_priority_type(
         for field, value in update_data.items():
             setattr(priority, field, value)
 
-        db.commit()
-        db.refresh(priority)
+        await db.commit()
+        reference_cache.invalidate()
+        await db.refresh(priority)
         logger.info("Priority type updated: %s by admin %s", priority_id, current_user.id)
         return priority
     except HTTPException:
         raise
     except Exception as exc:
-        db.rollback()
+        await db.rollback()
         logger.exception("Error updating priority type: %s", exc)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -124,20 +129,21 @@ async def update_priority_type(
 @retry_database
 async def delete_priority_type(
     priority_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin),
 ):
     """Delete priority type (admin)"""
-    priority = db.query(PriorityType).filter(PriorityType.id == priority_id).first()
+    priority = await db.scalar(select(PriorityType).where(PriorityType.id == priority_id))
     if not priority:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Öncelik tipi bulunamadı")
 
     try:
-        db.delete(priority)
-        db.commit()
+        await db.delete(priority)
+        await db.commit()
+        reference_cache.invalidate()
         logger.info("Priority type deleted: %s by admin %s", priority_id, current_user.id)
     except Exception as exc:
-        db.rollback()
+        await db.rollback()
         logger.exception("Error deleting priority type: %s", exc)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
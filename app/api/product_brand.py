@@ -1,11 +1,12 @@
 """
 Product Brand API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from sqlalchemy.orm import joinedload
-from app.database import get_db
+from app.database import get_async_db
 from app.models.product_brand import ProductBrand
 from app.models.product_category import ProductCategory
 from app.schemas.product_brand import (
@@ -14,8 +15,10 @@ from app.schemas.product_brand import (
     ProductBrandResponse,
 )
 from app.auth.dependencies import get_current_active_user, require_admin
-from app.models.user import User
+from app.auth.principal import Principal
 from app.utils.logger import get_logger
+from app.services.reference_cache import reference_cache
+from app.utils.etag import etag_matches, set_etag, not_modified
 from app.utils.retry import retry_database
 
 logger = get_logger("api.product_brand")
@@ -25,18 +28,18 @@ router = APIRouter(prefix="/api/product-brands", tags=["Product Brands"])
 @router.get("/", response_model=List[ProductBrandResponse])
 @retry_database
 async def get_product_brands(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user),
 ):
     """List product brands"""
     try:
-        brands = (
-            db.query(ProductBrand)
-            .options(joinedload(ProductBrand.category))
-            .order_by(ProductBrand.sort_order, ProductBrand.name)
-            .all()
-        )
-        return brands
+        rows, etag = await reference_cache.get_tagged(db, "product_brands")
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        return rows
     except Exception as exc:
         logger.exception("Error getting product brands: %s", exc)
         raise HTTPException(
@@ -49,12 +52,12 @@ async def get_product_brands(
 @retry_database
 async def create_product_brand(
     brand_data: ProductBrandCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin),
 ):
     """Create product brand (admin)"""
     try:
-        existing = db.query(ProductBrand).filter(ProductBrand.name == brand_data.name).first()
+        existing = await db.scalar(select(ProductBrand).where(ProductBrand.name == brand_data.name))
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -63,7 +66,7 @@ async def create_product_brand(
         
         # Validate category if provided
         if brand_data.category_id:
-            category = db.query(ProductCategory).filter(ProductCategory.id == brand_data.category_id).first()
+            category = await db.scalar(select(ProductCategory).where(ProductCategory.id == brand_data.category_id))
             if not category:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -77,16 +80,17 @@ async def create_product_brand(
         
         brand = ProductBrand(**brand_data_dict)
         db.add(brand)
-        db.commit()
-        db.refresh(brand)
+        await db.commit()
+        reference_cache.invalidate()
+        await db.refresh(brand)
         # Reload with category relationship
-        brand = db.query(ProductBrand).options(joinedload(ProductBrand.category)).filter(ProductBrand.id == brand.id).first()
+        brand = await db.scalar(select(ProductBrand).options(joinedload(ProductBrand.category)).where(ProductBrand.id == brand.id))
         logger.info("Product brand created: %s by admin %s", brand.id, current_user.id)
         return brand
     except HTTPException:
         raise
     except Exception as exc:
-        db.rollback()
+        await db.rollback()
         logger.exception("Error creating product brand: %s", exc)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -99,20 +103,19 @@ async def create_product_brand(
 async def update_product_brand(
     brand_id: int,
     brand_data: ProductBrandUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin),
 ):
     """Update product brand (admin)"""
-    brand = db.query(ProductBrand).filter(ProductBrand.id == brand_id).first()
+    brand = await db.scalar(select(ProductBrand).where(ProductBrand.id == brand_id))
     if not brand:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Marka bulunamadı")
 
     try:
         if brand_data.name:
-            existing = (
-                db.query(ProductBrand)
-                .filter(ProductBrand.name == brand_data.name, ProductBrand.id != brand_id)
-                .first()
+            existing = await db.scalar(
+                select(ProductBrand)
+                .where(ProductBrand.name == brand_data.name, ProductBrand.id != brand_id)
             )
             if existing:
                 raise HTTPException(
@@ -123,7 +126,7 @@ async def update_product_brand(
         # Validate category if provided
         update_data = brand_data.dict(exclude_unset=True)
         if 'category_id' in update_data and update_data['category_id']:
-            category = db.query(ProductCategory).filter(ProductCategory.id == update_data['category_id']).first()
+            category = await db.scalar(select(ProductCategory).where(ProductCategory.id == update_data['category_id']))
             if not category:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -133,16 +136,17 @@ async def update_product_brand(
         for field, value in update_data.items():
             setattr(brand, field, value)
 
-        db.commit()
-        db.refresh(brand)
+        await db.commit()
+        reference_cache.invalidate()
+        await db.refresh(brand)
         # Reload with category relationship
-        brand = db.query(ProductBrand).options(joinedload(ProductBrand.category)).filter(ProductBrand.id == brand_id).first()
+        brand = await db.scalar(select(ProductBrand).options(joinedload(ProductBrand.category)).where(ProductBrand.id == brand_id))
         logger.info("Product brand updated: %s by admin %s", brand_id, current_user.id)
         return brand
     except HTTPException:
         raise
     except Exception as exc:
-        db.rollback()
+        await db.rollback()
         logger.exception("Error updating product brand: %s", exc)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -154,20 +158,21 @@ async def update_product_brand(
 @retry_database
 async def delete_product_brand(
     brand_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin),
 ):
     """Delete product brand (admin)"""
-    brand = db.query(ProductBrand).filter(ProductBrand.id == brand_id).first()
+    brand = await db.scalar(select(ProductBrand).where(ProductBrand.id == brand_id))
     if not brand:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Marka bulunamadı")
 
     try:
-        db.delete(brand)
-        db.commit()
+        await db.delete(brand)
+        await db.commit()
+        reference_cache.invalidate()
         logger.info("Product brand deleted: %s by admin %s", brand_id, current_user.id)
     except Exception as exc:
-        db.rollback()
+        await db.rollback()
         logger.exception("Error deleting product brand: %s", exc)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,10 +1,11 @@
 """
 Product Category API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.database import get_db
+from app.database import get_async_db
 from app.models.product_category import ProductCategory
 from app.schemas.product_category import (
     ProductCategoryCreate,
@@ -12,8 +13,10 @@ from app.schemas.product_category import (
     ProductCategoryResponse,
 )
 from app.auth.dependencies import get_current_active_user, require_admin
-from app.models.user import User
+from app.auth.principal import Principal
 from app.utils.logger import get_logger
+from app.services.reference_cache import reference_cache
+from app.utils.etag import etag_matches, set_etag, not_modified
 from app.utils.retry import retry_database
 
 logger = get_logger("api.product_category")
@@ -23,17 +26,18 @@ router = APIRouter(prefix="/api/product-categories", tags=["Product Categories"]
 @router.get("/", response_model=List[ProductCategoryResponse])
 @retry_database
 async def get_product_categories(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user),
 ):
     """List product categories"""
     try:
-        categories = (
-            db.query(ProductCategory)
-            .order_by(ProductCategory.sort_order, ProductCategory.name)
-            .all()
-        )
-        return categories
+        rows, etag = await reference_cache.get_tagged(db, "product_categories")
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        return rows
     except Exception as exc:
         logger.exception("Error getting product categories: %s", exc)
         raise HTTPException(
@@ -46,12 +50,12 @@ async def get_product_categories(
 @retry_database
 async def create_product_category(
     category_data: ProductCategoryCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin),
 ):
     """Create product category (admin)"""
     try:
-        existing = db.query(ProductCategory).filter(ProductCategory.name == category_data.name).first()
+        existing = await db.scalar(select(ProductCategory).where(ProductCategory.name == category_data.name))
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -60,14 +64,15 @@ async def create_product_category(
 
         category = ProductCategory(**category_data.dict(exclude_unset=True))
         db.add(category)
-        db.commit()
-        db.refresh(category)
+        await db.commit()
+        reference_cache.invalidate()
+        await db.refresh(category)
         logger.info("Product category created: %s by admin %s", category.id, current_user.id)
         return category
     except HTTPException:
         raise
     except Exception as exc:
-        db.rollback()
+        await db.rollback()
         logger.exception("Error creating product category: %s", exc)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -80,20 +85,19 @@ async def create_product_category(
 async def update_product_category(
     category_id: int,
     category_data: ProductCategoryUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin),
 ):
     """Update product category (admin)"""
-    category = db.query(ProductCategory).filter(ProductCategory.id == category_id).first()
+    category = await db.scalar(select(ProductCategory).where(ProductCategory.id == category_id))
     if not category:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Kategori bulunamadı")
 
     try:
         if category_data.name:
-            existing = (
-                db.query(ProductCategory)
-                .filter(ProductCategory.name == category_data.name, ProductCategory.id != category_id)
-                .first()
+            existing = await db.scalar(
+                select(ProductCategory)
+                .where(ProductCategory.name == category_data.name, ProductCategory.id != category_id)
             )
             if existing:
                 raise HTTPException(
@@ -105,14 +109,15 @@ async def update_product_category(
         for field, value in update_data.items():
             setattr(category, field, value)
 
-        db.commit()
-        db.refresh(category)
+        await db.commit()
+        reference_cache.invalidate()
+        await db.refresh(category)
         logger.info("Product category updated: %s by admin %s", category_id, current_user.id)
         return category
     except HTTPException:
         raise
     except Exception as exc:
-        db.rollback()
+        await db.rollback()
         logger.exception("Error updating product category: %s", exc)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -124,20 +129,21 @@ async def update_product_category(
 @retry_database
 async def delete_product_category(
     category_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin),
 ):
     """Delete product category (admin)"""
-    category = db.query(ProductCategory).filter(ProductCategory.id == category_id).first()
+    category = await db.scalar(select(ProductCategory).where(ProductCategory.id == category_id))
     if not category:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Kategori bulunamadı")
 
     try:
-        db.delete(category)
-        db.commit()
+        await db.delete(category)
+        await db.commit()
+        reference_cache.invalidate()
         logger.info("Product category deleted: %s by admin %s", category_id, current_user.id)
     except Exception as exc:
-        db.rollback()
+        await db.rollback()
         logger.exception("Error deleting product category: %s", exc)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,41 +1,54 @@
 """
 Product API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List, Optional
-from app.database import get_db
+from app.database import get_async_db
 from app.models.product import Product
 from app.models.product_category import ProductCategory
 from app.models.product_brand import ProductBrand
 from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse
 from app.auth.dependencies import get_current_active_user, require_admin_or_manager, require_admin
-from app.models.user import User
+from app.auth.principal import Principal
 from app.utils.logger import get_logger
+from app.utils.etag import table_state_etag, etag_matches, set_etag, not_modified
 from app.utils.retry import retry_database
 
 logger = get_logger("api.products")
 router = APIRouter(prefix="/api/products", tags=["Products"])
 
+# Tables whose rows appear in the product list (list ETag)
+PRODUCT_LIST_TABLES = (Product, ProductCategory, ProductBrand)
+
 
 @router.get("/", response_model=List[ProductResponse])
 @retry_database
 async def get_products(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     search: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get list of products"""
     try:
-        query = db.query(Product).options(
+        etag = await table_state_etag(db, PRODUCT_LIST_TABLES, request)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        
+        query = select(Product).options(
             joinedload(Product.category),
-            joinedload(Product.brand)
+            joinedload(Product.brand).joinedload(ProductBrand.category)
         )
         if search:
-            query = query.filter(Product.name.ilike(f"%{search}%"))
-        products = query.offset(skip).limit(limit).all()
+            query = query.where(Product.name.ilike(f"%{search}%"))
+        products = (await db.scalars(query.offset(skip).limit(limit))).all()
+        set_etag(response, etag)
         return products
     except Exception as e:
         logger.exception(f"Error getting products: {e}")
@@ -46,14 +59,14 @@ async def get_products(
 @retry_database
 async def get_product(
     product_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get product by ID"""
-    product = db.query(Product).options(
+    product = await db.scalar(select(Product).options(
         joinedload(Product.category),
-        joinedload(Product.brand)
-    ).filter(Product.id == product_id).first()
+        joinedload(Product.brand).joinedload(ProductBrand.category)
+    ).where(Product.id == product_id))
     if not product:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
     return product
@@ -63,14 +76,14 @@ async def get_product(
 @retry_database
 async def create_product(
     product_data: ProductCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_or_manager)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin_or_manager)
 ):
     """Create new product"""
     try:
         # Validate category if provided
         if product_data.category_id:
-            category = db.query(ProductCategory).filter(ProductCategory.id == product_data.category_id).first()
+            category = await db.scalar(select(ProductCategory).where(ProductCategory.id == product_data.category_id))
             if not category:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -79,7 +92,7 @@ async def create_product(
         
         # Validate brand if provided
         if product_data.brand_id:
-            brand = db.query(ProductBrand).filter(ProductBrand.id == product_data.brand_id).first()
+            brand = await db.scalar(select(ProductBrand).where(ProductBrand.id == product_data.brand_id))
             if not brand:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -95,17 +108,17 @@ async def create_product(
         
         product = Product(**product_data_dict)
         db.add(product)
-        db.commit()
-        db.refresh(product)
+        await db.commit()
+        await db.refresh(product)
         # Reload with relationships
-        product = db.query(Product).options(
+        product = await db.scalar(select(Product).options(
             joinedload(Product.category),
-            joinedload(Product.brand)
-        ).filter(Product.id == product.id).first()
+            joinedload(Product.brand).joinedload(ProductBrand.category)
+        ).where(Product.id == product.id))
         logger.info(f"Product created: {product.id} by user {current_user.id}")
         return product
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error creating product: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create product")
 
@@ -115,11 +128,11 @@ async def create_product(
 async def update_product(
     product_id: int,
     product_data: ProductUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_or_manager)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin_or_manager)
 ):
     """Update product"""
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.scalar(select(Product).where(Product.id == product_id))
     if not product:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
     
@@ -128,7 +141,7 @@ async def update_product(
         
         # Validate category if provided
         if 'category_id' in update_data and update_data['category_id']:
-            category = db.query(ProductCategory).filter(ProductCategory.id == update_data['category_id']).first()
+            category = await db.scalar(select(ProductCategory).where(ProductCategory.id == update_data['category_id']))
             if not category:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -139,7 +152,7 @@ async def update_product(
         
         # Validate brand if provided
         if 'brand_id' in update_data and update_data['brand_id']:
-            brand = db.query(ProductBrand).filter(ProductBrand.id == update_data['brand_id']).first()
+            brand = await db.scalar(select(ProductBrand).where(ProductBrand.id == update_data['brand_id']))
             if not brand:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -150,17 +163,17 @@ async def update_product(
         
         for field, value in update_data.items():
             setattr(product, field, value)
-        db.commit()
-        db.refresh(product)
+        await db.commit()
+        await db.refresh(product)
         # Reload with relationships
-        product = db.query(Product).options(
+        product = await db.scalar(select(Product).options(
             joinedload(Product.category),
-            joinedload(Product.brand)
-        ).filter(Product.id == product_id).first()
+            joinedload(Product.brand).joinedload(ProductBrand.category)
+        ).where(Product.id == product_id))
         logger.info(f"Product updated: {product.id} by user {current_user.id}")
         return product
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error updating product: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update product")
 
@@ -169,20 +182,20 @@ async def update_product(
 @retry_database
 async def delete_product(
     product_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin)
 ):
     """Delete product"""
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.scalar(select(Product).where(Product.id == product_id))
     if not product:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
     
     try:
-        db.delete(product)
-        db.commit()
+        await db.delete(product)
+        await db.commit()
         logger.info(f"Product deleted: {product_id} by user {current_user.id}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error deleting product: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete product")
 
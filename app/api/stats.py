@@ -0,0 +1,125 @@
+"""
+Statistics API endpoints
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select, func, cast, tuple_, literal, union_all, true, false, Date
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from app.config import config
+from app.database import get_async_db
+from app.models.case import Case
+from app.auth.dependencies import get_current_active_user
+from app.auth.principal import Principal
+from app.utils.logger import get_logger
+from app.services.reference_cache import reference_cache, COMPLETED_STATUS_NAME
+from app.utils.retry import retry_database
+
+logger = get_logger("api.stats")
+router = APIRouter(prefix="/api/stats", tags=["Statistics"])
+
+TREND_DAYS = 30
+# Calendar days of the trend are counted in this timezone (in Python and in the database)
+TREND_TIMEZONE = ZoneInfo(config.get('stats.timezone', 'UTC'))
+
+# Grouping dimensions: output key -> column. GROUPING(...) returns a bitmask with
+# one bit per column (first column = highest bit) set when the column is rolled up.
+GROUP_DIMENSIONS = (
+    ("by_status", Case.status_id),
+    ("by_priority", Case.priority_type_id),
+    ("by_assignee", Case.assigned_to),
+    ("by_department", Case.department_id),
+)
+_ALL_ROLLED_UP = (1 << len(GROUP_DIMENSIONS)) - 1
+_GROUPING_MASKS = {
+    _ALL_ROLLED_UP & ~(1 << (len(GROUP_DIMENSIONS) - 1 - index)): (index, key)
+    for index, (key, _) in enumerate(GROUP_DIMENSIONS)
+}
+
+
+@router.get("/dashboard", response_model=dict)
+@retry_database
+async def get_dashboard_stats(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Dashboard statistics computed in the database
+
+    Totals by status, priority, assignee and department plus open/closed counts come
+    from a single GROUPING SETS aggregate over cases; the 30-day created/closed trend
+    is a second aggregate query.
+    """
+    try:
+        completed_status = await reference_cache.get_by_name(db, "support_statuses", COMPLETED_STATUS_NAME)
+        completed_status_id = completed_status.id if completed_status else None
+        if completed_status_id is None:
+            is_closed, is_open = false(), true()
+        else:
+            is_closed = Case.status_id == completed_status_id
+            is_open = Case.status_id.is_distinct_from(completed_status_id)
+        columns = [column for _, column in GROUP_DIMENSIONS]
+
+        totals_query = select(
+            func.grouping(*columns).label("grouping"),
+            *columns,
+            func.count().label("total"),
+            func.count().filter(is_open).label("open"),
+            func.count().filter(is_closed).label("closed"),
+            func.count().filter(is_open, Case.assigned_to == current_user.id).label("assigned_to_me"),
+        ).group_by(
+            func.grouping_sets(*(tuple_(column) for column in columns), tuple_())
+        )
+
+        result = {key: [] for key, _ in GROUP_DIMENSIONS}
+        result.update({"total": 0, "open": 0, "closed": 0, "assigned_to_me": 0})
+
+        for row in (await db.execute(totals_query)).all():
+            if row.grouping == _ALL_ROLLED_UP:
+                result.update({
+                    "total": row.total,
+                    "open": row.open,
+                    "closed": row.closed,
+                    "assigned_to_me": row.assigned_to_me
+                })
+                continue
+            index, key = _GROUPING_MASKS[row.grouping]
+            result[key].append({
+                "id": row[1 + index],
+                "total": row.total,
+                "open": row.open,
+                "closed": row.closed
+            })
+
+        # Created/closed per day for the last TREND_DAYS days
+        # timezone() turns the timestamptz into wall-clock time in TREND_TIMEZONE, so
+        # the buckets do not depend on the database session's TimeZone setting. The zone
+        # is rendered inline so SELECT and GROUP BY contain the identical expression.
+        zone = literal(TREND_TIMEZONE.key, literal_execute=True)
+        today = datetime.now(TREND_TIMEZONE).date()
+        first_day = today - timedelta(days=TREND_DAYS - 1)
+        since = datetime.combine(first_day, datetime.min.time(), tzinfo=TREND_TIMEZONE)
+        created_day = cast(func.timezone(zone, Case.created_at), Date)
+        closed_day = cast(func.timezone(zone, Case.end_date), Date)
+        trend_query = union_all(
+            select(created_day.label("day"), literal("created").label("kind"), func.count().label("count"))
+            .where(Case.created_at >= since)
+            .group_by(created_day),
+            select(closed_day.label("day"), literal("closed").label("kind"), func.count().label("count"))
+            .where(Case.end_date >= since, is_closed)
+            .group_by(closed_day),
+        )
+
+        trend = {
+            first_day + timedelta(days=offset): {"created": 0, "closed": 0}
+            for offset in range(TREND_DAYS)
+        }
+        for row in (await db.execute(trend_query)).all():
+            if row.day in trend:
+                trend[row.day][row.kind] = row.count
+
+        result["trend"] = [{"date": day.isoformat(), **counts} for day, counts in trend.items()]
+        return result
+    except Exception as e:
+        logger.exception(f"Error getting dashboard stats: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve dashboard statistics")
@@ -1,35 +1,42 @@
 """
 User management API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 from typing import List, Optional
-from app.database import get_db
-from app.models.user import User, Department, Role
+from app.database import get_async_db
+from app.models.user import Department, Role, user_roles
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, DepartmentCreate, DepartmentResponse, RoleCreate, RoleResponse
 from app.auth.dependencies import get_current_active_user, require_admin
-from app.auth.security import hash_password
+from app.auth.security import hash_password_async
+from app.auth.principal import Principal, principal_cache
 from app.models.user import User as UserModel
 from app.utils.logger import get_logger
+from app.services.reference_cache import reference_cache
+from app.utils.etag import table_state_etag, etag_matches, set_etag, not_modified
 from app.utils.retry import retry_database
 
 logger = get_logger("api.users")
 router = APIRouter(prefix="/api/users", tags=["Users"])
 
+# Tables whose rows appear in user lists (list ETag)
+USER_LIST_TABLES = (UserModel, user_roles, Department, Role)
+
 
 @router.get("/me", response_model=UserResponse)
 @retry_database
 async def get_current_user_info(
-    current_user: UserModel = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get current user information"""
     try:
-        from sqlalchemy.orm import joinedload
-        user = db.query(UserModel).options(
+        user = await db.scalar(select(UserModel).options(
             joinedload(UserModel.department),
-            joinedload(UserModel.roles)
-        ).filter(UserModel.id == current_user.id).first()
+            selectinload(UserModel.roles)
+        ).where(UserModel.id == current_user.id))
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
         return user
@@ -43,18 +50,24 @@ async def get_current_user_info(
 @router.get("/", response_model=List[UserResponse])
 @retry_database
 async def get_users(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(require_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin)
 ):
     """Get list of users (Admin only)"""
     try:
-        from sqlalchemy.orm import joinedload
-        users = db.query(UserModel).options(
+        etag = await table_state_etag(db, USER_LIST_TABLES, request)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        
+        users = (await db.scalars(select(UserModel).options(
             joinedload(UserModel.department),
-            joinedload(UserModel.roles)
-        ).offset(skip).limit(limit).all()
+            selectinload(UserModel.roles)
+        ).offset(skip).limit(limit))).all()
+        set_etag(response, etag)
         return users
     except Exception as e:
         logger.exception(f"Error getting users: {e}")
@@ -65,42 +78,44 @@ async def get_users(
 @retry_database
 async def create_user(
     user_data: UserCreate,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(require_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin)
 ):
     """Create new user (Admin only)"""
     try:
         # Check if user exists
-        existing = db.query(UserModel).filter(UserModel.email == user_data.email).first()
+        existing = await db.scalar(select(UserModel).where(UserModel.email == user_data.email))
         if existing:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User with this email already exists")
         
+        # Resolve roles
+        roles = []
+        if user_data.role_ids:
+            roles = list((await db.scalars(select(Role).where(Role.id.in_(user_data.role_ids)))).all())
+        
         # Create user
         user = UserModel(
             email=user_data.email,
-            password_hash=hash_password(user_data.password),
+            password_hash=await hash_password_async(user_data.password),
             full_name=user_data.full_name,
             department_id=user_data.department_id,
-            is_active=1
+            is_active=1,
+            roles=roles
         )
         db.add(user)
-        db.flush()
-        
-        # Assign roles
-        if user_data.role_ids:
-            for role_id in user_data.role_ids:
-                role = db.query(Role).filter(Role.id == role_id).first()
-                if role:
-                    user.roles.append(role)
+        await db.commit()
         
-        db.commit()
-        db.refresh(user)
+        # Reload with relationships for response
+        user = await db.scalar(select(UserModel).options(
+            joinedload(UserModel.department),
+            selectinload(UserModel.roles)
+        ).where(UserModel.id == user.id).execution_options(populate_existing=True))
         logger.info(f"User created: {user.id} by admin {current_user.id}")
         return user
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error creating user: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create user")
 
@@ -110,11 +125,13 @@ async def create_user(
 async def update_user(
     user_id: int,
     user_data: UserUpdate,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(require_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin)
 ):
     """Update user (Admin only)"""
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
+    user = await db.scalar(select(UserModel).options(
+        selectinload(UserModel.roles)
+    ).where(UserModel.id == user_id))
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
@@ -126,22 +143,27 @@ async def update_user(
         
         # Update password if provided
         if user_data.password:
-            user.password_hash = hash_password(user_data.password)
+            user.password_hash = await hash_password_async(user_data.password)
         
-        # Update roles if provided
+        # Update roles if provided (touch updated_at: user_roles has no timestamp of its own;
+        # bump role_version so tokens carrying the old role claims are detected)
         if user_data.role_ids is not None:
-            user.roles.clear()
-            for role_id in user_data.role_ids:
-                role = db.query(Role).filter(Role.id == role_id).first()
-                if role:
-                    user.roles.append(role)
+            user.roles = list((await db.scalars(select(Role).where(Role.id.in_(user_data.role_ids)))).all())
+            user.updated_at = func.now()
+            user.role_version = UserModel.role_version + 1
+        
+        await db.commit()
+        principal_cache.invalidate(user_id)
         
-        db.commit()
-        db.refresh(user)
+        # Reload with relationships for response
+        user = await db.scalar(select(UserModel).options(
+            joinedload(UserModel.department),
+            selectinload(UserModel.roles)
+        ).where(UserModel.id == user_id).execution_options(populate_existing=True))
         logger.info(f"User updated: {user_id} by admin {current_user.id}")
         return user
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error updating user: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update user")
 
@@ -150,20 +172,21 @@ async def update_user(
 @retry_database
 async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(require_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin)
 ):
     """Delete user (Admin only)"""
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
+    user = await db.scalar(select(UserModel).where(UserModel.id == user_id))
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
     try:
-        db.delete(user)
-        db.commit()
+        await db.delete(user)
+        await db.commit()
+        principal_cache.invalidate(user_id)
         logger.info(f"User deleted: {user_id} by admin {current_user.id}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error deleting user: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete user")
 
@@ -171,13 +194,18 @@ async def delete_user(
 @router.get("/departments", response_model=List[DepartmentResponse])
 @retry_database
 async def get_departments(
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get list of departments"""
     try:
-        departments = db.query(Department).all()
-        return departments
+        rows, etag = await reference_cache.get_tagged(db, "departments")
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        return rows
     except Exception as e:
         logger.exception(f"Error getting departments: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve departments")
@@ -187,19 +215,20 @@ async def get_departments(
 @retry_database
 async def create_department(
     dept_data: DepartmentCreate,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(require_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin)
 ):
     """Create new department (Admin only)"""
     try:
         department = Department(**dept_data.dict())
         db.add(department)
-        db.commit()
-        db.refresh(department)
+        await db.commit()
+        reference_cache.invalidate()
+        await db.refresh(department)
         logger.info(f"Department created: {department.id} by admin {current_user.id}")
         return department
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error creating department: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create department")
 
@@ -209,11 +238,11 @@ async def create_department(
 async def update_department(
     dept_id: int,
     dept_data: DepartmentCreate,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(require_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin)
 ):
     """Update department (Admin only)"""
-    department = db.query(Department).filter(Department.id == dept_id).first()
+    department = await db.scalar(select(Department).where(Department.id == dept_id))
     if not department:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Department not found")
     
@@ -221,12 +250,13 @@ async def update_department(
         update_data = dept_data.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(department, field, value)
-        db.commit()
-        db.refresh(department)
+        await db.commit()
+        reference_cache.invalidate()
+        await db.refresh(department)
         logger.info(f"Department updated: {dept_id} by admin {current_user.id}")
         return department
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error updating department: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update department")
 
@@ -235,20 +265,21 @@ async def update_department(
 @retry_database
 async def delete_department(
     dept_id: int,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(require_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin)
 ):
     """Delete department (Admin only)"""
-    department = db.query(Department).filter(Department.id == dept_id).first()
+    department = await db.scalar(select(Department).where(Department.id == dept_id))
     if not department:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Department not found")
     
     try:
-        db.delete(department)
-        db.commit()
+        await db.delete(department)
+        await db.commit()
+        reference_cache.invalidate()
         logger.info(f"Department deleted: {dept_id} by admin {current_user.id}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error deleting department: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete department")
 
@@ -256,13 +287,18 @@ async def delete_department(
 @router.get("/roles", response_model=List[RoleResponse])
 @retry_database
 async def get_roles(
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get list of roles"""
     try:
-        roles = db.query(Role).all()
-        return roles
+        rows, etag = await reference_cache.get_tagged(db, "roles")
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        return rows
     except Exception as e:
         logger.exception(f"Error getting roles: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve roles")
@@ -271,23 +307,29 @@ async def get_roles(
 @router.get("/support-staff", response_model=List[UserResponse])
 @retry_database
 async def get_support_staff(
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get list of support staff (users with 'Destek Personeli' role)"""
     try:
-        from sqlalchemy.orm import joinedload
-        support_role = db.query(Role).filter(Role.name == "Destek Personeli").first()
+        etag = await table_state_etag(db, USER_LIST_TABLES, request)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        
+        support_role = await reference_cache.get_by_name(db, "roles", "Destek Personeli")
         if not support_role:
             return []
         
-        users = db.query(UserModel).options(
+        users = (await db.scalars(select(UserModel).options(
             joinedload(UserModel.department),
-            joinedload(UserModel.roles)
-        ).filter(
+            selectinload(UserModel.roles)
+        ).where(
             UserModel.is_active == 1,
-            UserModel.roles.contains(support_role)
-        ).all()
+            UserModel.roles.any(Role.id == support_role.id)
+        ))).all()
         return users
     except Exception as e:
         logger.exception(f"Error getting support staff: {e}")
@@ -298,26 +340,27 @@ async def get_support_staff(
 @retry_database
 async def create_role(
     role_data: RoleCreate,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(require_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin)
 ):
     """Create new role (Admin only)"""
     try:
         # Check if role exists
-        existing = db.query(Role).filter(Role.name == role_data.name).first()
+        existing = await db.scalar(select(Role).where(Role.name == role_data.name))
         if existing:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Role with this name already exists")
         
         role = Role(**role_data.dict())
         db.add(role)
-        db.commit()
-        db.refresh(role)
+        await db.commit()
+        reference_cache.invalidate()
+        await db.refresh(role)
         logger.info(f"Role created: {role.id} by admin {current_user.id}")
         return role
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error creating role: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create role")
 
@@ -327,31 +370,33 @@ async def create_role(
 async def update_role(
     role_id: int,
     role_data: RoleCreate,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(require_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin)
 ):
     """Update role (Admin only)"""
-    role = db.query(Role).filter(Role.id == role_id).first()
+    role = await db.scalar(select(Role).where(Role.id == role_id))
     if not role:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Role not found")
     
     try:
         # Check if name already exists (excluding current role)
-        existing = db.query(Role).filter(Role.name == role_data.name, Role.id != role_id).first()
+        existing = await db.scalar(select(Role).where(Role.name == role_data.name, Role.id != role_id))
         if existing:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Role with this name already exists")
         
         update_data = role_data.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(role, field, value)
-        db.commit()
-        db.refresh(role)
+        await db.commit()
+        reference_cache.invalidate()
+        principal_cache.invalidate()
+        await db.refresh(role)
         logger.info(f"Role updated: {role_id} by admin {current_user.id}")
         return role
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error updating role: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update role")
 
@@ -360,20 +405,28 @@ async def update_role(
 @retry_database
 async def delete_role(
     role_id: int,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(require_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_admin)
 ):
     """Delete role (Admin only)"""
-    role = db.query(Role).filter(Role.id == role_id).first()
+    role = await db.scalar(select(Role).where(Role.id == role_id))
     if not role:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Role not found")
     
     try:
-        db.delete(role)
-        db.commit()
+        # Holders of the role lose it: invalidate their role claims
+        await db.execute(
+            update(UserModel)
+            .where(UserModel.roles.any(Role.id == role_id))
+            .values(role_version=UserModel.role_version + 1, updated_at=func.now())
+        )
+        await db.delete(role)
+        await db.commit()
+        reference_cache.invalidate()
+        principal_cache.invalidate()
         logger.info(f"Role deleted: {role_id} by admin {current_user.id}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(f"Error deleting role: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete role")
 
@@ -1,24 +1,42 @@
 """
 Authentication dependencies for FastAPI
 """
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
 from typing import Optional
-from app.database import get_db
-from app.models.user import User, Role
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import config
+from app.database import get_async_db
+from app.models.user import User
+from app.auth.principal import Principal, principal_cache
+from app.auth.rate_limit import address_in_networks, login_throttle, parse_networks
 from app.auth.security import decode_access_token
+from app.services.reference_cache import reference_cache
 from app.utils.logger import get_logger
+from app.utils.request_metrics import set_request_user
 
 logger = get_logger("auth")
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+# Clients allowed to read monitoring endpoints without a token (scrapers, local checks)
+monitoring_networks = parse_networks(
+    config.get('monitoring.allowed_ips', ["127.0.0.1", "::1"]),
+    'monitoring.allowed_ips'
+)
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token"""
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """
+    Get current authenticated user from JWT token
+    
+    The principal is served from principal_cache; the database (and a pooled
+    connection) is only used on a cache miss.
+    """
     token = credentials.credentials
     payload = decode_access_token(token)
     
@@ -47,39 +65,60 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    token_role_ids = payload.get("roles")
+    token_role_version = payload.get("rv")
+    
+    principal = principal_cache.get(user_id)
+    if principal is not None and token_role_version is not None and token_role_version > principal.role_version:
+        # Token issued after a role change this process has not seen yet
+        principal = None
+    
+    if principal is None:
+        generation = principal_cache.generation
+        user = await db.scalar(select(User).where(User.id == user_id))
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        if token_role_ids is not None and token_role_version == user.role_version:
+            # Role claims are current: resolve names from the cached roles table
+            role_names = {role.id: role.name for role in await reference_cache.get(db, "roles")}
+            roles = {role_id: role_names[role_id] for role_id in token_role_ids if role_id in role_names}
+            principal = Principal.from_user(user, roles)
+        else:
+            # Token predates the current role set (or has no claims): load roles
+            await db.refresh(user, attribute_names=["roles"])
+            principal = Principal.from_user(user)
+        principal_cache.put(principal, generation)
     
-    if user.is_active == 0:
+    if principal.is_active == 0:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User account is inactive"
         )
     
-    return user
+    set_request_user(principal.id)
+    return principal
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """Get current active user (alias for clarity)"""
     return current_user
 
 
 def require_role(role_name: str):
     """Dependency factory for role-based access control"""
+    required = frozenset((role_name,))
+    
     async def role_checker(
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
-    ) -> User:
-        user_roles = [role.name for role in current_user.roles]
-        
-        if role_name not in user_roles:
+        current_user: Principal = Depends(get_current_user)
+    ) -> Principal:
+        if required.isdisjoint(current_user.role_names):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Required role: {role_name}"
@@ -92,13 +131,12 @@ def require_role(role_name: str):
 
 def require_any_role(*role_names: str):
     """Dependency factory for multiple role access (OR logic)"""
+    required = frozenset(role_names)
+    
     async def role_checker(
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
-    ) -> User:
-        user_roles = [role.name for role in current_user.roles]
-        
-        if not any(role in user_roles for role in role_names):
+        current_user: Principal = Depends(get_current_user)
+    ) -> Principal:
+        if required.isdisjoint(current_user.role_names):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Required one of roles: {', '.join(role_names)}"
@@ -115,3 +153,31 @@ require_manager = require_role("Yönetici")
 require_support = require_role("Destek Personeli")
 require_admin_or_manager = require_any_role("Admin", "Yönetici")
 
+
+async def has_monitoring_access(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: AsyncSession = Depends(get_async_db)
+) -> bool:
+    """
+    Whether the client may read monitoring endpoints (/metrics, /health)
+
+    Allowed for client IPs in monitoring.allowed_ips (resolved like the login
+    throttle, so forwarding headers count only from trusted proxies) and for
+    requests with an admin token.
+    """
+    if address_in_networks(login_throttle.client_ip(request), monitoring_networks):
+        return True
+    if credentials is None:
+        return False
+    current_user = await get_current_user(credentials, db)
+    return "Admin" in current_user.role_names
+
+
+async def require_monitoring_access(allowed: bool = Depends(has_monitoring_access)) -> None:
+    """Dependency for monitoring endpoints: 403 unless has_monitoring_access"""
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Monitoring endpoints are restricted"
+        )
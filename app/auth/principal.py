@@ -0,0 +1,127 @@
+"""
+Authenticated principal and its in-process cache
+- Request handlers receive a Principal (plain, immutable) instead of an ORM User
+- Principals are cached by user ID with a TTL and a size limit (LRU eviction)
+- User and role writes invalidate the cache; the TTL bounds staleness across workers
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional, Tuple
+from app.config import config
+from app.models.user import User
+from app.utils.logger import get_logger
+from app.utils.metrics import register_cache_metrics
+
+logger = get_logger("auth.principal")
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user as seen by request handlers (detached from any session)"""
+    id: int
+    email: str
+    full_name: str
+    is_active: int
+    department_id: Optional[int]
+    role_ids: FrozenSet[int]
+    role_names: FrozenSet[str]
+    role_version: int
+
+    @classmethod
+    def from_user(cls, user: User, roles: Optional[Dict[int, str]] = None) -> "Principal":
+        """
+        Build a principal from a User row
+
+        `roles` (role ID -> name) comes from token claims; without it the user's
+        roles relationship must be loaded.
+        """
+        if roles is None:
+            roles = {role.id: role.name for role in user.roles}
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=user.is_active,
+            department_id=user.department_id,
+            role_ids=frozenset(roles),
+            role_names=frozenset(roles.values()),
+            role_version=user.role_version
+        )
+
+    def has_role(self, *role_names: str) -> bool:
+        """Check whether the principal has any of the given roles"""
+        return not self.role_names.isdisjoint(role_names)
+
+
+class PrincipalCache:
+    """TTL-bounded LRU cache of principals keyed by user ID"""
+
+    def __init__(self, ttl_seconds: float = 60, max_size: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, Tuple[float, Principal]]" = OrderedDict()
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def generation(self) -> int:
+        """Changes on every invalidation; read it before loading a user from the database"""
+        return self._generation
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        """Get a cached principal, or None when missing or expired"""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self._misses += 1
+            return None
+        expires_at, principal = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[user_id]
+            self._misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self._hits += 1
+        return principal
+
+    def put(self, principal: Principal, generation: int) -> None:
+        """
+        Cache a principal loaded while `generation` was current
+
+        Skipped when an invalidation happened during the load, so a concurrent
+        user update is never overwritten by the pre-update row.
+        """
+        if generation != self._generation:
+            return
+        self._entries[principal.id] = (time.monotonic() + self.ttl_seconds, principal)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Drop one user's principal, or every principal (e.g. after a role edit)"""
+        self._generation += 1
+        if user_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(user_id, None)
+        logger.debug(f"Principal cache invalidated: {'all' if user_id is None else user_id}")
+
+    def get_stats(self) -> Dict[str, float]:
+        """Size and hit/miss counters"""
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Global cache instance
+principal_cache = PrincipalCache(
+    ttl_seconds=config.get('auth.principal_cache_ttl_seconds', 60),
+    max_size=config.get('auth.principal_cache_size', 1000)
+)
+register_cache_metrics("principal", principal_cache.get_stats)
@@ -0,0 +1,177 @@
+"""
+Login throttling with in-memory token buckets
+- One bucket per client IP and one per account email
+- Buckets refill continuously; an attempt costs one token
+- Bucket count is bounded (least recently used buckets are evicted)
+- Behind a reverse proxy the client IP comes from X-Forwarded-For / X-Real-IP,
+  trusted only when the connection comes from a configured proxy
+- State is per worker process, so effective limits scale with the worker count
+"""
+import ipaddress
+import math
+import time
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple, Union
+from fastapi import HTTPException, Request, status
+from app.config import config
+from app.utils.logger import get_logger
+
+logger = get_logger("auth.rate_limit")
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def parse_networks(entries: Sequence[str], setting: str) -> List[IPNetwork]:
+    """Addresses or CIDR ranges from the `setting` config list (invalid entries are skipped)"""
+    networks = []
+    for entry in entries:
+        try:
+            networks.append(ipaddress.ip_network(entry.strip(), strict=False))
+        except ValueError:
+            logger.error(f"Ignoring invalid address in {setting}: {entry}")
+    return networks
+
+
+def address_in_networks(address: Optional[str], networks: Sequence[IPNetwork]) -> bool:
+    """Whether an IP address string belongs to any of the networks"""
+    if address is None:
+        return False
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+class TokenBucketLimiter:
+    """Token buckets keyed by string, kept in a size-bounded LRU"""
+
+    def __init__(self, capacity: float, refill_per_minute: float, max_buckets: int = 10000):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_minute / 60
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def _tokens(self, key: str, now: float) -> float:
+        entry = self._buckets.get(key)
+        if entry is None:
+            return self.capacity
+        tokens, updated_at = entry
+        return min(self.capacity, tokens + (now - updated_at) * self.refill_per_second)
+
+    def retry_after(self, key: str) -> int:
+        """Seconds until the bucket holds a whole token again (0 when it already does)"""
+        missing = 1 - self._tokens(key, time.monotonic())
+        if missing <= 0:
+            return 0
+        return math.ceil(missing / self.refill_per_second) if self.refill_per_second else 60
+
+    def consume(self, key: str) -> bool:
+        """Take one token; False (nothing taken) when the bucket is empty"""
+        now = time.monotonic()
+        tokens = self._tokens(key, now)
+        if tokens < 1:
+            return False
+        self._buckets[key] = (tokens - 1, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return True
+
+    def reset(self, key: str) -> None:
+        """Refill a bucket completely"""
+        self._buckets.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class LoginThrottle:
+    """Admission check for login attempts (per client IP and per email)"""
+
+    def __init__(self):
+        max_buckets = config.get('auth.login_rate_limit.max_buckets', 10000)
+        self.enabled = config.get('auth.login_rate_limit.enabled', True)
+        # Peers allowed to set X-Forwarded-For / X-Real-IP (same default as uvicorn)
+        self.trusted_proxies = parse_networks(
+            config.get('auth.login_rate_limit.trusted_proxies', ["127.0.0.1", "::1"]),
+            'auth.login_rate_limit.trusted_proxies'
+        )
+        self.by_ip = TokenBucketLimiter(
+            capacity=config.get('auth.login_rate_limit.ip_capacity', 20),
+            refill_per_minute=config.get('auth.login_rate_limit.ip_per_minute', 10),
+            max_buckets=max_buckets
+        )
+        self.by_email = TokenBucketLimiter(
+            capacity=config.get('auth.login_rate_limit.email_capacity', 5),
+            refill_per_minute=config.get('auth.login_rate_limit.email_per_minute', 2),
+            max_buckets=max_buckets
+        )
+
+    def _is_trusted(self, address: str) -> bool:
+        return address_in_networks(address, self.trusted_proxies)
+
+    def client_ip(self, request: Request) -> Optional[str]:
+        """
+        Address of the client that made the request
+
+        Forwarding headers are only honoured when the socket peer is a trusted
+        proxy. X-Forwarded-For is read right to left, skipping trusted proxies, so
+        addresses prepended by the client itself are ignored.
+        """
+        peer = request.client.host if request.client else None
+        if peer is None or not self._is_trusted(peer):
+            return peer
+
+        forwarded_for = request.headers.get("x-forwarded-for")
+        if forwarded_for:
+            hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+            for hop in reversed(hops):
+                if not self._is_trusted(hop):
+                    return hop
+            if hops:
+                return hops[0]
+
+        real_ip = request.headers.get("x-real-ip")
+        return real_ip.strip() if real_ip else peer
+
+    def check(self, client_ip: Optional[str], email: str) -> None:
+        """
+        Charge one attempt to the IP and email buckets
+
+        Raises 429 with Retry-After when either bucket is empty. The email bucket is
+        only charged once the IP bucket admits the attempt, so one noisy client
+        cannot drain the buckets of every account it tries.
+        """
+        if not self.enabled:
+            return
+
+        ip_key = client_ip or "unknown"
+        email_key = email.lower()
+
+        if not self.by_ip.consume(ip_key):
+            logger.warning(f"Login throttled for client: {ip_key}")
+            self._reject(self.by_ip.retry_after(ip_key))
+        if not self.by_email.consume(email_key):
+            logger.warning(f"Login throttled for account: {email_key}")
+            self._reject(self.by_email.retry_after(email_key))
+
+    def succeeded(self, email: str) -> None:
+        """Refill the account's bucket after a successful login"""
+        self.by_email.reset(email.lower())
+
+    def get_stats(self) -> dict:
+        """Number of tracked buckets"""
+        return {"enabled": self.enabled, "ip_buckets": len(self.by_ip), "email_buckets": len(self.by_email)}
+
+    @staticmethod
+    def _reject(retry_after: int) -> None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, please try again later",
+            headers={"Retry-After": str(max(1, retry_after))}
+        )
+
+
+# Global login throttle
+login_throttle = LoginThrottle()
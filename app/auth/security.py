@@ -1,19 +1,26 @@
 """
 Security utilities: password hashing, JWT tokens
 """
+import asyncio
+import hashlib
+import threading
+import time
 import bcrypt
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 from jose import JWTError, jwt
 from app.config import config
 from app.utils.logger import get_logger
+from app.utils.metrics import registry, register_cache_metrics
 
 logger = get_logger("auth")
 
 
 def hash_password(password: str) -> str:
-    """Hash password using bcrypt"""
-    salt = bcrypt.gensalt()
+    """Hash password using bcrypt (cost factor from auth.bcrypt_rounds)"""
+    salt = bcrypt.gensalt(rounds=config.get('auth.bcrypt_rounds', 12))
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -30,10 +37,118 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create JWT access token"""
+class PasswordHashPool:
+    """
+    Bounded thread pool for bcrypt work
+    
+    bcrypt releases the GIL, so hashing on worker threads keeps the event loop free;
+    max_workers caps how many hashes run at once and the rest wait in the queue.
+    """
+    
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._max_queued = 0
+        self._wait_seconds_total = 0.0
+        self._run_seconds_total = 0.0
+    
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        submitted_at = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+        
+        def task():
+            started_at = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._wait_seconds_total += started_at - submitted_at
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._run_seconds_total += time.perf_counter() - started_at
+        
+        return await asyncio.get_running_loop().run_in_executor(self._executor, task)
+    
+    async def hash_password(self, password: str) -> str:
+        """Hash a password on the pool"""
+        return await self._run(hash_password, password)
+    
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password on the pool"""
+        return await self._run(verify_password, plain_password, hashed_password)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and timing counters"""
+        with self._lock:
+            completed = self._completed
+            return {
+                "max_workers": self.max_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "max_queued": self._max_queued,
+                "completed": completed,
+                "avg_wait_ms": round(self._wait_seconds_total / completed * 1000, 2) if completed else 0.0,
+                "avg_run_ms": round(self._run_seconds_total / completed * 1000, 2) if completed else 0.0,
+            }
+    
+    def shutdown(self) -> None:
+        """Stop the worker threads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Global hashing pool
+password_pool = PasswordHashPool(max_workers=config.get('auth.hash_workers', 4))
+registry.register_collector(
+    "password_hash_queued", "Password hashes waiting for a worker thread", "gauge",
+    lambda: [({}, password_pool.get_stats()["queued"])]
+)
+registry.register_collector(
+    "password_hash_running", "Password hashes being computed", "gauge",
+    lambda: [({}, password_pool.get_stats()["running"])]
+)
+registry.register_collector(
+    "password_hash_completed_total", "Password hashes computed", "counter",
+    lambda: [({}, password_pool.get_stats()["completed"])]
+)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash password without blocking the event loop"""
+    return await password_pool.hash_password(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify password without blocking the event loop"""
+    return await password_pool.verify_password(plain_password, hashed_password)
+
+
+def create_access_token(
+    data: dict,
+    expires_delta: Optional[timedelta] = None,
+    role_ids: Optional[Iterable[int]] = None,
+    role_version: Optional[int] = None
+) -> str:
+    """
+    Create JWT access token
+    
+    With role_ids, the token carries the user's role IDs ("roles") and the role-set
+    version they belong to ("rv"), so authentication can skip loading roles while
+    users.role_version still equals "rv".
+    """
     to_encode = data.copy()
     
+    if role_ids is not None:
+        to_encode.update({"roles": sorted(role_ids), "rv": role_version or 0})
+    
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -50,29 +165,90 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+class DecodedTokenCache:
+    """
+    LRU of verified token payloads keyed by the token's SHA-256 digest
+    
+    Entries are kept until the token's exp claim, so a hit skips signature
+    verification and claim parsing; expired tokens are never served.
+    """
+    
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Tuple[float, dict]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+    
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+    
+    def get(self, token: str) -> Optional[dict]:
+        """Cached payload, or None when missing or expired"""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        expires_at, payload = entry
+        if time.time() >= expires_at:
+            del self._entries[key]
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return dict(payload)
+    
+    def put(self, token: str, payload: dict) -> None:
+        """Cache a verified payload until its exp claim (tokens without exp are not cached)"""
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)) or self.max_size <= 0:
+            return
+        key = self._key(token)
+        self._entries[key] = (expires_at, dict(payload))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop every cached payload"""
+        self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Size and hit/miss counters"""
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Global decoded-token cache
+token_cache = DecodedTokenCache(max_size=config.get('auth.token_cache_size', 10000))
+register_cache_metrics("token", token_cache.get_stats)
+
+
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and verify JWT token"""
+    """Decode and verify JWT token (verified payloads are served from token_cache)"""
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    
     try:
         payload = jwt.decode(
             token,
             config.secret_key,
             algorithms=["HS256"]
         )
-        return payload
     except JWTError as e:
         logger.warning(f"JWT decode error: {e}")
         return None
     except Exception as e:
         logger.error(f"Token decode error: {e}")
         return None
-
-
-
-
-
-
-
-
-
-
-
+    
+    token_cache.put(token, payload)
+    return payload
@@ -1,18 +1,35 @@
 """
 Database connection and session management
 """
-from sqlalchemy import create_engine
+import asyncio
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
 from app.config import config
 from app.utils.logger import get_logger
 from app.utils.retry import retry_database
+from app.utils.request_metrics import install_query_hooks
+from app.utils.metrics import registry, PoolTimingMixin
 
 logger = get_logger("database")
 
+# Count queries and database time per request (access log, metrics)
+install_query_hooks()
+
+
+class TimedQueuePool(PoolTimingMixin, QueuePool):
+    """QueuePool that records checkout and connect times (db_pool_checkout_seconds, db_pool_connect_seconds)"""
+    metrics_label = "sync"
+
+
+class TimedAsyncQueuePool(PoolTimingMixin, AsyncAdaptedQueuePool):
+    """Async queue pool that records checkout and connect times (db_pool_checkout_seconds, db_pool_connect_seconds)"""
+    metrics_label = "async"
+
 # Create base class for models
 Base = declarative_base()
 
@@ -20,6 +37,10 @@ Base = declarative_base()
 engine = None
 SessionLocal = None
 
+# Async database engine (asyncpg) used by the API routers
+async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal: Optional[async_sessionmaker] = None
+
 
 def init_database():
     """Initialize database connection"""
@@ -31,11 +52,11 @@ def init_database():
     
     engine = create_engine(
         database_url,
-        poolclass=QueuePool,
+        poolclass=TimedQueuePool,
         pool_size=config.get('database.pool_size', 10),
         max_overflow=config.get('database.max_overflow', 20),
         pool_pre_ping=config.get('database.pool_pre_ping', True),
-        echo=False,  # Set to True for SQL query logging
+        echo=config.get('database.echo', False),  # SQL query logging
         connect_args={
             "connect_timeout": config.get('database.connection_timeout', 30)
         }
@@ -46,6 +67,103 @@ def init_database():
     logger.info("Database connection initialized")
 
 
+def init_async_database():
+    """Initialize async database connection (asyncpg)"""
+    global async_engine, AsyncSessionLocal
+    
+    database_url = config.get_async_database_url()
+    
+    logger.info(f"Connecting to database (async): {config.get('database.host')}/{config.get('database.database')}")
+    
+    async_engine = create_async_engine(
+        database_url,
+        poolclass=TimedAsyncQueuePool,
+        pool_size=config.get('database.pool_size', 10),
+        max_overflow=config.get('database.max_overflow', 20),
+        pool_pre_ping=config.get('database.pool_pre_ping', True),
+        echo=config.get('database.echo', False),  # SQL query logging
+        connect_args={
+            "timeout": config.get('database.connection_timeout', 30)
+        }
+    )
+    
+    # expire_on_commit=False: attributes stay readable after commit without
+    # an implicit (and in async mode, forbidden) lazy refresh
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
+    
+    logger.info("Async database connection initialized")
+
+
+async def dispose_async_database():
+    """Close all pooled async connections"""
+    global async_engine, AsyncSessionLocal
+    
+    if async_engine is not None:
+        await async_engine.dispose()
+        async_engine = None
+        AsyncSessionLocal = None
+        logger.info("Async database connection closed")
+
+
+async def ping_async_database(timeout: float = 2.0) -> None:
+    """
+    Run SELECT 1 on the async engine
+    
+    Raises on failure, or asyncio.TimeoutError when no connection/answer arrives within
+    `timeout` seconds (which includes waiting for a free pooled connection).
+    """
+    if async_engine is None:
+        init_async_database()
+    
+    async def ping():
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    await asyncio.wait_for(ping(), timeout=timeout)
+
+
+def get_async_pool_status() -> Dict[str, Any]:
+    """Connection usage of the async engine's pool (saturation 1.0 = no connection left)"""
+    pool = async_engine.sync_engine.pool if async_engine is not None else None
+    if not isinstance(pool, QueuePool):
+        return {}
+    
+    checked_out = pool.checkedout()
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    return {
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": checked_out,
+        "overflow": pool.overflow(),
+        "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+    }
+
+
+def _pool_stats(stat: str):
+    """Collector callback: one pool statistic for the sync and the async engine"""
+    def collect():
+        samples = []
+        for label, pool in (
+            ("sync", engine.pool if engine is not None else None),
+            ("async", async_engine.sync_engine.pool if async_engine is not None else None),
+        ):
+            if isinstance(pool, QueuePool):
+                samples.append(({"pool": label}, getattr(pool, stat)()))
+        return samples
+    return collect
+
+
+registry.register_collector("db_pool_size", "Configured pool size", "gauge", _pool_stats("size"))
+registry.register_collector("db_pool_checked_out", "Connections currently checked out", "gauge", _pool_stats("checkedout"))
+registry.register_collector("db_pool_checked_in", "Idle connections in the pool", "gauge", _pool_stats("checkedin"))
+registry.register_collector("db_pool_overflow", "Connections open beyond pool_size (negative: unused capacity)", "gauge", _pool_stats("overflow"))
+
+
 def get_db() -> Generator[Session, None, None]:
     """
     Dependency function for FastAPI to get database session
@@ -65,6 +183,23 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function for FastAPI to get async database session
+    Usage: db: AsyncSession = Depends(get_async_db)
+    """
+    if AsyncSessionLocal is None:
+        init_async_database()
+    
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Database session error: {e}")
+            await db.rollback()
+            raise
+
+
 @contextmanager
 def get_db_context() -> Generator[Session, None, None]:
     """
@@ -1,15 +1,26 @@
 """
 FastAPI main application
 """
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
-import time
 from app.config import config
-from app.database import init_database, create_tables
-from app.utils.logger import get_logger
+from app.database import init_database, init_async_database, dispose_async_database, create_tables
+from app.utils.logger import get_logger, get_log_pipeline
 from app.utils.performance import get_monitor
+from app.utils.access_log import access_log
+from app.utils.request_metrics import start_request_metrics, report_repeated_statements, timing_headers
+from app.utils.metrics import (
+    registry,
+    route_label,
+    http_requests_total,
+    http_request_duration_seconds,
+    http_requests_in_flight,
+)
+from app.auth.security import password_pool, token_cache
+from app.auth.rate_limit import login_throttle
+from app.auth.dependencies import require_monitoring_access
 from app.api import (
     auth,
     customers,
@@ -21,6 +32,10 @@ from app.api import (
     priority_type,
     product_category,
     product_brand,
+    stats,
+    bootstrap,
+    health,
+    admin,
 )
 
 logger = get_logger("main")
@@ -41,6 +56,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-DB-Queries", "Server-Timing"],
 )
 
 # Mount static files
@@ -54,6 +70,7 @@ async def startup_event():
     try:
         logger.info("Starting Ticket Support System...")
         init_database()
+        init_async_database()
         logger.info("Database initialized")
         # Create tables if they don't exist
         create_tables()
@@ -78,52 +95,65 @@ async def shutdown_event():
     monitor = get_monitor()
     if monitor:
         monitor.stop_monitoring()
+    password_pool.shutdown()
+    await dispose_async_database()
 
 
 # Request middleware for logging
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    """Log all HTTP requests"""
-    start_time = time.time()
-    
-    # Log request
-    logger.info(f"{request.method} {request.url.path} - Client: {request.client.host if request.client else 'unknown'}")
+    """Collect per-request metrics and write the access log"""
+    metrics = start_request_metrics()
+    http_requests_in_flight.inc()
     
     try:
         response = await call_next(request)
-        process_time = time.time() - start_time
-        
-        # Log response
-        logger.info(
-            f"{request.method} {request.url.path} - "
-            f"Status: {response.status_code} - "
-            f"Time: {process_time:.3f}s"
-        )
-        
-        return response
     except Exception as e:
         logger.exception(f"Request error: {e}")
-        return JSONResponse(
+        response = JSONResponse(
             status_code=500,
             content={"detail": "Internal server error"}
         )
+    finally:
+        http_requests_in_flight.dec()
+    
+    route = route_label(request.scope)
+    http_requests_total.inc(method=request.method, route=route, status=str(response.status_code))
+    http_request_duration_seconds.observe(metrics.elapsed_seconds, method=request.method, route=route)
+    report_repeated_statements(metrics, request.method, route)
+    response.headers.update(timing_headers(metrics))
+    
+    content_length = response.headers.get("content-length")
+    access_log.log(request, response.status_code, metrics, int(content_length) if content_length else None)
+    return response
 
 
 # Health check endpoint
-@app.get("/health")
+@app.get("/health", dependencies=[Depends(require_monitoring_access)])
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (latest monitor sample; see /health/live and /health/ready)"""
     monitor = get_monitor()
-    metrics = monitor.get_current_metrics() if monitor else {}
+    metrics = (monitor.get_latest_metrics() if monitor else None) or {}
     
     return {
         "status": "healthy",
         "service": "Ticket Support System",
         "version": "1.0.0",
-        "performance": metrics
+        "performance": metrics,
+        "password_hashing": password_pool.get_stats(),
+        "login_throttle": login_throttle.get_stats(),
+        "token_cache": token_cache.get_stats(),
+        "logging": get_log_pipeline().get_stats()
     }
 
 
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_monitoring_access)])
+async def metrics_endpoint():
+    """Metrics in Prometheus text exposition format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # Root endpoint - serve frontend
 @app.get("/")
 async def root():
@@ -150,6 +180,10 @@ app.include_router(support_type.router)
 app.include_router(priority_type.router)
 app.include_router(product_category.router)
 app.include_router(product_brand.router)
+app.include_router(stats.router)
+app.include_router(bootstrap.router)
+app.include_router(health.router)
+app.include_router(admin.router)
 # TODO: Include reports router when created
 # app.include_router(reports.router)
 
@@ -13,6 +13,7 @@ from app.models.support_type import SupportType
 from app.models.priority_type import PriorityType
 from app.models.product_category import ProductCategory
 from app.models.product_brand import ProductBrand
+from app.models.ticket_counter import TicketCounter
 
 __all__ = [
     "BaseModel",
@@ -36,4 +37,5 @@ __all__ = [
     "ReportDefinition",
     "ProductCategory",
     "ProductBrand",
+    "TicketCounter",
 ]
@@ -1,15 +1,30 @@
 """
 Case/Ticket models
 """
-from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, JSON, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, JSON, Index, Computed, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 from app.models.base import BaseModel
 
 
+# Text search configuration for the cases search vector: no stemming, so agents can
+# search mixed Turkish/English error messages word by word
+CASE_SEARCH_CONFIG = "simple"
+
+
 class Case(BaseModel):
     """Case/Ticket model"""
     __tablename__ = "cases"
+    __table_args__ = (
+        # Keyset pagination index matching the list order (request_date DESC, id DESC)
+        Index("ix_cases_request_date_id", "request_date", "id"),
+        # Text search (q=): trigram indexes serve ILIKE '%fragment%', GIN on the tsvector serves @@
+        Index("ix_cases_ticket_number_trgm", "ticket_number", postgresql_using="gin", postgresql_ops={"ticket_number": "gin_trgm_ops"}),
+        Index("ix_cases_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_cases_description_trgm", "description", postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}),
+        Index("ix_cases_search_vector", "search_vector", postgresql_using="gin"),
+    )
     
     # Unique ticket number
     ticket_number = Column(String(50), nullable=False, unique=True, index=True)
@@ -41,6 +56,17 @@ class Case(BaseModel):
     # Flexible data
     custom_data = Column(JSON, nullable=True)  # JSONB for dynamic fields
     
+    # Weighted search document maintained by PostgreSQL (ticket number/title A, description B);
+    # deferred so regular case queries never fetch it
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{CASE_SEARCH_CONFIG}', coalesce(ticket_number, '') || ' ' || coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{CASE_SEARCH_CONFIG}', coalesce(description, '')), 'B')",
+            persisted=True
+        )
+    ))
+    
     # Relationships
     customer = relationship("Customer", back_populates="cases")
     product = relationship("Product", back_populates="cases")
@@ -1,7 +1,7 @@
 """
 Customer model
 """
-from sqlalchemy import Column, String, Text
+from sqlalchemy import Column, String, Text, Index
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
 
@@ -9,6 +9,12 @@ from app.models.base import BaseModel
 class Customer(BaseModel):
     """Customer model"""
     __tablename__ = "customers"
+    __table_args__ = (
+        # Search: trigram indexes serve ILIKE '%fragment%', exact ILIKE and similarity (%)
+        Index("ix_customers_company_name_trgm", "company_name", postgresql_using="gin", postgresql_ops={"company_name": "gin_trgm_ops"}),
+        Index("ix_customers_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+        Index("ix_customers_tax_number_trgm", "tax_number", postgresql_using="gin", postgresql_ops={"tax_number": "gin_trgm_ops"}),
+    )
     
     company_name = Column(String(255), nullable=False, index=True)  # Firma İsmi
     address = Column(Text, nullable=True)  # Adres
@@ -0,0 +1,16 @@
+"""
+Ticket counter model for per-year sequential ticket numbers
+"""
+from sqlalchemy import Column, Integer
+from app.models.base import BaseModel
+
+
+class TicketCounter(BaseModel):
+    """Last issued ticket sequence number per year (3D + YYYY + NNN)"""
+    __tablename__ = "ticket_counters"
+    
+    year = Column(Integer, nullable=False, unique=True, index=True)
+    last_number = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<TicketCounter(year={self.year}, last_number={self.last_number})>"
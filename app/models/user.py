@@ -24,6 +24,7 @@ class User(BaseModel):
     full_name = Column(String(255), nullable=False)
     is_active = Column(Integer, default=1, nullable=False)  # 1=active, 0=inactive
     department_id = Column(Integer, ForeignKey('departments.id'), nullable=True, index=True)
+    role_version = Column(Integer, default=0, server_default="0", nullable=False)  # Bumped when the role set changes (JWT "rv" claim)
     
     # Relationships
     department = relationship("Department", back_populates="users")
@@ -8,7 +8,7 @@ from app.schemas.user import (
 from app.schemas.customer import CustomerBase, CustomerCreate, CustomerUpdate, CustomerResponse
 from app.schemas.product import ProductBase, ProductCreate, ProductUpdate, ProductResponse
 from app.schemas.case import (
-    CaseBase, CaseCreate, CaseUpdate, CaseClose, CaseResponse,
+    CaseBase, CaseCreate, CaseUpdate, CaseClose, CaseResponse, CaseSummaryResponse,
     CaseCommentCreate, CaseCommentResponse, CaseAssignmentResponse
 )
 
@@ -39,6 +39,7 @@ __all__ = [
     "CaseUpdate",
     "CaseClose",
     "CaseResponse",
+    "CaseSummaryResponse",
     "CaseCommentCreate",
     "CaseCommentResponse",
     "CaseAssignmentResponse",
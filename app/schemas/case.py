@@ -82,6 +82,37 @@ class CaseResponse(CaseBase):
         from_attributes = True
 
 
+class CaseSummaryResponse(BaseModel):
+    """Slim case list item (view=summary): no description/solution or collections"""
+    id: int
+    ticket_number: str
+    title: str
+    request_date: datetime
+    customer_id: int
+    product_id: Optional[int] = None
+    created_by: int
+    assigned_to: Optional[int] = None
+    department_id: Optional[int] = None
+    priority_type_id: Optional[int] = None
+    support_type_id: Optional[int] = None
+    status_id: Optional[int] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    time_spent_minutes: Optional[int] = None
+    created_at: datetime
+    updated_at: datetime
+    customer: Optional[dict] = None
+    product: Optional[dict] = None
+    creator: Optional[dict] = None
+    assigned_user: Optional[dict] = None
+    department: Optional[dict] = None
+    priority_type: Optional[dict] = None
+    support_type: Optional[dict] = None
+    status: Optional[dict] = None
+    comment_count: int = 0
+    file_count: int = 0
+
+
 class CaseCommentCreate(BaseModel):
     """Case comment creation schema"""
     comment: str
@@ -0,0 +1,260 @@
+"""
+Case repository: shared loading and serialization for case endpoints
+- One set of eager-load options (joinedload for many-to-one, selectinload for collections)
+- Serializers compiled once at import time from attribute getters
+- Every case-returning endpoint issues a fixed number of queries
+"""
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime
+from sqlalchemy import select, func, tuple_, or_, cast, literal
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload, load_only
+from app.models.case import Case, CaseAssignment, CaseComment, CaseFile, CASE_SEARCH_CONFIG
+from app.utils.logger import get_logger
+from app.utils.search import like_pattern
+
+logger = get_logger("service.case_repository")
+
+
+def compile_serializer(
+    fields: Sequence[str],
+    nested: Optional[Dict[str, Callable]] = None,
+    collections: Optional[Dict[str, Callable]] = None,
+    renames: Optional[Dict[str, str]] = None,
+    constants: Optional[Dict[str, Any]] = None
+) -> Callable[[Any], Optional[dict]]:
+    """
+    Build a serializer for an ORM object once, instead of hand-writing the dict per call
+
+    Args:
+        fields: Attribute names copied as-is
+        nested: Attribute name -> serializer for many-to-one relationships
+        collections: Attribute name -> item serializer for one-to-many relationships
+        renames: Output key -> attribute name (e.g. {"filename": "original_filename"})
+        constants: Output key -> fixed value (kept for response compatibility)
+    """
+    nested = nested or {}
+    collections = collections or {}
+    renames = renames or {}
+    constants = constants or {}
+
+    keys = tuple(fields) + tuple(renames)
+    attrs = tuple(fields) + tuple(renames.values())
+    getter = attrgetter(*attrs)
+    if len(attrs) == 1:
+        single = getter
+        getter = lambda obj: (single(obj),)
+    nested_items = tuple(nested.items())
+    collection_items = tuple(collections.items())
+    constant_items = tuple(constants.items())
+
+    def serialize(obj: Any) -> Optional[dict]:
+        if obj is None:
+            return None
+        result = dict(zip(keys, getter(obj)))
+        for name, serializer in nested_items:
+            result[name] = serializer(getattr(obj, name))
+        for name, serializer in collection_items:
+            result[name] = [serializer(item) for item in (getattr(obj, name) or [])]
+        for name, value in constant_items:
+            result[name] = value
+        return result
+
+    return serialize
+
+
+# Related object serializers
+_user_brief = compile_serializer(("id", "full_name", "email"))
+_user_name = compile_serializer(("id", "full_name"))
+_customer = compile_serializer(("id", "company_name", "email", "address"), constants={"phone": None})
+_customer_brief = compile_serializer(("id", "company_name"))
+_product = compile_serializer(("id", "name", "code"))
+_department = compile_serializer(("id", "name"))
+_colored_lookup = compile_serializer(("id", "name", "color"))
+_lookup = compile_serializer(("id", "name"))
+_assignment = compile_serializer(("id", "user_id"), nested={"user": _user_brief})
+_comment = compile_serializer(("id", "comment", "is_internal"), nested={"user": _user_name})
+_file = compile_serializer(("id", "file_path"), renames={"filename": "original_filename"})
+
+CASE_COLUMNS = (
+    "id", "ticket_number", "title", "description", "request_date",
+    "customer_id", "customer_contact_id", "product_id", "created_by",
+    "assigned_to", "department_id", "priority_type_id", "support_type_id",
+    "status_id", "solution", "start_date", "end_date", "time_spent_minutes",
+    "custom_data", "created_at", "updated_at",
+)
+
+SUMMARY_COLUMNS = (
+    "id", "ticket_number", "title", "request_date", "customer_id", "product_id",
+    "created_by", "assigned_to", "department_id", "priority_type_id",
+    "support_type_id", "status_id", "start_date", "end_date",
+    "time_spent_minutes", "created_at", "updated_at",
+)
+
+serialize_case = compile_serializer(
+    CASE_COLUMNS,
+    nested={
+        "customer": _customer,
+        "product": _product,
+        "creator": _user_brief,
+        "assigned_user": _user_brief,
+        "department": _department,
+        "priority_type": _colored_lookup,
+        "support_type": _lookup,
+        "status": _colored_lookup,
+    },
+    collections={
+        "assignments": _assignment,
+        "comments": _comment,
+        "files": _file,
+    }
+)
+
+_serialize_summary = compile_serializer(
+    SUMMARY_COLUMNS,
+    nested={
+        "customer": _customer_brief,
+        "product": _product,
+        "creator": _user_name,
+        "assigned_user": _user_name,
+        "department": _department,
+        "priority_type": _colored_lookup,
+        "support_type": _lookup,
+        "status": _colored_lookup,
+    }
+)
+
+
+def serialize_case_summary(case: Case, comment_count: int, file_count: int) -> dict:
+    """Serialize a case list item for view=summary"""
+    result = _serialize_summary(case)
+    result["comment_count"] = comment_count or 0
+    result["file_count"] = file_count or 0
+    return result
+
+
+# Many-to-one lookups: joined into the main SELECT (one row per case)
+_LOOKUP_OPTIONS = (
+    joinedload(Case.customer),
+    joinedload(Case.product),
+    joinedload(Case.creator),
+    joinedload(Case.assigned_user),
+    joinedload(Case.department),
+    joinedload(Case.priority_type),
+    joinedload(Case.support_type),
+    joinedload(Case.status),
+)
+
+# Collections: one extra SELECT ... WHERE case_id IN (...) each, no cartesian product
+CASE_DETAIL_OPTIONS = _LOOKUP_OPTIONS + (
+    selectinload(Case.assignments).joinedload(CaseAssignment.user),
+    selectinload(Case.comments).joinedload(CaseComment.user),
+    selectinload(Case.files),
+)
+
+CASE_SUMMARY_OPTIONS = (
+    load_only(*(getattr(Case, name) for name in SUMMARY_COLUMNS if name != "id")),
+) + _LOOKUP_OPTIONS
+
+
+class CaseRepository:
+    """Loads cases with a fixed query plan and returns response dicts"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, case_id: int) -> Optional[Case]:
+        """Load a case with all relationships (4 queries, regardless of size)"""
+        return await self.db.scalar(
+            select(Case)
+            .options(*CASE_DETAIL_OPTIONS)
+            .where(Case.id == case_id)
+            .execution_options(populate_existing=True)
+        )
+
+    async def get_serialized(self, case_id: int) -> Optional[dict]:
+        """Load a case and serialize it for CaseResponse"""
+        return serialize_case(await self.get(case_id))
+
+    async def list_cases(
+        self,
+        view: str = "full",
+        skip: int = 0,
+        limit: int = 100,
+        keyset: Optional[Tuple[datetime, int]] = None,
+        status_id: Optional[int] = None,
+        priority_type_id: Optional[int] = None,
+        customer_id: Optional[int] = None,
+        assigned_user_id: Optional[int] = None,
+        search: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[Case]]:
+        """
+        List cases ordered by (request_date DESC, id DESC)
+
+        With `search`, cases matching it in ticket_number/title/description are
+        ordered by relevance instead and paged with skip only (keyset is ignored).
+
+        Returns the serialized page and the last case on it (for the next cursor),
+        or None as the last case when the page is not full.
+        """
+        if view == "summary":
+            comment_count = (
+                select(func.count(CaseComment.id))
+                .where(CaseComment.case_id == Case.id)
+                .correlate(Case)
+                .scalar_subquery()
+            )
+            file_count = (
+                select(func.count(CaseFile.id))
+                .where(CaseFile.case_id == Case.id)
+                .correlate(Case)
+                .scalar_subquery()
+            )
+            query = select(Case, comment_count, file_count).options(*CASE_SUMMARY_OPTIONS)
+        else:
+            query = select(Case).options(*CASE_DETAIL_OPTIONS)
+
+        if status_id:
+            query = query.where(Case.status_id == status_id)
+        if priority_type_id:
+            query = query.where(Case.priority_type_id == priority_type_id)
+        if customer_id:
+            query = query.where(Case.customer_id == customer_id)
+        if assigned_user_id:
+            # EXISTS instead of a join: a case with several assignees stays one row
+            query = query.where(Case.assignments.any(CaseAssignment.user_id == assigned_user_id))
+
+        if search:
+            # Each predicate is served by its own GIN index and combined with a BitmapOr:
+            # trigram indexes for substring fragments, the tsvector index for whole words
+            tsquery = func.websearch_to_tsquery(cast(literal(CASE_SEARCH_CONFIG), REGCONFIG), search)
+            pattern = like_pattern(search)
+            query = query.where(or_(
+                Case.search_vector.op("@@")(tsquery),
+                Case.ticket_number.ilike(pattern),
+                Case.title.ilike(pattern),
+                Case.description.ilike(pattern),
+            ))
+            relevance = (
+                func.ts_rank_cd(Case.search_vector, tsquery)
+                + func.similarity(Case.ticket_number, search)
+                + func.similarity(Case.title, search)
+            )
+            query = query.order_by(relevance.desc()).offset(skip)
+        elif keyset:
+            query = query.where(tuple_(Case.request_date, Case.id) < tuple_(*keyset))
+        else:
+            query = query.offset(skip)
+
+        query = query.order_by(Case.request_date.desc(), Case.id.desc()).limit(limit)
+
+        if view == "summary":
+            rows = (await self.db.execute(query)).all()
+            last_case = rows[-1][0] if len(rows) == limit else None
+            return [serialize_case_summary(case, comments, files) for case, comments, files in rows], last_case
+
+        cases = (await self.db.scalars(query)).all()
+        last_case = cases[-1] if len(cases) == limit else None
+        return [serialize_case(case) for case in cases], last_case
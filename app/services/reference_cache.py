@@ -0,0 +1,150 @@
+"""
+Reference data cache: in-process copy of small, rarely changing lookup tables
+- Entries are response schema objects (not ORM instances), safe to share between requests
+- Writes call invalidate(), which bumps a version number; stale entries reload on next read
+- A TTL bounds staleness for writes made by other worker processes
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel as SchemaModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app.config import config
+from app.models.priority_type import PriorityType
+from app.models.support_status import SupportStatus
+from app.models.support_type import SupportType
+from app.models.product_category import ProductCategory
+from app.models.product_brand import ProductBrand
+from app.models.user import Role, Department
+from app.schemas.priority_type import PriorityTypeResponse
+from app.schemas.support_status import SupportStatusResponse
+from app.schemas.support_type import SupportTypeResponse
+from app.schemas.product_category import ProductCategoryResponse
+from app.schemas.product_brand import ProductBrandResponse
+from app.schemas.user import RoleResponse, DepartmentResponse
+from app.utils.etag import make_etag
+from app.utils.logger import get_logger
+from app.utils.metrics import register_cache_metrics
+
+logger = get_logger("service.reference_cache")
+
+# Support status that marks a case as closed
+COMPLETED_STATUS_NAME = "Tamamlanan"
+
+# Table name -> (query, response schema)
+REFERENCE_TABLES: Dict[str, Tuple[Any, Type[SchemaModel]]] = {
+    "priority_types": (
+        select(PriorityType).order_by(PriorityType.sort_order, PriorityType.name),
+        PriorityTypeResponse,
+    ),
+    "support_statuses": (
+        select(SupportStatus).order_by(SupportStatus.sort_order, SupportStatus.name),
+        SupportStatusResponse,
+    ),
+    "support_types": (
+        select(SupportType).order_by(SupportType.sort_order, SupportType.name),
+        SupportTypeResponse,
+    ),
+    "product_categories": (
+        select(ProductCategory).order_by(ProductCategory.sort_order, ProductCategory.name),
+        ProductCategoryResponse,
+    ),
+    "product_brands": (
+        select(ProductBrand)
+        .options(joinedload(ProductBrand.category))
+        .order_by(ProductBrand.sort_order, ProductBrand.name),
+        ProductBrandResponse,
+    ),
+    "roles": (select(Role).order_by(Role.id), RoleResponse),
+    "departments": (select(Department).order_by(Department.id), DepartmentResponse),
+}
+
+
+class ReferenceDataCache:
+    """Versioned in-process cache for the lookup tables in REFERENCE_TABLES"""
+
+    def __init__(self, ttl_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        self._version = 0
+        # name -> (version loaded at, loaded at monotonic time, rows, content ETag)
+        self._entries: Dict[str, Tuple[int, float, List[SchemaModel], str]] = {}
+        self._locks = {name: asyncio.Lock() for name in REFERENCE_TABLES}
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def version(self) -> int:
+        """Current version; changes whenever any lookup table is written"""
+        return self._version
+
+    def invalidate(self) -> None:
+        """Mark every cached table stale (call after committing a lookup table write)"""
+        self._version += 1
+        logger.debug(f"Reference data cache invalidated (version {self._version})")
+
+    def _fresh(self, name: str) -> Optional[Tuple[List[SchemaModel], str]]:
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        version, loaded_at, rows, etag = entry
+        if version != self._version or time.monotonic() - loaded_at > self.ttl_seconds:
+            return None
+        return rows, etag
+
+    async def get_tagged(self, db: AsyncSession, name: str) -> Tuple[List[SchemaModel], str]:
+        """
+        Get all rows of a lookup table and their ETag, loading it on a miss
+
+        The ETag hashes the content, so it is the same in every worker process
+        holding the same data.
+        """
+        cached = self._fresh(name)
+        if cached is not None:
+            self._hits += 1
+            return cached
+
+        async with self._locks[name]:
+            # Another request may have reloaded it while we waited
+            cached = self._fresh(name)
+            if cached is not None:
+                self._hits += 1
+                return cached
+
+            self._misses += 1
+            # Stamp with the version seen before the query: an invalidation during the
+            # load leaves the entry stale instead of caching pre-write data as current
+            version = self._version
+            query, schema = REFERENCE_TABLES[name]
+            rows = [schema.model_validate(obj) for obj in (await db.scalars(query)).unique().all()]
+            etag = make_etag(name, [row.model_dump_json() for row in rows])
+            self._entries[name] = (version, time.monotonic(), rows, etag)
+            return rows, etag
+
+    def get_stats(self) -> Dict[str, float]:
+        """Cached tables and hit/miss counters"""
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+        }
+
+    async def get(self, db: AsyncSession, name: str) -> List[SchemaModel]:
+        """Get all rows of a lookup table, loading it on a miss"""
+        rows, _ = await self.get_tagged(db, name)
+        return rows
+
+    async def get_by_name(self, db: AsyncSession, name: str, value: str) -> Optional[SchemaModel]:
+        """Find a lookup row by its name column"""
+        for row in await self.get(db, name):
+            if row.name == value:
+                return row
+        return None
+
+
+# Global cache instance
+reference_cache = ReferenceDataCache(ttl_seconds=config.get('cache.reference_ttl_seconds', 300))
+register_cache_metrics("reference", reference_cache.get_stats)
@@ -1567,7 +1567,7 @@ function showAddRoleModal() {
 // ========== CASES ==========
 async function loadCases() {
     try {
-        const response = await fetch(`${API_BASE}/cases`, {
+        const response = await fetch(`${API_BASE}/cases?view=summary`, {
             headers: { 'Authorization': `Bearer ${authToken}` }
         });
 
@@ -2318,7 +2318,7 @@ window.viewCustomerDetail = async function (id) {
 
         // Load related data
         const [casesResponse, productsResponse] = await Promise.all([
-            fetch(`${API_BASE}/cases?customer_id=${id}`, {
+            fetch(`${API_BASE}/cases?view=summary&customer_id=${id}`, {
                 headers: { 'Authorization': `Bearer ${authToken}` }
             }).catch(() => ({ ok: false })),
             fetch(`${API_BASE}/products`, {
@@ -3190,6 +3190,7 @@ function viewCase(id) { notifyInfo('Case detayı yakında eklenecek'); }
 // ========== CASES ==========
 let customers = [];
 let products = [];
+let caseCustomers = [];
 let supportStaff = [];
 let allUsers = [];
 let supportTypes = [];
@@ -3200,28 +3201,27 @@ let selectedStaffIds = new Set(); // For tag-based staff selection
 
 async function loadCaseData() {
     try {
-        [customers, products, supportStaff, allUsers, supportTypes, supportStatuses, priorityTypes, allDepartments] = await Promise.all([
-            fetch(`${API_BASE}/customers`, { headers: { 'Authorization': `Bearer ${authToken}` } }).then(r => r.ok ? r.json() : []),
-            fetch(`${API_BASE}/products`, { headers: { 'Authorization': `Bearer ${authToken}` } }).then(r => r.ok ? r.json() : []),
-            fetch(`${API_BASE}/users/support-staff`, { headers: { 'Authorization': `Bearer ${authToken}` } }).then(r => r.ok ? r.json() : []),
-            fetch(`${API_BASE}/users`, { headers: { 'Authorization': `Bearer ${authToken}` } }).then(r => r.ok ? r.json() : []),
-            fetch(`${API_BASE}/support-types`, { headers: { 'Authorization': `Bearer ${authToken}` } }).then(r => r.ok ? r.json() : []),
-            fetch(`${API_BASE}/support-statuses`, { headers: { 'Authorization': `Bearer ${authToken}` } }).then(r => r.ok ? r.json() : []),
-            fetch(`${API_BASE}/priority-types`, { headers: { 'Authorization': `Bearer ${authToken}` } }).then(r => r.ok ? r.json() : []),
-            fetch(`${API_BASE}/users/departments`, { headers: { 'Authorization': `Bearer ${authToken}` } }).then(r => r.ok ? r.json() : [])
-        ]);
+        // One request for all form reference data (compact projections, ETag-cached)
+        const response = await fetch(`${API_BASE}/bootstrap`, { headers: { 'Authorization': `Bearer ${authToken}` } });
+        if (!response.ok) return null;
+        const data = await response.json();
+        caseCustomers = data.customers;
+        supportStaff = data.support_staff;
+        allUsers = data.users;
+        supportTypes = data.support_types;
+        supportStatuses = data.support_statuses;
+        priorityTypes = data.priority_types;
+        allDepartments = data.departments;
+        return data.me;
     } catch (error) {
         console.error('Error loading case data:', error);
+        return null;
     }
 }
 
 async function showAddCaseModal() {
-    await loadCaseData();
-
-    // Get current user info
-    const currentUserInfo = await fetch(`${API_BASE}/users/me`, {
-        headers: { 'Authorization': `Bearer ${authToken}` }
-    }).then(r => r.ok ? r.json() : null).catch(() => null);
+    // Current user info comes with the bootstrap data
+    const currentUserInfo = await loadCaseData();
 
     // Set default request date (now) - format for datetime-local input
     const now = new Date();
@@ -3258,7 +3258,7 @@ async function showAddCaseModal() {
                                     <label class="form-label small">Müşteri <span class="text-danger">*</span></label>
                                     <select class="form-select form-select-sm" id="caseCustomer" required>
                                         <option value="">Müşteri Seçin</option>
-                                        ${customers.filter(c => c.is_active !== 0).map(c => `<option value="${c.id}">${c.company_name || c.name}</option>`).join('')}
+                                        ${caseCustomers.map(c => `<option value="${c.id}">${c.company_name}</option>`).join('')}
                                     </select>
                                 </div>
                                 <div class="col-md-4 mb-2">
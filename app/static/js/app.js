@@ -98,16 +98,22 @@ function showDashboard() {
 async function loadDashboard() {
     try {
         // Load cases
-        const casesResponse = await fetch(`${API_BASE}/cases?limit=10`, {
+        const casesResponse = await fetch(`${API_BASE}/cases?view=summary&limit=10`, {
             headers: {
                 'Authorization': `Bearer ${authToken}`
             }
         });
         const cases = await casesResponse.json();
         
-        // Update statistics
-        document.getElementById('openCases').textContent = cases.filter(c => c.status === 'bekleyen').length;
-        document.getElementById('assignedCases').textContent = cases.length;
+        // Update statistics (counted server-side over all cases)
+        const statsResponse = await fetch(`${API_BASE}/stats/dashboard`, {
+            headers: {
+                'Authorization': `Bearer ${authToken}`
+            }
+        });
+        const stats = await statsResponse.json();
+        document.getElementById('openCases').textContent = stats.open;
+        document.getElementById('assignedCases').textContent = stats.assigned_to_me;
         document.getElementById('highPriority').textContent = cases.filter(c => c.priority === 'high').length;
         
         // Load customers
@@ -0,0 +1,98 @@
+"""
+Structured access log
+- One JSON line per logged request (route template, status, latency, user, DB work, bytes)
+- Requests are sampled per route; errors and slow requests are always logged
+- "text" format keeps the classic one-line-per-request output (unsampled)
+"""
+import json
+import random
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from fastapi import Request
+from app.config import config
+from app.utils.logger import get_logger
+from app.utils.request_metrics import RequestMetrics
+
+# Routes (template prefixes) sampled differently from logging.access_log.sample_rate
+DEFAULT_ROUTE_SAMPLE_RATES = {
+    "/health": 0.01,
+    "/static": 0.0,
+}
+
+
+class AccessLog:
+    """Decides which requests to log and writes the access log records"""
+
+    def __init__(self):
+        self.enabled = config.get('logging.access_log.enabled', True)
+        self.format = config.get('logging.access_log.format', 'json')
+        self.sample_rate = config.get('logging.access_log.sample_rate', 0.1)
+        self.slow_ms = config.get('logging.access_log.slow_ms', 500)
+        self.route_sample_rates: Dict[str, float] = {
+            **DEFAULT_ROUTE_SAMPLE_RATES,
+            **config.get('logging.access_log.route_sample_rates', {})
+        }
+        # Longest prefix first, so "/api/cases/{case_id}" can override "/api/cases"
+        self._prefixes = sorted(self.route_sample_rates, key=len, reverse=True)
+        self.logger = get_logger("access", message_only=self.format == 'json')
+
+    def rate_for(self, route: str) -> float:
+        """Sample rate of a route template"""
+        for prefix in self._prefixes:
+            if route.startswith(prefix):
+                return self.route_sample_rates[prefix]
+        return self.sample_rate
+
+    def log(
+        self,
+        request: Request,
+        status_code: int,
+        metrics: RequestMetrics,
+        response_bytes: Optional[int] = None
+    ) -> None:
+        """Log a finished request (subject to sampling)"""
+        if not self.enabled:
+            return
+
+        duration_ms = metrics.elapsed_seconds * 1000
+        route_obj = request.scope.get("route")
+        route = getattr(route_obj, "path", None) or request.url.path
+
+        if self.format != 'json':
+            self.logger.info(
+                f"{request.method} {request.url.path} - "
+                f"Status: {status_code} - "
+                f"Time: {duration_ms / 1000:.3f}s"
+            )
+            return
+
+        if status_code >= 400:
+            reason, rate = "error", 1.0
+        elif duration_ms >= self.slow_ms:
+            reason, rate = "slow", 1.0
+        else:
+            rate = self.rate_for(route)
+            if rate <= 0 or random.random() >= rate:
+                return
+            reason = "sampled"
+
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "method": request.method,
+            "route": route,
+            "path": request.url.path,
+            "status": status_code,
+            "duration_ms": round(duration_ms, 2),
+            "user_id": metrics.user_id,
+            "db_queries": metrics.db_queries,
+            "db_ms": round(metrics.db_seconds * 1000, 2),
+            "bytes": response_bytes,
+            "client": request.client.host if request.client else None,
+            "reason": reason,
+            "sample_rate": rate,
+        }
+        self.logger.info(json.dumps(record, separators=(",", ":"), ensure_ascii=False))
+
+
+# Global access log
+access_log = AccessLog()
@@ -0,0 +1,60 @@
+"""
+Conditional GET helpers (ETag / If-None-Match -> 304 Not Modified)
+"""
+import hashlib
+from typing import Any, Sequence
+from fastapi import Request, Response, status
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Let browsers keep the response but revalidate it on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a weak ETag from values that change whenever the response changes"""
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest}"'
+
+
+async def table_state_etag(db: AsyncSession, tables: Sequence[Any], request: Request) -> str:
+    """
+    ETag for a list response built from `tables`
+
+    Uses row count and max(updated_at) of every table that contributes to the
+    response (one round trip, index-only work) plus the path and query string, so
+    any insert, update or delete in those tables changes the tag.
+    """
+    columns = []
+    for table in tables:
+        table = getattr(table, "__table__", table)
+        columns.append(select(func.count()).select_from(table).scalar_subquery())
+        if "updated_at" in table.c:
+            columns.append(select(func.max(table.c.updated_at)).scalar_subquery())
+    state = (await db.execute(select(*columns))).one()
+    return make_etag(tuple(state), request.url.path, sorted(request.query_params.multi_items()))
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check If-None-Match against an ETag (weak comparison)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """Attach the ETag and revalidation headers to a 200 response"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    """304 response for a matching If-None-Match (no body is serialized)"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
@@ -0,0 +1,175 @@
+"""
+tracemalloc-based memory leak diagnostics (opt-in)
+- Tracing starts when the performance monitor detects sustained memory growth
+  (or when an admin requests a snapshot)
+- Snapshots are diffed against the baseline taken when tracing started; the
+  top allocation sites by growth are kept as reports
+- Overhead is bounded: snapshots at most every snapshot_interval_seconds, and
+  tracing stops automatically after max_trace_seconds
+"""
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.config import config
+from app.utils.logger import get_logger
+
+logger = get_logger("performance.leaks")
+
+# Allocations made by the tracer itself or the import machinery are noise
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class LeakDiagnostics:
+    """Takes and diffs tracemalloc snapshots while memory keeps growing"""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        frames: int = 5,
+        top: int = 20,
+        snapshot_interval_seconds: float = 300,
+        max_trace_seconds: float = 1800,
+        max_reports: int = 5
+    ):
+        self.enabled = enabled
+        self.frames = frames
+        self.top = top
+        self.snapshot_interval_seconds = snapshot_interval_seconds
+        self.max_trace_seconds = max_trace_seconds
+        self._reports: "deque[Dict[str, Any]]" = deque(maxlen=max_reports)
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._trace_started_at: Optional[float] = None
+        self._last_snapshot_at: Optional[float] = None
+        self._started_tracing = False
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        """Whether a diagnostics trace is in progress"""
+        return self._baseline is not None
+
+    def on_growth_detected(self) -> None:
+        """Called by the performance monitor when memory grew for several minutes"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._baseline is None:
+                self._start()
+            elif self._snapshot_due():
+                self._report("memory growth")
+
+    def tick(self) -> None:
+        """Called periodically by the performance monitor (bounds the trace duration)"""
+        with self._lock:
+            if self._baseline is None:
+                return
+            if time.monotonic() - self._trace_started_at >= self.max_trace_seconds:
+                self._report("trace finished")
+                self._stop()
+            elif self._snapshot_due():
+                self._report("periodic")
+
+    def snapshot_now(self) -> Dict[str, Any]:
+        """Start tracing, or diff against the baseline immediately (admin request; blocking)"""
+        with self._lock:
+            if self._baseline is None:
+                self._start()
+                return self.get_status()
+            self._report("manual")
+            return self.get_status()
+
+    def stop(self) -> None:
+        """Stop tracing and drop the baseline (reports are kept)"""
+        with self._lock:
+            self._stop()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Tracing state, tracer overhead and the latest reports (newest first)"""
+        traced_current, traced_peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            "enabled": self.enabled,
+            "tracing": self.tracing,
+            "frames": self.frames,
+            "trace_seconds": round(time.monotonic() - self._trace_started_at, 1) if self.tracing else 0,
+            "max_trace_seconds": self.max_trace_seconds,
+            "snapshot_interval_seconds": self.snapshot_interval_seconds,
+            "traced_memory_kb": round(traced_current / 1024, 1),
+            "traced_peak_kb": round(traced_peak / 1024, 1),
+            "tracer_overhead_kb": round(tracemalloc.get_tracemalloc_memory() / 1024, 1),
+            "reports": list(reversed(self._reports)),
+        }
+
+    def _snapshot_due(self) -> bool:
+        return time.monotonic() - self._last_snapshot_at >= self.snapshot_interval_seconds
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        self._last_snapshot_at = time.monotonic()
+        return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+    def _start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self._trace_started_at = time.monotonic()
+        self._baseline = self._take_snapshot()
+        logger.warning(f"Leak diagnostics: tracemalloc tracing started ({self.frames} frames)")
+
+    def _stop(self) -> None:
+        self._baseline = None
+        self._trace_started_at = None
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
+        logger.info("Leak diagnostics: tracemalloc tracing stopped")
+
+    def _report(self, reason: str) -> None:
+        snapshot = self._take_snapshot()
+        stats = snapshot.compare_to(self._baseline, "traceback")
+        growing = [stat for stat in stats if stat.size_diff > 0][:self.top]
+        report = {
+            "taken_at": datetime.utcnow().isoformat(),
+            "reason": reason,
+            "trace_seconds": round(time.monotonic() - self._trace_started_at, 1),
+            "total_growth_kb": round(sum(stat.size_diff for stat in stats) / 1024, 1),
+            "top": [self._format_stat(stat) for stat in growing],
+        }
+        self._reports.append(report)
+
+        if growing:
+            site = report["top"][0]
+            logger.warning(
+                f"Leak diagnostics ({reason}): {report['total_growth_kb']} KB growth since baseline; "
+                f"top site {site['location']} +{site['size_diff_kb']} KB ({site['count_diff']:+d} blocks)"
+            )
+
+    @staticmethod
+    def _format_stat(stat: tracemalloc.StatisticDiff) -> Dict[str, Any]:
+        # Oldest frame first; the allocating line is the last one
+        frames: List[str] = [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+        return {
+            "location": frames[-1] if frames else "<unknown>",
+            "size_kb": round(stat.size / 1024, 1),
+            "size_diff_kb": round(stat.size_diff / 1024, 1),
+            "count": stat.count,
+            "count_diff": stat.count_diff,
+            "traceback": frames,
+        }
+
+
+# Global leak diagnostics instance
+leak_diagnostics = LeakDiagnostics(
+    enabled=config.get('performance.leak_diagnostics.enabled', False),
+    frames=config.get('performance.leak_diagnostics.frames', 5),
+    top=config.get('performance.leak_diagnostics.top', 20),
+    snapshot_interval_seconds=config.get('performance.leak_diagnostics.snapshot_interval_seconds', 300),
+    max_trace_seconds=config.get('performance.leak_diagnostics.max_trace_seconds', 1800),
+    max_reports=config.get('performance.leak_diagnostics.max_reports', 5)
+)
@@ -4,13 +4,17 @@ Advanced logging system with multiple handlers
 - Console logging with colors
 - Windows Event Log (for critical errors)
 - Structured logging support
+- Non-blocking: loggers only enqueue records; one background thread does all I/O
 """
+import atexit
 import logging
 import logging.handlers
+import queue
 import sys
 import os
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import zipfile
 import shutil
@@ -44,10 +48,205 @@ class ColoredFormatter(logging.Formatter):
     
     def format(self, record):
         if self.use_colors and record.levelname in self.COLORS:
+            # Color a copy: the same record is also written to the log file
+            record = logging.makeLogRecord(record.__dict__)
             record.levelname = f"{self.COLORS[record.levelname]}{record.levelname}{Colors.RESET}"
         return super().format(record)
 
 
+class BatchedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler that flushes once per batch instead of once per record"""
+    
+    def flush(self):
+        # Called by emit() after every record; the pipeline calls flush_batch() instead
+        pass
+    
+    def flush_batch(self):
+        """Flush everything written since the last batch"""
+        super().flush()
+    
+    def close(self):
+        self.flush_batch()
+        super().close()
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full"""
+    
+    def __init__(self, pipeline: "LogPipeline", owner: str):
+        super().__init__(pipeline.queue)
+        self.pipeline = pipeline
+        # Name of the logger this handler belongs to; records (including ones
+        # propagated from child loggers) are written by that logger's handlers
+        self.owner = owner
+    
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait((self.owner, record))
+        except queue.Full:
+            self.pipeline.record_dropped(self.owner)
+
+
+class LogPipeline:
+    """
+    Bounded log queue drained by a single background thread
+    
+    Loggers attach a DroppingQueueHandler; the worker thread owns every console and
+    file handler, writes records in batches, flushes once per batch and rotates
+    files. When the queue is full new records are dropped (and counted) so that
+    logging never adds latency to the caller; a summary of dropped records is
+    logged once the queue drains.
+    """
+    
+    def __init__(self, queue_size: int = 10000, batch_size: int = 256):
+        # Items are (owning logger name, record); None stops the worker
+        self.queue: "queue.Queue[Optional[Tuple[str, logging.LogRecord]]]" = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self._handlers: Dict[str, List[logging.Handler]] = {}
+        self._retired: List[logging.Handler] = []
+        self._lock = threading.Lock()
+        self._dropped: Dict[str, int] = {}
+        self._dropped_total = 0
+        self._written_total = 0
+        self._thread: Optional[threading.Thread] = None
+    
+    def register(self, name: str, handlers: List[logging.Handler]) -> None:
+        """Set the output handlers for records of logger `name`"""
+        with self._lock:
+            # Replaced handlers are closed by the worker thread, which may be using them
+            self._retired.extend(self._handlers.get(name, []))
+            self._handlers[name] = handlers
+    
+    def record_dropped(self, owner: str) -> None:
+        """Count a record that did not fit in the queue"""
+        with self._lock:
+            self._dropped[owner] = self._dropped.get(owner, 0) + 1
+            self._dropped_total += 1
+    
+    def start(self) -> None:
+        """Start the worker thread (no-op when already running)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Write out queued records and stop the worker thread"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self.queue.put(None)
+        self._thread.join(timeout=5)
+        self._thread = None
+    
+    def get_stats(self) -> Dict[str, object]:
+        """Queue depth and written/dropped counters"""
+        with self._lock:
+            return {
+                "queued": self.queue.qsize(),
+                "queue_size": self.queue.maxsize,
+                "written": self._written_total,
+                "dropped": self._dropped_total,
+                "dropped_unreported": dict(self._dropped),
+            }
+    
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stopping = None in batch
+            self._write([item for item in batch if item is not None])
+            if stopping:
+                self._write(self._drain())
+                return
+    
+    def _drain(self) -> List[Tuple[str, logging.LogRecord]]:
+        items = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return items
+            if item is not None:
+                items.append(item)
+    
+    def _write(self, items: List[Tuple[str, logging.LogRecord]]) -> None:
+        with self._lock:
+            handlers_by_name = dict(self._handlers)
+            retired, self._retired = self._retired, []
+            # Report drops once the burst is over, in the affected logger's own output
+            dropped = {}
+            if self._dropped and not self.queue.qsize():
+                dropped, self._dropped = self._dropped, {}
+        
+        for name, count in dropped.items():
+            items.append((name, logging.makeLogRecord({
+                "name": name, "levelno": logging.WARNING, "levelname": "WARNING",
+                "funcName": "log_pipeline", "msg": f"Log queue full, dropped {count} records"
+            })))
+        
+        touched = set()
+        for owner, record in items:
+            for handler in handlers_by_name.get(owner, ()):
+                if record.levelno >= handler.level:
+                    try:
+                        handler.handle(record)
+                    except Exception:
+                        handler.handleError(record)
+                    touched.add(handler)
+        
+        for handler in touched:
+            try:
+                if isinstance(handler, BatchedRotatingFileHandler):
+                    handler.flush_batch()
+                else:
+                    handler.flush()
+            except Exception:
+                pass
+        
+        for handler in retired:
+            handler.close()
+        
+        with self._lock:
+            self._written_total += len(items)
+
+
+_pipeline: Optional[LogPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_log_pipeline() -> LogPipeline:
+    """Get the process-wide log pipeline (created and started on first use)"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            try:
+                from app.config import config
+                queue_size = config.get('logging.queue_size', 10000)
+                batch_size = config.get('logging.batch_size', 256)
+            except Exception:
+                queue_size, batch_size = 10000, 256
+            _pipeline = LogPipeline(queue_size=queue_size, batch_size=batch_size)
+            atexit.register(_pipeline.stop)
+        _pipeline.start()
+        return _pipeline
+
+
+def _restart_pipeline_after_fork() -> None:
+    # Threads do not survive fork(); the child needs its own writer
+    if _pipeline is not None:
+        _pipeline._thread = None
+        _pipeline.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_pipeline_after_fork)
+
+
 class Logger:
     """Advanced logger with multiple handlers"""
     
@@ -61,8 +260,10 @@ class Logger:
         enable_console: bool = True,
         enable_file: bool = True,
         enable_event_log: bool = False,
-        console_colors: bool = True
+        console_colors: bool = True,
+        message_only: bool = False
     ):
+        """message_only: write bare messages (e.g. JSON lines) without timestamp/level prefix"""
         self.name = name
         self.log_file_path = Path(log_file_path)
         self.log_file_path.mkdir(parents=True, exist_ok=True)
@@ -71,13 +272,16 @@ class Logger:
         self.logger = logging.getLogger(name)
         self.logger.setLevel(getattr(logging, log_level.upper(), logging.INFO))
         self.logger.handlers.clear()  # Remove existing handlers
+        handlers: List[logging.Handler] = []
         
         # Console handler
         if enable_console:
             console_handler = logging.StreamHandler(sys.stdout)
             console_handler.setLevel(getattr(logging, log_level.upper(), logging.INFO))
             
-            if console_colors:
+            if message_only:
+                formatter = logging.Formatter(fmt='%(message)s')
+            elif console_colors:
                 formatter = ColoredFormatter(
                     use_colors=True,
                     fmt='%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
@@ -90,14 +294,14 @@ class Logger:
                 )
             
             console_handler.setFormatter(formatter)
-            self.logger.addHandler(console_handler)
+            handlers.append(console_handler)
         
         # File handler with rotation
         if enable_file:
             log_file = self.log_file_path / f"{name}.log"
             max_bytes = max_file_size_mb * 1024 * 1024
             
-            file_handler = logging.handlers.RotatingFileHandler(
+            file_handler = BatchedRotatingFileHandler(
                 log_file,
                 maxBytes=max_bytes,
                 backupCount=backup_count,
@@ -105,12 +309,15 @@ class Logger:
             )
             file_handler.setLevel(getattr(logging, log_level.upper(), logging.INFO))
             
-            file_formatter = logging.Formatter(
-                fmt='%(asctime)s | %(levelname)-8s | %(name)s | %(funcName)s:%(lineno)d | %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
+            if message_only:
+                file_formatter = logging.Formatter(fmt='%(message)s')
+            else:
+                file_formatter = logging.Formatter(
+                    fmt='%(asctime)s | %(levelname)-8s | %(name)s | %(funcName)s:%(lineno)d | %(message)s',
+                    datefmt='%Y-%m-%d %H:%M:%S'
+                )
             file_handler.setFormatter(file_formatter)
-            self.logger.addHandler(file_handler)
+            handlers.append(file_handler)
         
         # Windows Event Log handler (for critical errors only)
         if enable_event_log and sys.platform == 'win32':
@@ -121,10 +328,15 @@ class Logger:
                     fmt='%(name)s: %(message)s'
                 )
                 event_handler.setFormatter(event_formatter)
-                self.logger.addHandler(event_handler)
+                handlers.append(event_handler)
             except Exception as e:
                 # If Event Log fails, log to file
                 self.logger.warning(f"Failed to initialize Windows Event Log: {e}")
+        
+        # The logger itself only enqueues; the pipeline thread writes to the handlers
+        pipeline = get_log_pipeline()
+        pipeline.register(name, handlers)
+        self.logger.addHandler(DroppingQueueHandler(pipeline, name))
     
     def archive_old_logs(self, days: int = 30) -> None:
         """Archive log files older than specified days"""
@@ -171,7 +383,11 @@ class Logger:
         self.logger.exception(message, *args, **kwargs)
 
 
-def get_logger(name: str = "ticket_system", config: Optional[object] = None) -> Logger:
+def get_logger(
+    name: str = "ticket_system",
+    config: Optional[object] = None,
+    message_only: bool = False
+) -> Logger:
     """Factory function to create logger with config"""
     if config:
         return Logger(
@@ -183,10 +399,11 @@ def get_logger(name: str = "ticket_system", config: Optional[object] = None) ->
             enable_console=config.get('logging.enable_console', True),
             enable_file=config.get('logging.enable_file', True),
             enable_event_log=config.get('logging.enable_event_log', False),
-            console_colors=config.get('logging.console_colors', True)
+            console_colors=config.get('logging.console_colors', True),
+            message_only=message_only
         )
     else:
-        return Logger(name=name)
+        return Logger(name=name, message_only=message_only)
 
 
 
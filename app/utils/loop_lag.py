@@ -0,0 +1,224 @@
+"""
+Event-loop lag monitoring
+- A heartbeat coroutine sleeps `interval` seconds and measures how late it wakes
+  up (scheduling lag), recorded in the event_loop_lag_seconds histogram
+- A watchdog thread notices when the heartbeat is overdue by more than
+  `stall_threshold_ms` and captures the event-loop thread's stack with
+  sys._current_frames(), i.e. the code that is blocking the loop
+- Stalls are logged to "performance.loop", counted in event_loop_stalls_total
+  (by blocking location) and the most recent ones kept for the admin API
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Optional
+from app.config import config
+from app.utils.logger import get_logger
+from app.utils.metrics import registry
+
+logger = get_logger("performance.loop")
+
+# Frames inside the application package identify the blocking code
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PROJECT_DIR = os.path.dirname(_APP_DIR)
+
+event_loop_lag_seconds = registry.histogram(
+    "event_loop_lag_seconds",
+    "How late the event-loop heartbeat woke up",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+event_loop_stalls_total = registry.counter(
+    "event_loop_stalls_total",
+    "Event-loop stalls longer than the threshold, by blocking code location",
+    ("location",)
+)
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(_PROJECT_DIR + os.sep):
+        return os.path.relpath(filename, _PROJECT_DIR)
+    return filename
+
+
+def _blocking_location(frame) -> str:
+    """Innermost application frame of a stack (innermost frame when none is ours)"""
+    innermost = frame
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(_APP_DIR + os.sep) and frame.f_code.co_filename != __file__:
+            break
+        frame = frame.f_back
+    frame = frame or innermost
+    return f"{_short_path(frame.f_code.co_filename)}:{frame.f_lineno} ({frame.f_code.co_name})"
+
+
+class EventLoopLagMonitor:
+    """Heartbeat task on the event loop plus a watchdog thread that catches stalls"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        interval: float = 0.5,
+        stall_threshold_ms: float = 200,
+        max_stalls: int = 20,
+        stack_limit: int = 30
+    ):
+        self.enabled = enabled
+        self.interval = interval
+        self.stall_threshold = stall_threshold_ms / 1000
+        self.stack_limit = stack_limit
+        self._stalls: "deque[Dict[str, Any]]" = deque(maxlen=max_stalls)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        # Start of the current heartbeat sleep; None while not running
+        self._beat_started: Optional[float] = None
+        # Stall captured by the watchdog for the current beat (completed by the heartbeat)
+        self._pending_stall: Optional[Dict[str, Any]] = None
+        self._max_lag = 0.0
+        self._beats = 0
+        self._stall_count = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the heartbeat on the running event loop and the watchdog thread"""
+        if not self.enabled or self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._beat_started = time.monotonic()
+        self._task = self._loop.create_task(self._heartbeat(), name="event-loop-heartbeat")
+        self._watchdog = threading.Thread(target=self._watch, name="event-loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(
+            f"Event-loop lag monitor started (interval: {self.interval}s, "
+            f"stall threshold: {self.stall_threshold * 1000:.0f} ms)"
+        )
+
+    def stop(self) -> None:
+        """Cancel the heartbeat and stop the watchdog (call from the event loop)"""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=5)
+            self._watchdog = None
+        self._beat_started = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            started = time.monotonic()
+            self._beat_started = started
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - started - self.interval)
+            event_loop_lag_seconds.observe(lag)
+            with self._lock:
+                self._beats += 1
+                self._max_lag = max(self._max_lag, lag)
+                stall, self._pending_stall = self._pending_stall, None
+                if lag >= self.stall_threshold:
+                    self._stall_count += 1
+            if lag < self.stall_threshold:
+                continue
+
+            location = stall["location"] if stall else "unknown"
+            event_loop_stalls_total.inc(location=location)
+            if stall:
+                stall["duration_ms"] = round(lag * 1000, 1)
+                logger.warning(f"Event loop blocked for {lag * 1000:.0f} ms at {location}")
+            else:
+                # Shorter than the watchdog's polling period; only the duration is known
+                logger.warning(f"Event loop blocked for {lag * 1000:.0f} ms (stack not captured)")
+
+    def _watch(self) -> None:
+        """Watchdog thread: capture the loop thread's stack while the heartbeat is overdue"""
+        poll = min(self.interval, self.stall_threshold) / 2
+        captured_beat = None
+        while not self._stop.wait(poll):
+            beat_started = self._beat_started
+            if beat_started is None or beat_started == captured_beat:
+                continue
+            overdue = time.monotonic() - beat_started - self.interval
+            if overdue < self.stall_threshold:
+                continue
+            captured_beat = beat_started
+            try:
+                self._capture(overdue)
+            except Exception as e:
+                logger.error(f"Error capturing event-loop stack: {e}")
+
+    def _capture(self, overdue: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = [
+            f"{_short_path(entry.filename)}:{entry.lineno} in {entry.name}"
+            + (f": {entry.line}" if entry.line else "")
+            for entry in traceback.extract_stack(frame, limit=self.stack_limit)
+        ]
+        task = None
+        try:
+            # Read-only lookup of the task the loop is running
+            current = asyncio.current_task(self._loop)
+            if current is not None:
+                task = getattr(current.get_coro(), '__qualname__', current.get_name())
+        except Exception:
+            pass
+        stall = {
+            "detected_at": datetime.utcnow().isoformat(),
+            "detected_after_ms": round(overdue * 1000, 1),
+            "duration_ms": None,
+            "task": task,
+            "location": _blocking_location(frame),
+            "stack": stack,
+        }
+        with self._lock:
+            self._pending_stall = stall
+            self._stalls.append(stall)
+        logger.warning(
+            f"Event loop stalled for {overdue * 1000:.0f} ms so far at {stall['location']} "
+            f"(task: {task})\n" + "\n".join(stack)
+        )
+
+    def take_max_lag_ms(self) -> float:
+        """Largest lag since the previous call, in ms (read and reset by the performance monitor)"""
+        with self._lock:
+            lag, self._max_lag = self._max_lag, 0.0
+        return lag * 1000
+
+    def get_status(self) -> Dict[str, Any]:
+        """Configuration, counters and the most recent stalls (newest first)"""
+        with self._lock:
+            stalls = list(reversed(self._stalls))
+            beats, stall_count = self._beats, self._stall_count
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "stall_threshold_ms": self.stall_threshold * 1000,
+            "heartbeats": beats,
+            "stalls": stall_count,
+            "recent_stalls": stalls,
+        }
+
+
+# Global event-loop lag monitor (started by the performance monitor)
+loop_lag_monitor = EventLoopLagMonitor(
+    enabled=config.get('performance.loop_lag.enabled', True),
+    interval=config.get('performance.loop_lag.interval_seconds', 0.5),
+    stall_threshold_ms=config.get('performance.loop_lag.stall_threshold_ms', 200),
+    max_stalls=config.get('performance.loop_lag.max_stalls', 20),
+    stack_limit=config.get('performance.loop_lag.stack_limit', 30)
+)
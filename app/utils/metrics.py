@@ -0,0 +1,325 @@
+"""
+In-process metrics registry with Prometheus text exposition
+- Counters, gauges and histograms with labels (no external client library)
+- Collectors: callbacks that produce metrics at scrape time (pools, caches, process)
+- Rendered by GET /metrics in text format 0.0.4
+"""
+import bisect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Request latency buckets (seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+# (name, labels, value) produced by collectors
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class _Metric(ABC):
+    """Base class: a named metric family with fixed label names"""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _labels(self, key: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.label_names, key))
+
+    @abstractmethod
+    def samples(self) -> Iterable[Sample]:
+        """(name, labels, value) of every sample in the family"""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(
+            f"{name}{_format_labels(labels)} {_format_value(value)}"
+            for name, labels, value in self.samples()
+        )
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        return [(self.name, self._labels(key), value) for key, value in values]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        return [(self.name, self._labels(key), value) for key, value in values]
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, with sum and count"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts incl. +Inf, sum)
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            counts, total = entry
+            counts[index] += 1
+            total[0] += value
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        samples = []
+        for key, counts, total in values:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class _CollectedFamily:
+    """Metric family whose samples come from a collector callback"""
+
+    def __init__(self, name: str, documentation: str, type_name: str):
+        self.name = name
+        self.documentation = documentation
+        self.type_name = type_name
+        self.samples: List[Sample] = []
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(
+            f"{name}{_format_labels(labels)} {_format_value(value)}"
+            for name, labels, value in self.samples
+        )
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and collectors and renders them in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        # (name, documentation, type, callback returning [(labels, value)])
+        self._collectors: List[Tuple[str, str, str, Callable[[], Iterable[Tuple[Dict[str, str], float]]]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def register_collector(
+        self,
+        name: str,
+        documentation: str,
+        type_name: str,
+        callback: Callable[[], Iterable[Tuple[Dict[str, str], float]]]
+    ) -> None:
+        """Add a metric whose (labels, value) samples are read at scrape time"""
+        with self._lock:
+            self._collectors.append((name, documentation, type_name, callback))
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+
+        families: Dict[str, _CollectedFamily] = {}
+        for name, documentation, type_name, callback in collectors:
+            family = families.get(name)
+            if family is None:
+                family = families[name] = _CollectedFamily(name, documentation, type_name)
+            try:
+                family.samples.extend((name, labels, value) for labels, value in callback())
+            except Exception:
+                # A failing collector must not break the whole scrape
+                continue
+        for family in families.values():
+            lines.extend(family.render())
+
+        return "\n".join(lines) + "\n"
+
+
+# Global registry
+registry = MetricsRegistry()
+
+# HTTP metrics (recorded by the request middleware)
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests by method, route template and status", ("method", "route", "status")
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route template", ("method", "route")
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled"
+)
+http_requests_in_flight.set(0)
+
+# Connection pool checkout and connect time (recorded by the timed pool classes)
+POOL_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+db_pool_checkout_seconds = registry.histogram(
+    "db_pool_checkout_seconds",
+    "Time to check out a database connection (queue wait plus connecting when the pool grows)",
+    ("pool",), buckets=POOL_BUCKETS
+)
+db_pool_connect_seconds = registry.histogram(
+    "db_pool_connect_seconds", "Time to open a new database connection for the pool", ("pool",),
+    buckets=POOL_BUCKETS
+)
+
+
+class PoolTimingMixin:
+    """Mixin for SQLAlchemy pool classes: time connection checkouts and new connections"""
+
+    metrics_label = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_seconds.observe(time.perf_counter() - started, pool=self.metrics_label)
+
+    def _create_connection(self):
+        started = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            db_pool_connect_seconds.observe(time.perf_counter() - started, pool=self.metrics_label)
+
+
+def register_cache_metrics(cache_name: str, get_stats: Callable[[], Dict[str, float]]) -> None:
+    """Expose a cache's get_stats() (hits, misses, size) as cache_* metrics"""
+    registry.register_collector(
+        "cache_hits_total", "Cache lookups served from the cache", "counter",
+        lambda: [({"cache": cache_name}, get_stats()["hits"])]
+    )
+    registry.register_collector(
+        "cache_misses_total", "Cache lookups that had to load the value", "counter",
+        lambda: [({"cache": cache_name}, get_stats()["misses"])]
+    )
+    registry.register_collector(
+        "cache_hit_ratio", "Share of cache lookups served from the cache since start", "gauge",
+        lambda: [({"cache": cache_name}, get_stats()["hit_rate"])]
+    )
+    registry.register_collector(
+        "cache_entries", "Entries currently held by the cache", "gauge",
+        lambda: [({"cache": cache_name}, get_stats()["size"])]
+    )
+
+
+def route_label(scope: dict) -> str:
+    """Route template of a request, bounded in cardinality for metric labels"""
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    path = scope.get("path", "")
+    if path.startswith("/static/"):
+        return "/static"
+    return "<unmatched>"
@@ -3,93 +3,261 @@ Performance monitoring utilities
 - Memory tracking (RSS, VMS, percentage)
 - CPU usage tracking
 - Memory leak detection
-- Historical data storage
+- Event-loop lag (heartbeat and stall watchdog, see loop_lag)
+- Historical data storage (array ring buffers: raw, 1-minute and 1-hour tiers)
 """
+import asyncio
+import bisect
+import math
 import psutil
+import statistics
 import threading
 import time
-from typing import Dict, List, Optional
+from array import array
+from typing import Dict, List, Optional, Sequence
 from datetime import datetime
-from collections import deque
 from app.utils.logger import get_logger
+from app.utils.metrics import registry
+from app.utils.leak_diagnostics import leak_diagnostics
+from app.utils.loop_lag import loop_lag_monitor
 
 logger = get_logger("performance")
 
+# Metrics kept in the history tiers
+HISTORY_METRICS = ("rss_mb", "vms_mb", "memory_percent", "cpu_percent", "num_threads", "num_fds", "loop_lag_ms")
+
+
+class RingBuffer:
+    """Fixed-size circular buffer of floats backed by array('d')"""
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = array('d', bytes(8 * capacity))
+        self._next = 0
+        self._count = 0
+    
+    def append(self, value: float) -> None:
+        self._data[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+    
+    def values(self, last: Optional[int] = None) -> array:
+        """Stored values, oldest first (optionally only the newest `last`)"""
+        count = self._count if last is None else min(last, self._count)
+        start = (self._next - count) % self.capacity
+        if start + count <= self.capacity:
+            return self._data[start:start + count]
+        return self._data[start:] + self._data[:self._next]
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    @property
+    def nbytes(self) -> int:
+        return self._data.itemsize * self.capacity
+
+
+class MetricHistory:
+    """
+    One retention tier: a timestamp ring plus one ring per metric
+    
+    Samples are averages over `resolution` seconds; the newest `capacity`
+    samples are kept.
+    """
+    
+    def __init__(self, name: str, resolution: float, capacity: int):
+        self.name = name
+        self.resolution = resolution
+        self.capacity = capacity
+        self.timestamps = RingBuffer(capacity)
+        self.series = {metric: RingBuffer(capacity) for metric in HISTORY_METRICS}
+    
+    def append(self, timestamp: float, values: Dict[str, float]) -> None:
+        self.timestamps.append(timestamp)
+        for metric, ring in self.series.items():
+            ring.append(values.get(metric, 0.0))
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + sum(ring.nbytes for ring in self.series.values())
+    
+    def window_start(self, window_seconds: Optional[float]) -> int:
+        """How many of the newest samples fall inside the last `window_seconds`"""
+        if window_seconds is None:
+            return len(self)
+        timestamps = self.timestamps.values()
+        cutoff = time.time() - window_seconds
+        return len(timestamps) - bisect.bisect_left(timestamps, cutoff)
+
+
+class _Rollup:
+    """Running average of samples for the current bucket of a coarser tier"""
+    
+    def __init__(self, tier: MetricHistory):
+        self.tier = tier
+        self.bucket: Optional[int] = None
+        self.count = 0
+        self.sums: Dict[str, float] = {}
+    
+    def add(self, timestamp: float, values: Dict[str, float]) -> Optional[Dict[str, float]]:
+        """Accumulate a sample; returns the finished bucket's averages when a new bucket starts"""
+        bucket = int(timestamp // self.tier.resolution)
+        finished = None
+        if self.bucket is not None and bucket != self.bucket and self.count:
+            finished = {metric: total / self.count for metric, total in self.sums.items()}
+            self.tier.append((self.bucket + 1) * self.tier.resolution, finished)
+            self.count, self.sums = 0, {}
+        self.bucket = bucket
+        self.count += 1
+        for metric, value in values.items():
+            self.sums[metric] = self.sums.get(metric, 0.0) + value
+        return finished
+
+
+def percentiles(values: Sequence[float]) -> List[float]:
+    """99 percentile cut points (p1..p99, linear interpolation) of a non-empty series"""
+    if len(values) == 1:
+        return [values[0]] * 99
+    return statistics.quantiles(values, n=100, method='inclusive')
+
 
 class PerformanceMonitor:
-    """Performance monitoring with memory and CPU tracking"""
+    """
+    Performance monitoring with memory and CPU tracking
+    
+    A background thread samples the process every `sample_interval` seconds into
+    array-backed ring buffers with three retention tiers: raw samples, 1-minute
+    and 1-hour averages. Limit checks and leak detection run on the 1-minute
+    averages. When started from the event loop it also runs the event-loop
+    heartbeat; each sample records the largest lag since the previous one.
+    """
     
     def __init__(
         self,
-        check_interval: int = 60,
-        max_history: int = 100,
+        sample_interval: float = 1,
+        raw_points: int = 3600,
+        minute_points: int = 1440,
+        hour_points: int = 720,
         memory_limit_mb: Optional[int] = None,
         cpu_limit_percent: Optional[float] = None
     ):
-        self.check_interval = check_interval
-        self.max_history = max_history
+        self.sample_interval = sample_interval
         self.memory_limit_mb = memory_limit_mb
         self.cpu_limit_percent = cpu_limit_percent
         
-        self.history: deque = deque(maxlen=max_history)
+        self.tiers: Dict[str, MetricHistory] = {
+            "raw": MetricHistory("raw", sample_interval, raw_points),
+            "1m": MetricHistory("1m", 60, minute_points),
+            "1h": MetricHistory("1h", 3600, hour_points),
+        }
+        self._rollups = [_Rollup(self.tiers["1m"]), _Rollup(self.tiers["1h"])]
+        self._latest: Optional[Dict] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
         self.monitoring = False
         self.monitor_thread: Optional[threading.Thread] = None
         self.process = psutil.Process()
         
-        logger.info(f"Performance monitor initialized (interval: {check_interval}s)")
+        logger.info(
+            f"Performance monitor initialized (interval: {sample_interval}s, "
+            f"history: {self.history_bytes // 1024} KB)"
+        )
+    
+    @property
+    def history_bytes(self) -> int:
+        """Memory held by the history buffers"""
+        return sum(tier.nbytes for tier in self.tiers.values())
     
     def start_monitoring(self):
-        """Start background monitoring"""
+        """Start background monitoring (and the event-loop heartbeat when called on a running loop)"""
         if self.monitoring:
             logger.warning("Monitoring already started")
             return
         
         self.monitoring = True
-        self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
+        self._stop.clear()
+        self.monitor_thread = threading.Thread(target=self._monitor_loop, name="performance-monitor", daemon=True)
         self.monitor_thread.start()
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            logger.debug("No running event loop; event-loop lag is not monitored")
+        else:
+            loop_lag_monitor.start()
         logger.info("Performance monitoring started")
     
     def stop_monitoring(self):
         """Stop background monitoring"""
         self.monitoring = False
+        self._stop.set()
+        loop_lag_monitor.stop()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
         logger.info("Performance monitoring stopped")
     
     def _monitor_loop(self):
         """Background monitoring loop"""
-        while self.monitoring:
+        # First cpu_percent(None) call only sets the baseline
+        self.process.cpu_percent(interval=None)
+        while not self._stop.wait(self.sample_interval):
             try:
-                metrics = self.get_current_metrics()
-                self.history.append(metrics)
-                
-                # Check limits
-                if self.memory_limit_mb and metrics['memory_mb'] > self.memory_limit_mb:
-                    logger.warning(
-                        f"Memory limit exceeded: {metrics['memory_mb']:.2f} MB > {self.memory_limit_mb} MB"
-                    )
-                
-                if self.cpu_limit_percent and metrics['cpu_percent'] > self.cpu_limit_percent:
-                    logger.warning(
-                        f"CPU limit exceeded: {metrics['cpu_percent']:.2f}% > {self.cpu_limit_percent}%"
-                    )
-                
-                # Memory leak detection (check if memory is consistently increasing)
-                if len(self.history) >= 10:
-                    recent_memory = [m['memory_mb'] for m in list(self.history)[-10:]]
-                    if all(recent_memory[i] < recent_memory[i+1] for i in range(len(recent_memory)-1)):
-                        logger.warning("Potential memory leak detected: memory consistently increasing")
-                
+                metrics = self.get_current_metrics(cpu_interval=None)
+                if 'error' not in metrics:
+                    metrics['loop_lag_ms'] = loop_lag_monitor.take_max_lag_ms()
+                    self._record(metrics)
             except Exception as e:
                 logger.error(f"Error in performance monitoring: {e}")
-            
-            time.sleep(self.check_interval)
     
-    def get_current_metrics(self) -> Dict:
-        """Get current performance metrics"""
+    def _record(self, metrics: Dict) -> None:
+        timestamp = time.time()
+        values = {metric: float(metrics[metric]) for metric in HISTORY_METRICS}
+        with self._lock:
+            self._latest = metrics
+            self.tiers["raw"].append(timestamp, values)
+            finished_minute = None
+            for rollup in self._rollups:
+                finished = rollup.add(timestamp, values)
+                if rollup.tier.name == "1m":
+                    finished_minute = finished
+        if finished_minute is not None:
+            self._check_limits(finished_minute)
+            leak_diagnostics.tick()
+    
+    def _check_limits(self, minute: Dict[str, float]) -> None:
+        """Limit checks and leak detection on a finished 1-minute average"""
+        if self.memory_limit_mb and minute['rss_mb'] > self.memory_limit_mb:
+            logger.warning(
+                f"Memory limit exceeded: {minute['rss_mb']:.2f} MB > {self.memory_limit_mb} MB"
+            )
+        
+        if self.cpu_limit_percent and minute['cpu_percent'] > self.cpu_limit_percent:
+            logger.warning(
+                f"CPU limit exceeded: {minute['cpu_percent']:.2f}% > {self.cpu_limit_percent}%"
+            )
+        
+        # Memory leak detection (memory increasing for 10 consecutive minutes)
+        with self._lock:
+            recent_memory = self.tiers["1m"].series["rss_mb"].values(last=10)
+        if len(recent_memory) >= 10 and all(
+            recent_memory[i] < recent_memory[i + 1] for i in range(len(recent_memory) - 1)
+        ):
+            logger.warning("Potential memory leak detected: memory consistently increasing")
+            # Opt-in: trace allocations to find out what is growing
+            leak_diagnostics.on_growth_detected()
+    
+    def get_current_metrics(self, cpu_interval: Optional[float] = 0.1) -> Dict:
+        """
+        Measure the process now
+        
+        With the default cpu_interval this blocks for 0.1 s; request handlers should use
+        get_latest_metrics() instead.
+        """
         try:
             memory_info = self.process.memory_info()
-            cpu_percent = self.process.cpu_percent(interval=0.1)
+            cpu_percent = self.process.cpu_percent(interval=cpu_interval)
             memory_percent = self.process.memory_percent()
             
             return {
@@ -109,37 +277,102 @@ class PerformanceMonitor:
                 'error': str(e)
             }
     
-    def get_history(self, limit: Optional[int] = None) -> List[Dict]:
-        """Get performance history"""
-        history_list = list(self.history)
-        if limit:
-            return history_list[-limit:]
-        return history_list
-    
-    def get_summary(self) -> Dict:
-        """Get performance summary statistics"""
-        if not self.history:
-            return {"message": "No data available"}
+    def get_latest_metrics(self) -> Optional[Dict]:
+        """Most recent sample taken by the monitor thread (no measurement, never blocks)"""
+        return self._latest
+    
+    def _tier(self, tier: str) -> MetricHistory:
+        if tier not in self.tiers:
+            raise ValueError(f"Unknown tier '{tier}', expected one of: {', '.join(self.tiers)}")
+        return self.tiers[tier]
+    
+    def get_history(
+        self,
+        tier: str = "raw",
+        limit: Optional[int] = None,
+        metrics: Optional[Sequence[str]] = None
+    ) -> Dict:
+        """Samples of one tier as parallel arrays (timestamps in epoch seconds), oldest first"""
+        history = self._tier(tier)
+        names = [metric for metric in (metrics or HISTORY_METRICS) if metric in history.series]
+        with self._lock:
+            timestamps = history.timestamps.values(limit)
+            series = {metric: history.series[metric].values(limit) for metric in names}
+        return {
+            "tier": tier,
+            "resolution_seconds": history.resolution,
+            "timestamps": timestamps.tolist(),
+            "series": {metric: [round(value, 3) for value in values] for metric, values in series.items()},
+        }
+    
+    def get_summary(self, tier: str = "raw", window_seconds: Optional[float] = None) -> Dict:
+        """min/avg/p50/p95/p99/max per metric over a tier (optionally only the last window_seconds)"""
+        history = self._tier(tier)
+        with self._lock:
+            count = history.window_start(window_seconds)
+            series = {metric: ring.values(count) for metric, ring in history.series.items()}
         
-        history_list = list(self.history)
-        memory_values = [m.get('memory_mb', 0) for m in history_list if 'memory_mb' in m]
-        cpu_values = [m.get('cpu_percent', 0) for m in history_list if 'cpu_percent' in m]
+        if not count:
+            return {"tier": tier, "data_points": 0, "message": "No data available"}
         
-        return {
-            'data_points': len(history_list),
-            'memory_mb': {
-                'current': memory_values[-1] if memory_values else 0,
-                'average': sum(memory_values) / len(memory_values) if memory_values else 0,
-                'min': min(memory_values) if memory_values else 0,
-                'max': max(memory_values) if memory_values else 0
-            },
-            'cpu_percent': {
-                'current': cpu_values[-1] if cpu_values else 0,
-                'average': sum(cpu_values) / len(cpu_values) if cpu_values else 0,
-                'min': min(cpu_values) if cpu_values else 0,
-                'max': max(cpu_values) if cpu_values else 0
+        summary = {"tier": tier, "resolution_seconds": history.resolution, "data_points": count}
+        for metric, values in series.items():
+            cuts = percentiles(values)
+            summary[metric] = {
+                "current": round(values[-1], 3),
+                "min": round(min(values), 3),
+                "avg": round(math.fsum(values) / count, 3),
+                "p50": round(cuts[49], 3),
+                "p95": round(cuts[94], 3),
+                "p99": round(cuts[98], 3),
+                "max": round(max(values), 3),
             }
-        }
+        return summary
+    
+    def get_retention(self) -> List[Dict]:
+        """Resolution, capacity and fill of every tier"""
+        return [
+            {
+                "tier": name,
+                "resolution_seconds": tier.resolution,
+                "capacity": tier.capacity,
+                "data_points": len(tier),
+                "bytes": tier.nbytes,
+            }
+            for name, tier in self.tiers.items()
+        ]
+
+
+def _process_metric(read):
+    """Collector callback reading one value from the current process"""
+    process = psutil.Process()
+    return lambda: [({}, read(process))]
+
+
+registry.register_collector(
+    "process_resident_memory_bytes", "Resident memory size in bytes", "gauge",
+    _process_metric(lambda p: p.memory_info().rss)
+)
+registry.register_collector(
+    "process_virtual_memory_bytes", "Virtual memory size in bytes", "gauge",
+    _process_metric(lambda p: p.memory_info().vms)
+)
+registry.register_collector(
+    "process_cpu_seconds_total", "User and system CPU time in seconds", "counter",
+    _process_metric(lambda p: sum(p.cpu_times()[:2]))
+)
+registry.register_collector(
+    "process_threads", "Number of OS threads", "gauge",
+    _process_metric(lambda p: p.num_threads())
+)
+registry.register_collector(
+    "process_open_fds", "Number of open file descriptors", "gauge",
+    _process_metric(lambda p: p.num_fds() if hasattr(p, 'num_fds') else 0)
+)
+registry.register_collector(
+    "process_start_time_seconds", "Process start time since the Unix epoch", "gauge",
+    _process_metric(lambda p: p.create_time())
+)
 
 
 # Global monitor instance
@@ -152,8 +385,21 @@ def get_monitor(config: Optional[object] = None) -> PerformanceMonitor:
     
     if _monitor is None:
         if config:
+            sample_interval = config.get('performance.sample_interval_seconds')
+            if sample_interval is None:
+                sample_interval = config.get('performance.memory_check_interval')
+                if sample_interval is not None:
+                    logger.warning(
+                        "performance.memory_check_interval is deprecated, "
+                        "use performance.sample_interval_seconds"
+                    )
+                else:
+                    sample_interval = 1
             _monitor = PerformanceMonitor(
-                check_interval=config.get('performance.memory_check_interval', 60),
+                sample_interval=sample_interval,
+                raw_points=config.get('performance.history.raw_points', 3600),
+                minute_points=config.get('performance.history.minute_points', 1440),
+                hour_points=config.get('performance.history.hour_points', 720),
                 memory_limit_mb=config.get('performance.max_memory_mb'),
                 cpu_limit_percent=config.get('performance.cpu_limit_percent')
             )
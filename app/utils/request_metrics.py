@@ -0,0 +1,151 @@
+"""
+Per-request metrics collected while a request is handled
+- The HTTP middleware starts a RequestMetrics object for every request
+- SQLAlchemy cursor hooks count queries and database time into it
+- Auth records the user ID once the principal is known
+- Statements are counted by shape to detect N+1 query patterns
+"""
+import re
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import config
+from app.utils.logger import get_logger
+from app.utils.metrics import registry
+
+logger = get_logger("performance.sql")
+
+# A statement shape executed more often than this in one request is reported
+REPEATED_STATEMENT_THRESHOLD = config.get('performance.n_plus_one_threshold', 10)
+DB_TIMING_HEADERS = config.get('performance.db_timing_headers', True)
+
+db_repeated_statements_total = registry.counter(
+    "db_repeated_statements_total",
+    "Requests in which one statement shape ran more than the N+1 threshold",
+    ("route",)
+)
+
+
+class RequestMetrics:
+    """Mutable per-request counters (shared with tasks spawned by the request)"""
+
+    __slots__ = ("started_at", "user_id", "db_queries", "db_seconds", "statements")
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.user_id: Optional[int] = None
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        # SQL text -> executions (the compiled-statement cache keeps texts stable)
+        self.statements: Dict[str, int] = {}
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """Time since the request started"""
+        return time.perf_counter() - self.started_at
+
+    def repeated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed more than `threshold` times, most frequent first"""
+        shapes: Dict[str, int] = {}
+        for statement, count in self.statements.items():
+            shape = statement_shape(statement)
+            shapes[shape] = shapes.get(shape, 0) + count
+        return sorted(
+            ((shape, count) for shape, count in shapes.items() if count > threshold),
+            key=lambda item: item[1],
+            reverse=True
+        )
+
+
+# Placeholder lists of expanded IN (...) parameters: "($1, $2, $3)" -> "(?)"
+_PLACEHOLDER_LIST_RE = re.compile(r"\(\s*(?:\$\d+|\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\$\d+|\?|%\(\w+\)s|:\w+))*\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize SQL text so statements differing only in IN-list length compare equal"""
+    return _WHITESPACE_RE.sub(" ", _PLACEHOLDER_LIST_RE.sub("(?)", statement)).strip()
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def start_request_metrics() -> RequestMetrics:
+    """Begin collecting metrics for the current request"""
+    metrics = RequestMetrics()
+    _current.set(metrics)
+    return metrics
+
+
+def get_request_metrics() -> Optional[RequestMetrics]:
+    """Metrics of the request being handled, or None outside a request"""
+    return _current.get()
+
+
+def set_request_user(user_id: int) -> None:
+    """Record the authenticated user of the current request"""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.user_id = user_id
+
+
+def report_repeated_statements(metrics: RequestMetrics, method: str, route: str) -> None:
+    """Log a warning when one statement shape ran too often in a request (N+1 pattern)"""
+    if metrics.db_queries <= REPEATED_STATEMENT_THRESHOLD:
+        return
+    repeated = metrics.repeated_statements(REPEATED_STATEMENT_THRESHOLD)
+    if not repeated:
+        return
+    db_repeated_statements_total.inc(route=route)
+    for shape, count in repeated[:3]:
+        logger.warning(
+            f"Possible N+1 query in {method} {route}: statement ran {count} times "
+            f"({metrics.db_queries} queries in request): {shape[:300]}"
+        )
+
+
+def timing_headers(metrics: RequestMetrics) -> Dict[str, str]:
+    """X-DB-Queries and Server-Timing response headers for a finished request"""
+    if not DB_TIMING_HEADERS:
+        return {}
+    return {
+        "X-DB-Queries": str(metrics.db_queries),
+        "Server-Timing": (
+            f'db;dur={metrics.db_seconds * 1000:.1f};desc="{metrics.db_queries} queries", '
+            f"total;dur={metrics.elapsed_seconds * 1000:.1f}"
+        ),
+    }
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started_at")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.db_queries += 1
+        metrics.db_seconds += elapsed
+        if statement is not None:
+            metrics.statements[statement] = metrics.statements.get(statement, 0) + 1
+
+
+def _handle_error(exception_context):
+    # The failed statement never reaches after_cursor_execute; still count it
+    conn = exception_context.connection
+    if conn is not None:
+        _after_cursor_execute(conn, None, None, None, None, False)
+
+
+def install_query_hooks() -> None:
+    """Count queries of every engine (sync and async) into the current request"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
@@ -0,0 +1,31 @@
+"""
+Text search helpers
+"""
+import re
+
+# Turkish VKN (10 digits) or TCKN (11 digits)
+TAX_NUMBER_RE = re.compile(r"^\d{10,11}$")
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Shortest term pg_trgm can serve from a GIN index (one full trigram)
+MIN_TRIGRAM_LENGTH = 3
+
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards so the term matches literally (default backslash escape)"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def like_pattern(term: str) -> str:
+    """Build an ILIKE '%term%' pattern with LIKE wildcards in the term escaped"""
+    return f"%{escape_like(term)}%"
+
+
+def looks_like_tax_number(term: str) -> bool:
+    """Check whether a search term is a complete tax number"""
+    return bool(TAX_NUMBER_RE.match(term))
+
+
+def looks_like_email(term: str) -> bool:
+    """Check whether a search term is a complete email address"""
+    return bool(EMAIL_RE.match(term))
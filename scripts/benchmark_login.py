@@ -0,0 +1,122 @@
+"""
+Login throughput benchmark
+Fires concurrent logins at a running server while probing /health, to show
+login throughput and how responsive the event loop stays during bcrypt work.
+Run: python scripts/benchmark_login.py --email admin@3-d.com.tr --password <password>
+Every login uses the same account, so the script refuses to run unless the
+server reports login throttling as disabled (auth.login_rate_limit.enabled).
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_logins(client, args, latencies, failures):
+    """Send args.requests logins with args.concurrency in flight"""
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one_login():
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.post(
+                    "/api/auth/login",
+                    json={"email": args.email, "password": args.password}
+                )
+            except httpx.HTTPError as e:
+                failures.append(type(e).__name__)
+                return
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                failures.append(response.status_code)
+
+    await asyncio.gather(*(one_login() for _ in range(args.requests)))
+
+
+async def probe_health(client, stop, latencies, interval):
+    """Measure /health latency until stopped (event loop responsiveness)"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            await client.get("/health")
+        except httpx.HTTPError:
+            pass
+        else:
+            latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+
+
+async def check_throttle_disabled(client):
+    """Exit unless the server reports login throttling as disabled"""
+    response = await client.get("/health")
+    if response.status_code != 200:
+        sys.exit(f"GET /health returned {response.status_code}; cannot check the login throttle")
+    throttle = response.json().get("login_throttle", {})
+    if throttle.get("enabled", True):
+        sys.exit(
+            "Login throttling is enabled on the server, so nearly every login would get 429.\n"
+            "Set auth.login_rate_limit.enabled to false in config.json and restart it first."
+        )
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        await check_throttle_disabled(client)
+
+        # Warm up (connection setup, caches)
+        await client.post("/api/auth/login", json={"email": args.email, "password": args.password})
+
+        login_latencies, failures, health_latencies = [], [], []
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe_health(client, stop, health_latencies, args.probe_interval))
+
+        started = time.perf_counter()
+        await run_logins(client, args, login_latencies, failures)
+        elapsed = time.perf_counter() - started
+
+        stop.set()
+        await prober
+
+        health = (await client.get("/health")).json().get("password_hashing", {})
+
+    print(f"Logins:            {args.requests} ({len(failures)} failed) with concurrency {args.concurrency}")
+    print(f"Throughput:        {args.requests / elapsed:.1f} logins/s over {elapsed:.2f}s")
+    print(
+        "Login latency:     "
+        f"p50 {percentile(login_latencies, 50) * 1000:.0f} ms, "
+        f"p95 {percentile(login_latencies, 95) * 1000:.0f} ms, "
+        f"p99 {percentile(login_latencies, 99) * 1000:.0f} ms"
+    )
+    if health_latencies:
+        print(
+            "/health latency:   "
+            f"median {statistics.median(health_latencies) * 1000:.1f} ms, "
+            f"max {max(health_latencies) * 1000:.1f} ms ({len(health_latencies)} probes)"
+        )
+    if health:
+        print(f"Hash pool:         {health}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark POST /api/auth/login")
+    parser.add_argument("--url", default="http://localhost:8000", help="Server base URL")
+    parser.add_argument("--email", required=True, help="Login email of an existing active user")
+    parser.add_argument("--password", required=True, help="Password of that user")
+    parser.add_argument("--requests", type=int, default=200, help="Total number of logins")
+    parser.add_argument("--concurrency", type=int, default=20, help="Logins in flight at once")
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="Seconds between /health probes")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,13 @@
+-- Migration script for keyset (cursor) pagination on GET /api/cases
+-- The case list is ordered by (request_date DESC, id DESC); this composite
+-- index lets PostgreSQL seek directly to the cursor position instead of
+-- scanning and discarding OFFSET rows (a btree is scanned backwards for DESC).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cases_request_date_id
+ON cases(request_date, id);
+
+-- Verification
+SELECT indexname, indexdef
+FROM pg_indexes
+WHERE tablename = 'cases'
+AND indexname = 'ix_cases_request_date_id';
@@ -0,0 +1,41 @@
+-- Migration script for case text search (GET /api/cases?q=...)
+-- Substring fragments are matched with ILIKE through pg_trgm GIN indexes; whole
+-- words are matched and ranked through a generated, weighted tsvector column.
+-- Requires the pg_trgm extension (created by docker/init-db.sql).
+
+-- Step 1: Make sure pg_trgm is available
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Step 2: Add the generated search vector (ticket number/title weight A, description weight B)
+-- Note: adding a stored generated column rewrites the table; run during a quiet period.
+ALTER TABLE cases ADD COLUMN IF NOT EXISTS search_vector tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(ticket_number, '') || ' ' || coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+) STORED;
+
+-- Step 3: Create the GIN indexes without blocking writes
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cases_ticket_number_trgm
+ON cases USING gin (ticket_number gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cases_title_trgm
+ON cases USING gin (title gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cases_description_trgm
+ON cases USING gin (description gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cases_search_vector
+ON cases USING gin (search_vector);
+
+ANALYZE cases;
+
+-- Verification
+SELECT indexname, indexdef
+FROM pg_indexes
+WHERE tablename = 'cases'
+AND indexname IN (
+    'ix_cases_ticket_number_trgm',
+    'ix_cases_title_trgm',
+    'ix_cases_description_trgm',
+    'ix_cases_search_vector'
+);
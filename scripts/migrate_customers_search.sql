@@ -0,0 +1,26 @@
+-- Migration script for customer search (GET /api/customers?search=...)
+-- Leading-wildcard ILIKE cannot use the existing btree indexes; pg_trgm GIN
+-- indexes serve ILIKE '%fragment%', exact (wildcard-free) ILIKE and the
+-- similarity operator (%) used for ranking and typo tolerance.
+-- Requires the pg_trgm extension (created by docker/init-db.sql).
+
+-- Step 1: Make sure pg_trgm is available
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Step 2: Create the trigram indexes without blocking writes
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customers_company_name_trgm
+ON customers USING gin (company_name gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customers_email_trgm
+ON customers USING gin (email gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customers_tax_number_trgm
+ON customers USING gin (tax_number gin_trgm_ops);
+
+ANALYZE customers;
+
+-- Verification
+SELECT indexname, indexdef
+FROM pg_indexes
+WHERE tablename = 'customers'
+AND indexname LIKE 'ix_customers_%_trgm';
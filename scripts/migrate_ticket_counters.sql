@@ -0,0 +1,29 @@
+-- Migration script for per-year ticket counters
+-- Ticket numbers (3D + YYYY + NNN) are allocated from ticket_counters with a single
+-- UPDATE ... RETURNING instead of scanning every ticket of the year.
+
+-- Step 1: Create ticket_counters table
+CREATE TABLE IF NOT EXISTS ticket_counters (
+    id SERIAL PRIMARY KEY,
+    year INTEGER NOT NULL,
+    last_number INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ix_ticket_counters_year ON ticket_counters(year);
+CREATE INDEX IF NOT EXISTS ix_ticket_counters_id ON ticket_counters(id);
+
+-- Step 2: Seed counters from tickets already issued (3DYYYY + digits)
+INSERT INTO ticket_counters (year, last_number)
+SELECT
+    CAST(SUBSTRING(ticket_number FROM 3 FOR 4) AS INTEGER) AS year,
+    MAX(CAST(SUBSTRING(ticket_number FROM 7) AS INTEGER)) AS last_number
+FROM cases
+WHERE ticket_number ~ '^3D[0-9]{4}[0-9]+$'
+GROUP BY CAST(SUBSTRING(ticket_number FROM 3 FOR 4) AS INTEGER)
+ON CONFLICT (year) DO UPDATE
+SET last_number = GREATEST(ticket_counters.last_number, EXCLUDED.last_number);
+
+-- Verification
+SELECT year, last_number FROM ticket_counters ORDER BY year;
@@ -0,0 +1,13 @@
+-- Migration script for role claims in access tokens
+-- Tokens carry the user's role IDs and the role-set version ("rv") they were
+-- issued for; users.role_version is bumped whenever the user's roles change,
+-- and a token whose "rv" differs falls back to loading roles from the database.
+
+-- Step 1: Add role_version to users
+ALTER TABLE users ADD COLUMN IF NOT EXISTS role_version INTEGER NOT NULL DEFAULT 0;
+
+-- Verification
+SELECT column_name, data_type, column_default
+FROM information_schema.columns
+WHERE table_name = 'users'
+AND column_name = 'role_version';
@@ -0,0 +1,26 @@
+"""
+Test setup
+
+app.config reads config.json from the working directory when it is imported,
+so the tests run from a temporary directory holding a minimal config (no
+database is needed; unit tests only exercise in-process components).
+"""
+import json
+import os
+import sys
+import tempfile
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+_workdir = tempfile.mkdtemp(prefix="ticket-tests-")
+with open(os.path.join(_workdir, "config.json"), "w", encoding="utf-8") as f:
+    json.dump(
+        {
+            "app": {"secret_key": "test-secret"},
+            "logging": {"level": "WARNING", "file_path": os.path.join(_workdir, "Logs")}
+        },
+        f
+    )
+os.chdir(_workdir)
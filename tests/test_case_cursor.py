@@ -0,0 +1,32 @@
+"""
+Keyset pagination cursor of GET /api/cases
+"""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.cases import decode_case_cursor, encode_case_cursor
+
+
+def test_cursor_round_trip():
+    request_date = datetime(2026, 3, 1, 9, 30, 15, 123456, tzinfo=timezone.utc)
+    cursor = encode_case_cursor(SimpleNamespace(request_date=request_date, id=4711))
+
+    assert decode_case_cursor(cursor) == (request_date, 4711)
+
+
+def test_cursor_is_url_safe_without_padding():
+    cursor = encode_case_cursor(SimpleNamespace(request_date=datetime(2026, 1, 1), id=1))
+
+    assert "=" not in cursor
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "e30", "eyJkIjoiMjAyNiJ9", "eyJkIjoieCIsImkiOjF9"])
+def test_invalid_cursor_is_rejected_with_400(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_case_cursor(cursor)
+
+    assert raised.value.status_code == 400
@@ -0,0 +1,94 @@
+"""
+Compiled serializers of the case repository
+"""
+from types import SimpleNamespace
+
+from app.services.case_repository import CASE_COLUMNS, compile_serializer, serialize_case, serialize_case_summary
+
+
+def _user(user_id):
+    return SimpleNamespace(id=user_id, full_name=f"User {user_id}", email=f"u{user_id}@example.com")
+
+
+def test_fields_are_copied():
+    serialize = compile_serializer(("id", "name"))
+
+    assert serialize(SimpleNamespace(id=1, name="Open", color="#fff")) == {"id": 1, "name": "Open"}
+
+
+def test_single_field():
+    serialize = compile_serializer(("id",))
+
+    assert serialize(SimpleNamespace(id=7)) == {"id": 7}
+
+
+def test_none_serializes_to_none():
+    assert compile_serializer(("id",))(None) is None
+
+
+def test_nested_collections_renames_and_constants():
+    serialize = compile_serializer(
+        ("id",),
+        nested={"user": compile_serializer(("id", "full_name"))},
+        collections={"files": compile_serializer(("id",), renames={"filename": "original_filename"})},
+        renames={"title": "subject"},
+        constants={"phone": None}
+    )
+    obj = SimpleNamespace(
+        id=3,
+        subject="Printer",
+        user=_user(5),
+        files=[SimpleNamespace(id=10, original_filename="a.pdf"), SimpleNamespace(id=11, original_filename="b.png")]
+    )
+
+    assert serialize(obj) == {
+        "id": 3,
+        "title": "Printer",
+        "user": {"id": 5, "full_name": "User 5"},
+        "files": [{"id": 10, "filename": "a.pdf"}, {"id": 11, "filename": "b.png"}],
+        "phone": None,
+    }
+
+
+def test_missing_relationships_serialize_as_none_and_empty_list():
+    serialize = compile_serializer(
+        ("id",),
+        nested={"user": compile_serializer(("id",))},
+        collections={"files": compile_serializer(("id",))}
+    )
+
+    assert serialize(SimpleNamespace(id=1, user=None, files=None)) == {"id": 1, "user": None, "files": []}
+
+
+def _case(**overrides):
+    values = {column: None for column in CASE_COLUMNS}
+    values.update(
+        id=1, ticket_number="3D2026001", title="Printer",
+        customer=SimpleNamespace(id=2, company_name="Acme", email="c@acme.com", address=None),
+        product=None, creator=_user(3), assigned_user=None, department=None,
+        priority_type=SimpleNamespace(id=4, name="High", color="#f00"),
+        support_type=None, status=SimpleNamespace(id=5, name="Open", color="#0f0"),
+        assignments=[SimpleNamespace(id=6, user_id=3, user=_user(3))],
+        comments=[], files=[]
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_case_serializer_shape():
+    result = serialize_case(_case())
+
+    assert set(CASE_COLUMNS) <= set(result)
+    assert result["customer"] == {"id": 2, "company_name": "Acme", "email": "c@acme.com", "address": None, "phone": None}
+    assert result["creator"] == {"id": 3, "full_name": "User 3", "email": "u3@example.com"}
+    assert result["assigned_user"] is None
+    assert result["assignments"] == [{"id": 6, "user_id": 3, "user": {"id": 3, "full_name": "User 3", "email": "u3@example.com"}}]
+
+
+def test_case_summary_counts_default_to_zero():
+    result = serialize_case_summary(_case(), None, 2)
+
+    assert result["comment_count"] == 0
+    assert result["file_count"] == 2
+    assert "description" not in result
+    assert result["creator"] == {"id": 3, "full_name": "User 3"}
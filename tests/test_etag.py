@@ -0,0 +1,90 @@
+"""
+Conditional GET helpers
+"""
+import asyncio
+from types import SimpleNamespace
+
+from fastapi import Request, Response
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table
+from sqlalchemy.dialects import postgresql
+
+from app.utils.etag import etag_matches, make_etag, not_modified, set_etag, table_state_etag
+
+metadata = MetaData()
+customers = Table("customers", metadata, Column("id", Integer), Column("updated_at", DateTime))
+user_roles = Table("user_roles", metadata, Column("user_id", Integer), Column("role_id", Integer))
+
+
+def _request(path="/api/customers", query=b"", if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query, "headers": headers})
+
+
+class RecordingSession:
+    """Returns a fixed state row and keeps the compiled statement"""
+
+    def __init__(self, state):
+        self.state = state
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return SimpleNamespace(one=lambda: self.state)
+
+
+def test_make_etag_is_weak_and_deterministic():
+    etag = make_etag(1, "a")
+
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == make_etag(1, "a")
+    assert etag != make_etag(2, "a")
+
+
+def test_etag_matches_weak_comparison_and_lists():
+    etag = make_etag("x")
+    strong = etag.removeprefix("W/")
+
+    assert etag_matches(_request(if_none_match=etag), etag)
+    assert etag_matches(_request(if_none_match=strong), etag)
+    assert etag_matches(_request(if_none_match=f'"other", {etag}'), etag)
+    assert etag_matches(_request(if_none_match="*"), etag)
+    assert not etag_matches(_request(if_none_match='"other"'), etag)
+    assert not etag_matches(_request(), etag)
+
+
+def test_table_state_etag_queries_count_and_max_updated_at_once():
+    db = RecordingSession((3, "2026-01-01"))
+
+    asyncio.run(table_state_etag(db, (customers, user_roles), _request()))
+
+    assert len(db.statements) == 1
+    statement = db.statements[0]
+    assert statement.count("count(*)") == 2
+    assert "max(customers.updated_at)" in statement
+    assert "user_roles.updated_at" not in statement
+
+
+def test_table_state_etag_changes_with_state_path_and_query():
+    def etag(state, path="/api/customers", query=b""):
+        return asyncio.run(table_state_etag(RecordingSession(state), (customers,), _request(path, query)))
+
+    base = etag((3, "2026-01-01"))
+
+    assert base == etag((3, "2026-01-01"))
+    assert base != etag((4, "2026-01-01"))
+    assert base != etag((3, "2026-01-02"))
+    assert base != etag((3, "2026-01-01"), path="/api/products")
+    assert base != etag((3, "2026-01-01"), query=b"skip=100")
+    assert etag((3, "t"), query=b"a=1&b=2") == etag((3, "t"), query=b"b=2&a=1")
+
+
+def test_response_helpers_set_revalidation_headers():
+    response = Response()
+    set_etag(response, 'W/"abc"')
+    cached = not_modified('W/"abc"')
+
+    assert response.headers["etag"] == 'W/"abc"'
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == 'W/"abc"'
+    assert not cached.body
@@ -0,0 +1,143 @@
+"""
+Login throttling: token buckets and client IP resolution
+"""
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, Request
+
+from app.auth import rate_limit
+from app.auth.rate_limit import LoginThrottle, TokenBucketLimiter, address_in_networks, parse_networks
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Manually advanced replacement for time.monotonic in rate_limit"""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def _request(peer, headers=None):
+    raw_headers = [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    return Request({"type": "http", "client": (peer, 50000) if peer else None, "headers": raw_headers})
+
+
+def _throttle(trusted=("127.0.0.1", "::1")):
+    throttle = LoginThrottle()
+    throttle.enabled = True
+    throttle.trusted_proxies = parse_networks(trusted, "test")
+    throttle.by_ip = TokenBucketLimiter(capacity=3, refill_per_minute=60)
+    throttle.by_email = TokenBucketLimiter(capacity=2, refill_per_minute=60)
+    return throttle
+
+
+def test_bucket_allows_capacity_then_refills(clock):
+    limiter = TokenBucketLimiter(capacity=2, refill_per_minute=30)
+
+    assert limiter.consume("a") and limiter.consume("a")
+    assert not limiter.consume("a")
+    assert limiter.retry_after("a") == 2
+
+    clock.value += 2
+    assert limiter.retry_after("a") == 0
+    assert limiter.consume("a")
+    assert not limiter.consume("a")
+
+
+def test_refill_is_capped_at_capacity(clock):
+    limiter = TokenBucketLimiter(capacity=2, refill_per_minute=60)
+    limiter.consume("a")
+
+    clock.value += 3600
+    assert limiter.consume("a") and limiter.consume("a")
+    assert not limiter.consume("a")
+
+
+def test_reset_refills_and_buckets_are_bounded(clock):
+    limiter = TokenBucketLimiter(capacity=1, refill_per_minute=1, max_buckets=2)
+    limiter.consume("a")
+    limiter.reset("a")
+    assert limiter.consume("a")
+
+    limiter.consume("b")
+    limiter.consume("c")
+    assert len(limiter) == 2
+    # "a" was evicted, so it starts from a full bucket again
+    assert limiter.consume("a")
+
+
+def test_check_raises_429_with_retry_after(clock):
+    throttle = _throttle()
+    throttle.check("10.0.0.1", "User@Example.com")
+    throttle.check("10.0.0.2", "user@example.com")
+
+    with pytest.raises(HTTPException) as raised:
+        throttle.check("10.0.0.3", "USER@example.com")
+
+    assert raised.value.status_code == 429
+    assert int(raised.value.headers["Retry-After"]) >= 1
+
+
+def test_ip_bucket_is_checked_before_the_email_bucket(clock):
+    throttle = _throttle()
+    for index in range(3):
+        throttle.check("10.0.0.1", f"user{index}@example.com")
+
+    with pytest.raises(HTTPException):
+        throttle.check("10.0.0.1", "victim@example.com")
+
+    # The rejected attempt did not charge the account
+    throttle.check("10.0.0.2", "victim@example.com")
+    throttle.check("10.0.0.3", "victim@example.com")
+
+
+def test_success_refills_the_account_and_disabled_throttle_admits_all(clock):
+    throttle = _throttle()
+    throttle.check("10.0.0.1", "a@example.com")
+    throttle.check("10.0.0.2", "a@example.com")
+    throttle.succeeded("A@example.com")
+    throttle.check("10.0.0.3", "a@example.com")
+
+    throttle.enabled = False
+    for _ in range(10):
+        throttle.check("10.0.0.1", "a@example.com")
+    assert throttle.get_stats()["enabled"] is False
+
+
+def test_forwarding_headers_are_ignored_from_untrusted_peers():
+    throttle = _throttle()
+
+    assert throttle.client_ip(_request("203.0.113.9", {"X-Forwarded-For": "1.2.3.4"})) == "203.0.113.9"
+    assert throttle.client_ip(_request("203.0.113.9", {"X-Real-IP": "1.2.3.4"})) == "203.0.113.9"
+    assert throttle.client_ip(_request(None)) is None
+
+
+def test_forwarded_for_is_read_right_to_left_skipping_trusted_hops():
+    throttle = _throttle(trusted=("127.0.0.1", "10.0.0.0/8"))
+
+    # The client prepended a fake address; the proxy appended the real one
+    request = _request("127.0.0.1", {"X-Forwarded-For": "6.6.6.6, 198.51.100.7, 10.1.2.3"})
+    assert throttle.client_ip(request) == "198.51.100.7"
+
+    # Every hop trusted: the left-most one is the client
+    assert throttle.client_ip(_request("127.0.0.1", {"X-Forwarded-For": "10.0.0.5, 10.0.0.6"})) == "10.0.0.5"
+
+
+def test_real_ip_and_peer_fallbacks_from_trusted_proxy():
+    throttle = _throttle()
+
+    assert throttle.client_ip(_request("127.0.0.1", {"X-Real-IP": " 198.51.100.7 "})) == "198.51.100.7"
+    assert throttle.client_ip(_request("127.0.0.1", {"X-Forwarded-For": " , "})) == "127.0.0.1"
+    assert throttle.client_ip(_request("127.0.0.1")) == "127.0.0.1"
+
+
+def test_network_helpers():
+    networks = parse_networks(["10.0.0.0/8", "::1", "not-an-ip"], "test")
+
+    assert len(networks) == 2
+    assert address_in_networks("10.20.30.40", networks)
+    assert address_in_networks("::1", networks)
+    assert not address_in_networks("192.168.0.1", networks)
+    assert not address_in_networks("testclient", networks)
+    assert not address_in_networks(None, networks)
@@ -0,0 +1,120 @@
+"""
+In-process metrics registry and Prometheus text rendering
+"""
+import math
+
+import pytest
+
+from app.utils import metrics
+from app.utils.metrics import MetricsRegistry, PoolTimingMixin, _Metric, route_label
+
+
+def test_metric_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        _Metric("x", "y")
+
+
+def test_counter_and_gauge_rendering():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("method",))
+    in_flight = registry.gauge("in_flight", "In flight")
+    requests.inc(method="GET")
+    requests.inc(2, method="GET")
+    requests.inc(method="POST")
+    in_flight.inc(3)
+    in_flight.dec()
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{method="GET"} 3',
+        'requests_total{method="POST"} 1',
+        "# HELP in_flight In flight",
+        "# TYPE in_flight gauge",
+        "in_flight 2",
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, route="/a")
+
+    lines = registry.render().splitlines()
+
+    assert lines[2:] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 3.65',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_label_values_and_special_floats_are_escaped():
+    registry = MetricsRegistry()
+    gauge = registry.gauge("g", "G", ("path",))
+    gauge.set(math.nan, path='a"b\\c\nd')
+    gauge.set(-math.inf, path="x")
+
+    lines = registry.render().splitlines()
+
+    assert 'g{path="a\\"b\\\\c\\nd"} NaN' in lines
+    assert 'g{path="x"} -Inf' in lines
+
+
+def test_registering_a_name_twice_returns_the_same_metric():
+    registry = MetricsRegistry()
+
+    assert registry.counter("c", "C") is registry.counter("c", "C")
+
+
+def test_collectors_are_grouped_and_failures_skipped():
+    registry = MetricsRegistry()
+    registry.register_collector("cache_entries", "Entries", "gauge", lambda: [({"cache": "a"}, 1)])
+    registry.register_collector("cache_entries", "Entries", "gauge", lambda: [({"cache": "b"}, 2.5)])
+    registry.register_collector("broken", "Broken", "gauge", lambda: 1 / 0)
+
+    lines = registry.render().splitlines()
+
+    assert lines[:4] == [
+        "# HELP cache_entries Entries",
+        "# TYPE cache_entries gauge",
+        'cache_entries{cache="a"} 1',
+        'cache_entries{cache="b"} 2.5',
+    ]
+    assert "# TYPE broken gauge" in lines
+    assert not any(line.startswith("broken ") for line in lines)
+
+
+def test_pool_timing_mixin_records_checkout_and_connect(monkeypatch):
+    registry = MetricsRegistry()
+    checkout = registry.histogram("checkout", "Checkout", ("pool",))
+    connect = registry.histogram("connect", "Connect", ("pool",))
+    monkeypatch.setattr(metrics, "db_pool_checkout_seconds", checkout)
+    monkeypatch.setattr(metrics, "db_pool_connect_seconds", connect)
+
+    class Pool:
+        def _do_get(self):
+            return self._create_connection()
+
+        def _create_connection(self):
+            return "connection"
+
+    class TimedPool(PoolTimingMixin, Pool):
+        metrics_label = "test"
+
+    assert TimedPool()._do_get() == "connection"
+    rendered = registry.render()
+    assert 'checkout_count{pool="test"} 1' in rendered
+    assert 'connect_count{pool="test"} 1' in rendered
+
+
+def test_route_label_is_the_template_or_a_bounded_fallback():
+    class Route:
+        path = "/api/cases/{case_id}"
+
+    assert route_label({"route": Route(), "path": "/api/cases/1"}) == "/api/cases/{case_id}"
+    assert route_label({"path": "/static/js/app.js"}) == "/static"
+    assert route_label({"path": "/random/123"}) == "<unmatched>"
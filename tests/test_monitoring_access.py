@@ -0,0 +1,45 @@
+"""
+Access to monitoring endpoints (/metrics, /health)
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Request
+
+from app.auth import dependencies
+from app.auth.dependencies import has_monitoring_access, require_monitoring_access
+
+
+def _request(peer, headers=None):
+    raw_headers = [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    return Request({"type": "http", "client": (peer, 50000), "headers": raw_headers})
+
+
+def _allowed(request):
+    return asyncio.run(has_monitoring_access(request, credentials=None, db=None))
+
+
+def test_loopback_clients_are_allowed_by_default():
+    assert _allowed(_request("127.0.0.1"))
+    assert _allowed(_request("::1"))
+    assert not _allowed(_request("203.0.113.9"))
+
+
+def test_forwarded_clients_are_judged_by_their_own_address():
+    assert not _allowed(_request("127.0.0.1", {"X-Forwarded-For": "203.0.113.9"}))
+    assert not _allowed(_request("203.0.113.9", {"X-Forwarded-For": "127.0.0.1"}))
+
+
+def test_allowlist_accepts_networks(monkeypatch):
+    monkeypatch.setattr(dependencies, "monitoring_networks", dependencies.parse_networks(["10.0.0.0/8"], "test"))
+
+    assert _allowed(_request("10.1.2.3"))
+    assert not _allowed(_request("127.0.0.1"))
+
+
+def test_require_monitoring_access_rejects_with_403():
+    asyncio.run(require_monitoring_access(allowed=True))
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(require_monitoring_access(allowed=False))
+    assert raised.value.status_code == 403
@@ -0,0 +1,109 @@
+"""
+Performance history: ring buffers, retention tiers and summaries
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import performance
+from app.utils.performance import HISTORY_METRICS, MetricHistory, PerformanceMonitor, RingBuffer, percentiles
+
+START = 1_800_000_000.0  # a whole hour in epoch seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Manually advanced replacement for time.time in the performance module"""
+    now = SimpleNamespace(value=START)
+    monkeypatch.setattr(performance, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def _sample(rss_mb, **values):
+    sample = {metric: 0.0 for metric in HISTORY_METRICS}
+    sample.update(rss_mb=rss_mb, **values)
+    return sample
+
+
+def test_ring_buffer_wraps_and_keeps_the_newest_values():
+    ring = RingBuffer(3)
+    assert list(ring.values()) == []
+
+    for value in range(1, 6):
+        ring.append(value)
+
+    assert len(ring) == 3
+    assert list(ring.values()) == [3.0, 4.0, 5.0]
+    assert list(ring.values(last=2)) == [4.0, 5.0]
+    assert list(ring.values(last=10)) == [3.0, 4.0, 5.0]
+    assert ring.nbytes == 3 * 8
+
+
+def test_window_start_counts_samples_inside_the_window(clock):
+    history = MetricHistory("raw", 1, 10)
+    for offset in range(5):
+        history.append(START + offset, {})
+    clock.value = START + 4
+
+    assert history.window_start(None) == 5
+    assert history.window_start(2) == 3
+    assert history.window_start(0.5) == 1
+
+
+def test_samples_roll_up_into_minute_and_hour_averages(clock):
+    monitor = PerformanceMonitor(sample_interval=1, raw_points=100)
+    # 61 minutes of 1-second samples; rss is the minute number
+    for second in range(61 * 60 + 1):
+        clock.value = START + second
+        monitor._record(_sample(float(second // 60)))
+
+    minutes = monitor.get_history("1m", metrics=["rss_mb"])
+    hours = monitor.get_history("1h", metrics=["rss_mb"])
+
+    assert len(monitor.tiers["raw"]) == 100
+    assert minutes["series"]["rss_mb"][:3] == [0.0, 1.0, 2.0]
+    assert len(minutes["timestamps"]) == 61
+    assert minutes["timestamps"][0] == START + 60
+    assert hours["series"]["rss_mb"] == [29.5]
+    assert hours["timestamps"] == [START + 3600]
+
+
+def test_summary_uses_interpolated_percentiles(clock):
+    monitor = PerformanceMonitor(raw_points=200)
+    for value in range(1, 101):
+        clock.value = START + value
+        monitor._record(_sample(float(value)))
+
+    rss = monitor.get_summary()["rss_mb"]
+    recent = monitor.get_summary(window_seconds=9.5)
+
+    assert rss == {"current": 100.0, "min": 1.0, "avg": 50.5, "p50": 50.5, "p95": 95.05, "p99": 99.01, "max": 100.0}
+    assert recent["data_points"] == 10
+    assert recent["rss_mb"]["min"] == 91.0
+
+
+def test_summary_of_empty_and_single_sample_tiers(clock):
+    monitor = PerformanceMonitor()
+    assert monitor.get_summary()["data_points"] == 0
+
+    monitor._record(_sample(5.0))
+    assert monitor.get_summary()["rss_mb"]["p99"] == 5.0
+    assert percentiles([5.0]) == [5.0] * 99
+
+
+def test_unknown_tier_is_rejected():
+    with pytest.raises(ValueError):
+        PerformanceMonitor().get_history("1d")
+
+
+def test_deprecated_interval_key_is_used_as_fallback(monkeypatch):
+    def monitor_for(settings):
+        monkeypatch.setattr(performance, "_monitor", None)
+        return performance.get_monitor(SimpleNamespace(get=lambda key, default=None: settings.get(key, default)))
+
+    assert monitor_for({}).sample_interval == 1
+    assert monitor_for({"performance.memory_check_interval": 60}).sample_interval == 60
+    assert monitor_for({
+        "performance.memory_check_interval": 60,
+        "performance.sample_interval_seconds": 2,
+    }).sample_interval == 2
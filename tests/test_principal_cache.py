@@ -0,0 +1,85 @@
+"""
+Authenticated principal and its cache
+"""
+from types import SimpleNamespace
+
+from app.auth.principal import Principal, PrincipalCache
+
+
+def _principal(user_id=1, roles=None):
+    roles = roles if roles is not None else {1: "Admin"}
+    return Principal(
+        id=user_id, email=f"u{user_id}@example.com", full_name=f"User {user_id}", is_active=1,
+        department_id=None, role_ids=frozenset(roles), role_names=frozenset(roles.values()), role_version=0
+    )
+
+
+def test_from_user_uses_token_roles_or_the_relationship():
+    user = SimpleNamespace(
+        id=5, email="a@example.com", full_name="A", is_active=1, department_id=2, role_version=3,
+        roles=[SimpleNamespace(id=1, name="Admin"), SimpleNamespace(id=2, name="Yönetici")]
+    )
+
+    from_relationship = Principal.from_user(user)
+    from_claims = Principal.from_user(user, {2: "Yönetici"})
+
+    assert from_relationship.role_ids == frozenset({1, 2})
+    assert from_relationship.has_role("Yönetici", "Destek Personeli")
+    assert from_claims.role_names == frozenset({"Yönetici"})
+    assert not from_claims.has_role("Admin")
+    assert from_claims.role_version == 3
+
+
+def test_get_put_and_stats():
+    cache = PrincipalCache()
+    principal = _principal()
+
+    assert cache.get(1) is None
+    cache.put(principal, cache.generation)
+
+    assert cache.get(1) is principal
+    assert cache.get_stats() == {"size": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_expired_entries_are_dropped():
+    cache = PrincipalCache(ttl_seconds=0)
+    cache.put(_principal(), cache.generation)
+
+    assert cache.get(1) is None
+    assert cache.get_stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PrincipalCache(max_size=2)
+    for user_id in (1, 2):
+        cache.put(_principal(user_id), cache.generation)
+    cache.get(1)
+    cache.put(_principal(3), cache.generation)
+
+    assert cache.get(2) is None
+    assert cache.get(1) is not None
+    assert cache.get(3) is not None
+
+
+def test_invalidate_one_user_or_all():
+    cache = PrincipalCache()
+    for user_id in (1, 2, 3):
+        cache.put(_principal(user_id), cache.generation)
+
+    cache.invalidate(2)
+    assert cache.get(2) is None
+    assert cache.get(1) is not None
+
+    cache.invalidate()
+    assert cache.get(1) is None
+    assert cache.get(3) is None
+
+
+def test_put_after_concurrent_invalidation_is_skipped():
+    cache = PrincipalCache()
+    generation = cache.generation
+    cache.invalidate(1)
+
+    cache.put(_principal(), generation)
+
+    assert cache.get(1) is None
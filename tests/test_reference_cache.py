@@ -0,0 +1,107 @@
+"""
+Versioned reference data cache
+"""
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.services.reference_cache import ReferenceDataCache
+
+NOW = datetime(2026, 1, 1)
+
+
+def _role(role_id, name):
+    return SimpleNamespace(id=role_id, name=name, description=None, created_at=NOW, updated_at=NOW)
+
+
+class FakeSession:
+    """Serves the current rows for every query and counts the loads"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.loads = 0
+        self.on_load = None
+
+    async def scalars(self, query):
+        self.loads += 1
+        rows = list(self.rows)
+        if self.on_load:
+            self.on_load()
+        return SimpleNamespace(unique=lambda: SimpleNamespace(all=lambda: rows))
+
+
+def test_rows_are_cached_until_invalidated():
+    cache = ReferenceDataCache()
+    db = FakeSession([_role(1, "Admin")])
+
+    first = asyncio.run(cache.get(db, "roles"))
+    asyncio.run(cache.get(db, "roles"))
+    assert db.loads == 1
+    assert [role.name for role in first] == ["Admin"]
+
+    db.rows = [_role(1, "Admin"), _role(2, "Destek Personeli")]
+    cache.invalidate()
+    second = asyncio.run(cache.get(db, "roles"))
+
+    assert db.loads == 2
+    assert [role.name for role in second] == ["Admin", "Destek Personeli"]
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["misses"] == 2
+
+
+def test_invalidation_covers_every_table():
+    cache = ReferenceDataCache()
+    db = FakeSession([])
+    asyncio.run(cache.get(db, "roles"))
+    asyncio.run(cache.get(db, "departments"))
+
+    cache.invalidate()
+    asyncio.run(cache.get(db, "roles"))
+    asyncio.run(cache.get(db, "departments"))
+
+    assert db.loads == 4
+
+
+def test_invalidation_during_load_leaves_the_entry_stale():
+    cache = ReferenceDataCache()
+    db = FakeSession([_role(1, "Admin")])
+    db.on_load = cache.invalidate
+
+    asyncio.run(cache.get(db, "roles"))
+    db.on_load = None
+    asyncio.run(cache.get(db, "roles"))
+
+    assert db.loads == 2
+
+
+def test_ttl_expires_entries():
+    cache = ReferenceDataCache(ttl_seconds=0)
+    db = FakeSession([])
+
+    asyncio.run(cache.get(db, "roles"))
+    asyncio.run(cache.get(db, "roles"))
+
+    assert db.loads == 2
+
+
+def test_etag_follows_content_not_version():
+    cache = ReferenceDataCache()
+    db = FakeSession([_role(1, "Admin")])
+
+    _, first = asyncio.run(cache.get_tagged(db, "roles"))
+    cache.invalidate()
+    _, unchanged = asyncio.run(cache.get_tagged(db, "roles"))
+    db.rows = [_role(1, "Administrator")]
+    cache.invalidate()
+    _, renamed = asyncio.run(cache.get_tagged(db, "roles"))
+
+    assert first == unchanged
+    assert renamed != first
+
+
+def test_get_by_name():
+    cache = ReferenceDataCache()
+    db = FakeSession([_role(1, "Admin"), _role(2, "Yönetici")])
+
+    assert asyncio.run(cache.get_by_name(db, "roles", "Yönetici")).id == 2
+    assert asyncio.run(cache.get_by_name(db, "roles", "Missing")) is None
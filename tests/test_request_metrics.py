@@ -0,0 +1,79 @@
+"""
+Per-request query counting and N+1 statement-shape detection
+"""
+import contextvars
+
+from sqlalchemy import create_engine, text
+
+from app.utils import request_metrics
+from app.utils.request_metrics import (
+    RequestMetrics, install_query_hooks, report_repeated_statements, start_request_metrics, statement_shape, timing_headers
+)
+
+
+def test_in_lists_of_any_length_share_a_shape():
+    asyncpg = "SELECT * FROM users WHERE users.id IN ($1, $2, $3)"
+    psycopg = "SELECT * FROM users WHERE users.id IN (%(id_1_1)s, %(id_1_2)s)"
+
+    assert statement_shape(asyncpg) == statement_shape("SELECT * FROM users WHERE users.id IN ($1)")
+    assert statement_shape(psycopg) == "SELECT * FROM users WHERE users.id IN (?)"
+    assert statement_shape("SELECT 1 WHERE a IN (?, ?)") == "SELECT 1 WHERE a IN (?)"
+    assert statement_shape("SELECT 1 WHERE a IN (:a, :b)") == "SELECT 1 WHERE a IN (?)"
+
+
+def test_whitespace_is_normalized_but_literals_are_kept():
+    assert statement_shape("SELECT  a\n  FROM t\tWHERE b = $1 ") == "SELECT a FROM t WHERE b = $1"
+    assert statement_shape("SELECT count(*) FROM t") == "SELECT count(*) FROM t"
+    assert statement_shape("SELECT (1, 2)") == "SELECT (1, 2)"
+
+
+def test_repeated_statements_aggregates_by_shape_above_the_threshold():
+    metrics = RequestMetrics()
+    metrics.statements = {
+        "SELECT * FROM comments WHERE case_id = $1": 12,
+        "SELECT * FROM files WHERE id IN ($1, $2)": 3,
+        "SELECT * FROM files WHERE id IN ($1)": 3,
+        "SELECT * FROM cases": 1,
+    }
+
+    assert metrics.repeated_statements(5) == [
+        ("SELECT * FROM comments WHERE case_id = $1", 12),
+        ("SELECT * FROM files WHERE id IN (?)", 6),
+    ]
+    assert metrics.repeated_statements(12) == []
+
+
+def test_report_counts_routes_with_repeated_statements(monkeypatch):
+    monkeypatch.setattr(request_metrics, "REPEATED_STATEMENT_THRESHOLD", 2)
+    metrics = RequestMetrics()
+    metrics.db_queries = 4
+    metrics.statements = {"SELECT * FROM users WHERE id = $1": 4}
+
+    def reported():
+        samples = request_metrics.db_repeated_statements_total.samples()
+        return sum(value for _, labels, value in samples if labels["route"] == "/api/test-n-plus-one")
+
+    before = reported()
+    report_repeated_statements(metrics, "GET", "/api/test-n-plus-one")
+
+    assert reported() == before + 1
+
+
+def test_query_hooks_count_statements_of_the_current_request():
+    install_query_hooks()
+    engine = create_engine("sqlite://")
+
+    def handle_request():
+        metrics = start_request_metrics()
+        with engine.connect() as conn:
+            for value in range(3):
+                conn.execute(text("SELECT :value"), {"value": value})
+        return metrics
+
+    metrics = contextvars.copy_context().run(handle_request)
+
+    assert metrics.db_queries == 3
+    assert metrics.statements == {"SELECT ?": 3}
+    assert metrics.db_seconds > 0
+    assert timing_headers(metrics)["X-DB-Queries"] == "3"
+    assert request_metrics.get_request_metrics() is None
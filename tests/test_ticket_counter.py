@@ -0,0 +1,49 @@
+"""
+Ticket number allocation from the per-year counter row
+"""
+import asyncio
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql
+
+from app.api.cases import generate_ticket_number
+
+
+class RecordingSession:
+    """Stands in for AsyncSession.scalar: records statements, returns queued results"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def scalar(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return self.results.pop(0)
+
+
+def test_existing_counter_is_incremented_in_one_statement():
+    db = RecordingSession(42)
+
+    ticket_number = asyncio.run(generate_ticket_number(db))
+
+    assert ticket_number == f"3D{datetime.now().year}042"
+    assert len(db.statements) == 1
+    assert db.statements[0].startswith("UPDATE ticket_counters SET last_number=(ticket_counters.last_number +")
+    assert "RETURNING ticket_counters.last_number" in db.statements[0]
+
+
+def test_first_ticket_of_the_year_seeds_the_counter():
+    db = RecordingSession(None, 1)
+
+    ticket_number = asyncio.run(generate_ticket_number(db))
+
+    assert ticket_number == f"3D{datetime.now().year}001"
+    insert = db.statements[1]
+    assert insert.startswith("INSERT INTO ticket_counters")
+    assert "coalesce(max(CAST(SUBSTRING(cases.ticket_number" in insert
+    assert "ON CONFLICT (year) DO UPDATE SET last_number = (ticket_counters.last_number +" in insert
+    assert "RETURNING ticket_counters.last_number" in insert
+
+
+def test_numbers_widen_past_999():
+    assert asyncio.run(generate_ticket_number(RecordingSession(1000))) == f"3D{datetime.now().year}1000"
@@ -0,0 +1,63 @@
+"""
+Decoded JWT payload cache
+"""
+import time
+from datetime import timedelta
+
+from app.auth.security import DecodedTokenCache, create_access_token, decode_access_token, token_cache
+
+
+def test_payload_is_cached_until_exp_and_copied():
+    cache = DecodedTokenCache()
+    payload = {"sub": "1", "exp": time.time() + 60}
+    cache.put("token", payload)
+
+    cached = cache.get("token")
+    cached["sub"] = "2"
+
+    assert cache.get("token") == payload
+    assert cache.get_stats()["hits"] == 2
+
+
+def test_expired_and_exp_less_tokens_are_not_served():
+    cache = DecodedTokenCache()
+    cache.put("expired", {"sub": "1", "exp": time.time() - 1})
+    cache.put("no-exp", {"sub": "1"})
+
+    assert cache.get("expired") is None
+    assert cache.get("no-exp") is None
+    assert cache.get_stats()["size"] == 0
+
+
+def test_size_is_bounded_and_zero_disables_caching():
+    cache = DecodedTokenCache(max_size=2)
+    exp = time.time() + 60
+    for token in ("a", "b", "c"):
+        cache.put(token, {"exp": exp})
+
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+
+    disabled = DecodedTokenCache(max_size=0)
+    disabled.put("a", {"exp": exp})
+    assert disabled.get("a") is None
+
+
+def test_decode_access_token_serves_verified_payloads_from_the_cache():
+    token_cache.clear()
+    token = create_access_token({"sub": "7"}, expires_delta=timedelta(minutes=5), role_ids=[2, 1], role_version=3)
+
+    first = decode_access_token(token)
+    hits = token_cache.get_stats()["hits"]
+    second = decode_access_token(token)
+
+    assert first == second
+    assert first["sub"] == "7" and first["roles"] == [1, 2] and first["rv"] == 3
+    assert token_cache.get_stats()["hits"] == hits + 1
+
+
+def test_invalid_tokens_are_not_cached():
+    token_cache.clear()
+
+    assert decode_access_token("not.a.jwt") is None
+    assert token_cache.get_stats()["size"] == 0